@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: activity_buffer.py - Registro de atividade dos membros em lotes
+#
+# Cada mensagem de texto ou foto em um grupo permitido gera uma atividade.
+# Em vez de um INSERT por mensagem, as atividades ficam em memória agrupadas
+# por (user_id, chat_id, activity_type) e são gravadas com um único INSERT de
+# múltiplas linhas (que também atualiza a contagem diária user_activity_daily)
+# quando o lote atinge ACTIVITY_BATCH_SIZE chaves ou a cada
+# ACTIVITY_FLUSH_SECONDS. Se o banco não acompanhar, quem registra passa a
+# esperar a gravação em andamento (backpressure) e, no limite, eventos são
+# descartados e contados em vez de crescer a memória sem controle.
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import database
+from async_database import run_in_db_executor, purge_old_activity, purge_old_points_buckets
+
+logger = logging.getLogger(__name__)
+
+# Intervalo da gravação periódica das atividades pendentes
+ACTIVITY_FLUSH_SECONDS = float(os.environ.get("ACTIVITY_FLUSH_SECONDS", "5"))
+# Quantidade de chaves distintas que dispara uma gravação imediata
+ACTIVITY_BATCH_SIZE = int(os.environ.get("ACTIVITY_BATCH_SIZE", "500"))
+# Limite de chaves pendentes: acima disso quem registra espera a gravação
+ACTIVITY_MAX_PENDING = int(os.environ.get("ACTIVITY_MAX_PENDING", "20000"))
+# Intervalo da limpeza das atividades fora do período de retenção
+ACTIVITY_PURGE_SECONDS = 24 * 60 * 60
+
+class ActivityBuffer:
+    """Atividades pendentes em memória, gravadas em lote em user_activity."""
+
+    def __init__(self, batch_size: int = ACTIVITY_BATCH_SIZE, max_pending: int = ACTIVITY_MAX_PENDING):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        # (user_id, chat_id, activity_type) -> [quantidade, primeiro registro]
+        self._pending: Dict[Tuple[int, int, str], list] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "recorded": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "rows_written": 0,
+            "events_written": 0,
+            "backpressure_waits": 0,
+            "last_flush_seconds": 0.0,
+        }
+
+    def add(self, user_id: int, chat_id: int, activity_type: str) -> bool:
+        """Adicionar uma atividade ao lote sem esperar. Retorna False se foi descartada."""
+        key = (user_id, chat_id, activity_type)
+        entry = self._pending.get(key)
+        if entry is not None:
+            entry[0] += 1
+        elif len(self._pending) >= self.max_pending:
+            self._stats["dropped"] += 1
+            return False
+        else:
+            self._pending[key] = [1, datetime.now()]
+        self._stats["recorded"] += 1
+
+        if len(self._pending) >= self.batch_size:
+            self._schedule_flush()
+        return True
+
+    async def record(self, user_id: int, chat_id: int, activity_type: str) -> None:
+        """Registrar uma atividade, esperando a gravação em andamento se o lote estiver cheio."""
+        if len(self._pending) >= self.max_pending and self._flush_task and not self._flush_task.done():
+            self._stats["backpressure_waits"] += 1
+            await asyncio.shield(self._flush_task)
+        self.add(user_id, chat_id, activity_type)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats["pending"] = len(self._pending)
+        return stats
+
+    def _schedule_flush(self) -> None:
+        """Agendar uma gravação imediata, se ainda não houver uma em andamento."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Fora do event loop: a gravação periódica cuida disso
+            return
+        if self._flush_task and not self._flush_task.done():
+            return
+        self._flush_task = loop.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """Gravar todas as atividades pendentes em uma única operação."""
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+        rows = [
+            (user_id, chat_id, activity_type, count, created_at)
+            for (user_id, chat_id, activity_type), (count, created_at) in pending.items()
+        ]
+
+        started = time.monotonic()
+        try:
+            await run_in_db_executor(database.add_user_activity_batch, rows)
+        except Exception as e:
+            self._stats["failed_flushes"] += 1
+            logger.error(f"Erro ao gravar {len(rows)} atividades: {e}")
+            # Devolver ao lote o que couber, somando ao que chegou nesse meio tempo
+            for key, (count, created_at) in pending.items():
+                entry = self._pending.get(key)
+                if entry is not None:
+                    entry[0] += count
+                    entry[1] = min(entry[1], created_at)
+                elif len(self._pending) < self.max_pending:
+                    self._pending[key] = [count, created_at]
+                else:
+                    self._stats["dropped"] += count
+            return
+
+        self._stats["flushes"] += 1
+        self._stats["rows_written"] += len(rows)
+        self._stats["events_written"] += sum(row[3] for row in rows)
+        self._stats["last_flush_seconds"] = time.monotonic() - started
+
+# Instância compartilhada pelos handlers
+activity_buffer = ActivityBuffer()
+
+async def flush_activity(context) -> None:
+    """Job periódico que grava as atividades pendentes."""
+    await activity_buffer.flush()
+
+async def purge_activity(context) -> None:
+    """Job diário que apaga atividades brutas, contagens antigas e placares de períodos passados."""
+    try:
+        raw_deleted, daily_deleted = await purge_old_activity()
+        logger.info(f"Limpeza de atividades: {raw_deleted} brutas e {daily_deleted} diárias apagadas")
+    except Exception as e:
+        logger.error(f"Erro na limpeza de atividades: {e}")
+
+    try:
+        buckets_deleted = await purge_old_points_buckets()
+        logger.info(f"Limpeza de placares por período: {buckets_deleted} linhas apagadas")
+    except Exception as e:
+        logger.error(f"Erro na limpeza dos placares por período: {e}")
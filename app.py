@@ -21,7 +21,8 @@ from database import (
     get_leaderboard, get_invite_leaderboard, get_setting, update_setting,
     get_shop_items, create_shop_item, update_shop_item, get_shop_item,
     get_all_purchases, update_purchase_status, delete_shop_item,
-    get_prize_claims, update_prize_claim_status
+    get_prize_claims, update_prize_claim_status, get_pool_stats,
+    get_user_rank, get_period_leaderboard, get_user_period_rank
 )
 
 app = Flask(__name__)
@@ -336,6 +337,15 @@ def status():
     """Endpoint de status da API."""
     return jsonify({'status': 'online', 'timestamp': datetime.now().isoformat()})
 
+@app.route('/api/db-pool')
+def api_db_pool():
+    """API para acompanhar o pool de conexões (conexões em uso, tempos de espera)."""
+    try:
+        return jsonify({'status': 'success', 'data': get_pool_stats()})
+    except Exception as e:
+        logger.error(f"Erro na API do pool de conexões: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @app.route('/ping')
 def ping():
     """Endpoint para o UptimeRobot fazer ping e manter o bot ativo."""
@@ -365,14 +375,36 @@ def restart_bot_endpoint():
 
 @app.route('/api/leaderboard')
 def api_leaderboard():
-    """API para obter o placar."""
+    """API para obter o placar (?period=all|week|month&chat_id=...)."""
     try:
         limit = min(int(request.args.get('limit', 10)), 100)
-        top_users = get_leaderboard(limit)
-        return jsonify({
+        chat_id = int(request.args['chat_id']) if request.args.get('chat_id') else None
+        user_id = int(request.args['user_id']) if request.args.get('user_id') else None
+        radius = min(int(request.args.get('radius', 2)), 50)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit, chat_id, user_id e radius devem ser números inteiros'}), 400
+    period = request.args.get('period', 'all')
+    if period not in ('all', 'week', 'month'):
+        return jsonify({'status': 'error', 'message': 'Período inválido'}), 400
+    
+    try:
+        top_users = get_period_leaderboard(period, chat_id, limit)
+        response = {
             'status': 'success',
+            'period': period,
+            'chat_id': chat_id,
             'data': [dict(user) for user in top_users]
-        })
+        }
+        
+        # Posição de um usuário específico (?user_id=...&radius=...); os
+        # vizinhos só estão disponíveis no placar geral
+        if user_id is not None:
+            if period == 'all' and chat_id is None:
+                response['user'] = get_user_rank(user_id, radius)
+            else:
+                response['user'] = get_user_period_rank(user_id, period, chat_id)
+        
+        return jsonify(response)
     except Exception as e:
         logger.error(f"Erro na API de placar: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: async_database.py - Versões assíncronas das funções de database.py
+#
+# Os handlers do bot rodam no event loop do python-telegram-bot. As funções de
+# database.py usam psycopg2 (bloqueante), então aqui cada uma é executada em um
+# ThreadPoolExecutor dedicado, do mesmo tamanho do pool de conexões, para que
+# uma consulta lenta não congele as atualizações dos outros chats.
+
+import os
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+logger = logging.getLogger(__name__)
+
+# Uma thread por conexão do pool: mais threads só ficariam esperando no checkout
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("DB_POOL_MAX", "10")),
+    thread_name_prefix="db"
+)
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """Executar uma função bloqueante de banco de dados no executor dedicado."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+def _to_async(func):
+    """Criar a versão assíncrona de uma função de database.py."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_in_db_executor(func, *args, **kwargs)
+    return wrapper
+
+def shutdown_db_executor(wait=True):
+    """Encerrar o executor (chamado no desligamento do bot)."""
+    _executor.shutdown(wait=wait)
+
+# Usuários e pontos
+register_user = _to_async(database.register_user)
+add_points = _to_async(database.add_points)
+subtract_points = _to_async(database.subtract_points)
+get_user_points = _to_async(database.get_user_points)
+get_leaderboard = _to_async(database.get_leaderboard)
+get_user_rank = _to_async(database.get_user_rank)
+get_period_leaderboard = _to_async(database.get_period_leaderboard)
+get_user_period_rank = _to_async(database.get_user_period_rank)
+purge_old_points_buckets = _to_async(database.purge_old_points_buckets)
+
+# Convites
+create_invite = _to_async(database.create_invite)
+use_invite = _to_async(database.use_invite)
+get_user_invites = _to_async(database.get_user_invites)
+get_invite_leaderboard = _to_async(database.get_invite_leaderboard)
+
+# Jogos ativos
+record_game_start = _to_async(database.record_game_start)
+get_active_game = _to_async(database.get_active_game)
+end_game = _to_async(database.end_game)
+record_used_question = _to_async(database.record_used_question)
+get_used_questions = _to_async(database.get_used_questions)
+record_seen_content = _to_async(database.record_seen_content)
+get_seen_content = _to_async(database.get_seen_content)
+save_bingo_card = _to_async(database.save_bingo_card)
+record_bingo_draw = _to_async(database.record_bingo_draw)
+load_bingo_game = _to_async(database.load_bingo_game)
+delete_bingo_game = _to_async(database.delete_bingo_game)
+
+# Jogos automáticos
+save_game_schedule = _to_async(database.save_game_schedule)
+update_game_schedule_run = _to_async(database.update_game_schedule_run)
+delete_game_schedule = _to_async(database.delete_game_schedule)
+update_game_schedules_frequency = _to_async(database.update_game_schedules_frequency)
+load_game_schedules = _to_async(database.load_game_schedules)
+get_allowed_chats = _to_async(database.get_allowed_chats)
+
+# Prêmios
+create_prize_claim = _to_async(database.create_prize_claim)
+update_prize_payment = _to_async(database.update_prize_payment)
+get_prize_claims = _to_async(database.get_prize_claims)
+update_prize_claim_status = _to_async(database.update_prize_claim_status)
+
+# Configurações e permissões
+get_setting = _to_async(database.get_setting)
+update_setting = _to_async(database.update_setting)
+get_all_settings = _to_async(database.get_all_settings)
+is_admin = _to_async(database.is_admin)
+is_chat_allowed = _to_async(database.is_chat_allowed)
+
+# Atividade dos membros
+add_user_activity = _to_async(database.add_user_activity)
+get_active_members = _to_async(database.get_active_members)
+purge_old_activity = _to_async(database.purge_old_activity)
+
+# Lojinha
+create_shop_item = _to_async(database.create_shop_item)
+update_shop_item = _to_async(database.update_shop_item)
+delete_shop_item = _to_async(database.delete_shop_item)
+get_shop_items = _to_async(database.get_shop_items)
+get_shop_item = _to_async(database.get_shop_item)
+purchase_shop_item = _to_async(database.purchase_shop_item)
+get_user_purchases = _to_async(database.get_user_purchases)
+get_all_purchases = _to_async(database.get_all_purchases)
+update_purchase_status = _to_async(database.update_purchase_status)
+
+# Diagnóstico
+get_pool_stats = _to_async(database.get_pool_stats)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: benchmarks/bench_async_db.py - Vazão de atualizações concorrentes
+#
+# Simula N atualizações chegando ao mesmo tempo (cada uma faz as consultas de
+# um clique no jogo de filmes) e compara:
+#   - "bloqueante": chamadas diretas de database.py dentro das corrotinas,
+#     como os handlers faziam antes;
+#   - "async": as mesmas chamadas via async_database (executor dedicado).
+#
+# Requer DATABASE_URL apontando para um PostgreSQL de teste.
+# Uso: python benchmarks/bench_async_db.py [atualizacoes] [rodadas]
+
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import async_database
+
+CHAT_ID = -1000000000001
+
+async def blocking_update():
+    """Um clique no jogo de filmes com chamadas bloqueantes."""
+    database.get_active_game(CHAT_ID, "movie")
+    database.get_setting("points_per_correct_answer", "10")
+    database.get_setting("points_per_second", "1")
+    database.get_setting("max_game_duration_seconds", "300")
+    database.get_setting("retry_timeout_seconds", "5")
+
+async def async_update():
+    """O mesmo clique usando a camada assíncrona."""
+    await async_database.get_active_game(CHAT_ID, "movie")
+    await async_database.get_setting("points_per_correct_answer", "10")
+    await async_database.get_setting("points_per_second", "1")
+    await async_database.get_setting("max_game_duration_seconds", "300")
+    await async_database.get_setting("retry_timeout_seconds", "5")
+
+async def measure(update_func, updates):
+    started = time.perf_counter()
+    await asyncio.gather(*(update_func() for _ in range(updates)))
+    return time.perf_counter() - started
+
+async def loop_lag_during(update_func, updates):
+    """Maior atraso do event loop enquanto as atualizações são processadas."""
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def probe():
+        nonlocal max_lag
+        while not done.is_set():
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - expected)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    await measure(update_func, updates)
+    done.set()
+    await probe_task
+    return max_lag
+
+async def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    # Aquecer o pool de conexões
+    await measure(async_update, 20)
+
+    for name, func in (("bloqueante", blocking_update), ("async", async_update)):
+        best = min([await measure(func, updates) for _ in range(rounds)])
+        lag = await loop_lag_during(func, updates)
+        print(f"{name:>10}: {updates / best:8.1f} atualizações/s "
+              f"({best * 1000:.0f} ms para {updates}), atraso máximo do loop {lag * 1000:.0f} ms")
+
+    print(f"pool: {database.get_pool_stats()}")
+    async_database.shutdown_db_executor()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: benchmarks/bench_bingo.py - Bingo com milhares de cartelas
+#
+# Simula um jogo completo (75 sorteios) com N cartelas, verificando todas as
+# cartelas a cada sorteio, e compara:
+#   - "listas": a verificação antiga (transpor a cartela e testar cada número
+#     com ``in`` na lista de sorteados) e o sorteio com a lista de disponíveis;
+#   - "máscaras": o bingo_engine (12 ANDs por cartela, sequência embaralhada);
+#   - "índice": os vencedores apontados pelo próprio sorteio (índice invertido
+#     número -> linhas), sem varrer as cartelas.
+# A geração das cartelas únicas também é medida (a antiga compara com a lista
+# de todas as cartelas já geradas, então é limitada a 2000 cartelas).
+#
+# Uso: python benchmarks/bench_bingo.py [cartelas]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bingo_engine import BingoGame, BINGO_CARTELA_SIZE, BINGO_MAX_NUMBER, random_card
+
+LEGACY_GENERATION_LIMIT = 2000
+
+def legacy_check(cartela, drawn_numbers):
+    """check_bingo_win antes do bingo_engine."""
+    transposed = list(map(list, zip(*cartela)))
+    for i in range(BINGO_CARTELA_SIZE):
+        if all(num in drawn_numbers or num == 0 for num in transposed[i]):
+            return "linha"
+        if all(num in drawn_numbers or num == 0 for num in cartela[i]):
+            return "coluna"
+    diagonal1 = [cartela[i][i] for i in range(BINGO_CARTELA_SIZE)]
+    if all(num in drawn_numbers or num == 0 for num in diagonal1):
+        return "diagonal"
+    diagonal2 = [cartela[i][BINGO_CARTELA_SIZE - 1 - i] for i in range(BINGO_CARTELA_SIZE)]
+    if all(num in drawn_numbers or num == 0 for num in diagonal2):
+        return "diagonal"
+    return ""
+
+def legacy_generate(count):
+    cards = []
+    while len(cards) < count:
+        cartela = random_card()
+        if cartela not in cards:
+            cards.append(cartela)
+    return cards
+
+def legacy_game(cards, order):
+    drawn_numbers = []
+    results = []
+    for _ in range(BINGO_MAX_NUMBER):
+        # A lista de disponíveis era refeita a cada sorteio; aqui ela só é
+        # montada para medir o custo, e o número segue a mesma sequência
+        available = [n for n in range(1, BINGO_MAX_NUMBER + 1) if n not in drawn_numbers]
+        assert order[len(drawn_numbers)] in available
+        drawn_numbers.append(order[len(drawn_numbers)])
+        results.append(sum(1 for cartela in cards if legacy_check(cartela, drawn_numbers)))
+    return results
+
+def index_game(bingo):
+    results = []
+    winners = 0
+    while bingo.draw() is not None:
+        winners += len(bingo.last_winners)
+        results.append(winners)
+    return results
+
+def mask_game(bingo):
+    results = []
+    cards = list(bingo.cards.values())
+    while bingo.draw() is not None:
+        drawn_mask = bingo.drawn_mask
+        results.append(sum(1 for card in cards if card.win_type(drawn_mask)))
+    return results
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"{count} cartelas")
+
+    legacy_count = min(count, LEGACY_GENERATION_LIMIT)
+    started = time.perf_counter()
+    legacy_generate(legacy_count)
+    print(f"geração (listas, {legacy_count}): {time.perf_counter() - started:.3f}s")
+
+    started = time.perf_counter()
+    bingo = BingoGame()
+    for user_id in range(count):
+        bingo.add_card(user_id)
+    print(f"geração (máscaras, {count}): {time.perf_counter() - started:.3f}s")
+
+    cards = [card.cartela for card in bingo.cards.values()]
+    order = bingo.remaining_order()
+
+    indexed = BingoGame(order)
+    for user_id, cartela in enumerate(cards):
+        indexed.add_card(user_id, cartela)
+
+    started = time.perf_counter()
+    legacy = legacy_game(cards, order)
+    legacy_elapsed = time.perf_counter() - started
+    print(f"jogo completo (listas): {legacy_elapsed:.3f}s")
+
+    started = time.perf_counter()
+    masks = mask_game(bingo)
+    mask_elapsed = time.perf_counter() - started
+    print(f"jogo completo (máscaras): {mask_elapsed:.3f}s ({legacy_elapsed / mask_elapsed:.0f}x)")
+
+    started = time.perf_counter()
+    index = index_game(indexed)
+    index_elapsed = time.perf_counter() - started
+    print(f"jogo completo (índice): {index_elapsed:.3f}s ({legacy_elapsed / index_elapsed:.0f}x)")
+
+    print(f"resultados iguais: {legacy == masks == index}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: benchmarks/bench_emoji_matcher.py - Emojis das palavras-chave dos filmes
+#
+# Percorre todos os filmes do cache do TMDb (data/tmdb_cache.sqlite3) e compara
+# o tempo de gerar os emojis das palavras-chave de cada um:
+#   - "laço": o teste de substring de cada entrada do KEYWORD_EMOJI_MAP, como
+#     generate_emoji_for_movie fazia antes;
+#   - "autômato": o KeywordEmojiMatcher, sem o cache por palavra-chave;
+#   - "autômato+cache": o KeywordEmojiMatcher como o bot usa, com o cache
+#     por palavra-chave (as palavras-chave do TMDb se repetem muito);
+#   - "pré-calculado": a codificação gravada por precompute_movie_emojis.
+# Também confere que todos produzem o mesmo resultado.
+#
+# Uso: python benchmarks/bench_emoji_matcher.py [repetições]
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.tmdb_api import KEYWORD_EMOJI_MAP, annotate_movie_emojis, _keyword_emoji_candidates
+from data.tmdb_cache import tmdb_cache
+from data.emoji_matcher import KeywordEmojiMatcher
+
+def legacy_keyword_emojis(movie):
+    """O laço antigo de generate_emoji_for_movie (só a parte das palavras-chave)."""
+    emojis = []
+    if "keywords" in movie and "keywords" in movie["keywords"]:
+        keywords = [kw["name"] for kw in movie["keywords"]["keywords"]]
+        for keyword in keywords[:3]:
+            for key, emoji in KEYWORD_EMOJI_MAP.items():
+                if key in keyword.lower() and emoji not in emojis:
+                    emojis.append(emoji)
+                    break
+    return emojis
+
+def pick(candidate_lists):
+    """Escolha feita por generate_emoji_for_movie a partir dos candidatos."""
+    emojis = []
+    for candidates in candidate_lists:
+        for emoji in candidates:
+            if emoji not in emojis:
+                emojis.append(emoji)
+                break
+    return emojis
+
+def load_catalog():
+    movies = [movie for _, movie, _ in tmdb_cache.items_with_prefix("movie_") if isinstance(movie, dict)]
+    if movies:
+        return movies
+    # Cache vazio: filmes sintéticos com palavras-chave variadas
+    rng = random.Random(42)
+    words = list(KEYWORD_EMOJI_MAP) + ["based on novel", "sequel", "new york city", "father son relationship"]
+    return [
+        {"id": movie_id, "keywords": {"keywords": [
+            {"id": i, "name": " ".join(rng.sample(words, 2))} for i in range(rng.randint(0, 12))
+        ]}}
+        for movie_id in range(5000)
+    ]
+
+def timed(label, func, movies, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        results = [func(movie) for movie in movies]
+    elapsed = time.perf_counter() - started
+    per_movie = elapsed / (rounds * len(movies)) * 1e6
+    print(f"{label:>14}: {elapsed:.3f}s ({per_movie:.2f} µs/filme)")
+    return results
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    movies = load_catalog()
+    print(f"{len(movies)} filmes, {rounds} repetições")
+
+    matcher = KeywordEmojiMatcher(KEYWORD_EMOJI_MAP)
+    def automaton(movie):
+        keywords = movie.get("keywords", {}).get("keywords", [])[:3]
+        return pick([matcher._candidates(kw["name"]) for kw in keywords])
+    def automaton_cached(movie):
+        keywords = movie.get("keywords", {}).get("keywords", [])[:3]
+        return pick([matcher.candidates(kw["name"]) for kw in keywords])
+
+    precomputed = [annotate_movie_emojis(dict(movie)) for movie in movies]
+
+    legacy = timed("laço", legacy_keyword_emojis, movies, rounds)
+    fast = timed("autômato", automaton, movies, rounds)
+    cached = timed("autômato+cache", automaton_cached, movies, rounds)
+    stored = timed("pré-calculado", lambda movie: pick(_keyword_emoji_candidates(movie)), precomputed, rounds)
+
+    mismatches = sum(1 for a, b, c, d in zip(legacy, fast, cached, stored) if not a == b == c == d)
+    print(f"divergências: {mismatches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: benchmarks/fake_tmdb_server.py - Servidor TMDb falso para testes locais
+#
+# Responde /movie/popular, /movie/<id> e /genre/movie/list com dados gerados
+# (ou com os filmes de data/movie_cache.json, se existir), com latência e
+# taxa de falhas configuráveis, para exercitar timeouts e retentativas do
+# cliente em data/tmdb_client.py sem acessar a API real.
+#
+# Uso como processo:
+#   python benchmarks/fake_tmdb_server.py --port 8765 --latency 0.2 --fail-rate 0.1
+#   TMDB_API_URL=http://127.0.0.1:8765/3 TMDB_API_KEY=fake python main.py
+#
+# Uso dentro de outro script (ou dos testes em tests/test_tmdb_client.py):
+#   server, base_url = start_fake_tmdb_server(latency=0.1)
+#   ...
+#   server.shutdown()
+#
+# O parâmetro script define as próximas respostas, uma por requisição, antes
+# do comportamento normal: {"status": 503}, {"status": 429, "retry_after": "1"}
+# ou {"delay": 2.0} (responde normalmente, mas só depois do atraso).
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "movie_cache.json")
+
+GENRES = [
+    {"id": 28, "name": "Ação"}, {"id": 12, "name": "Aventura"}, {"id": 16, "name": "Animação"},
+    {"id": 35, "name": "Comédia"}, {"id": 80, "name": "Crime"}, {"id": 18, "name": "Drama"},
+    {"id": 14, "name": "Fantasia"}, {"id": 27, "name": "Terror"}, {"id": 878, "name": "Ficção científica"},
+]
+KEYWORDS = ["alien", "robot", "space", "ocean", "love", "revenge", "magic", "car", "school", "dragon"]
+
+
+def _synthetic_movie(movie_id: int) -> dict:
+    rng = random.Random(movie_id)
+    return {
+        "id": movie_id,
+        "title": f"Filme {movie_id}",
+        "overview": f"Sinopse do filme {movie_id}.",
+        "popularity": round(rng.uniform(10, 1000), 3),
+        "poster_path": f"/poster{movie_id}.jpg",
+        "genre_ids": [genre["id"] for genre in rng.sample(GENRES, 2)],
+    }
+
+
+def load_movies() -> dict:
+    """Filmes servidos, por id: os do cache local ou 60 filmes sintéticos."""
+    movies = {}
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            cache = json.load(f)
+        for key, value in cache.items():
+            if key.startswith("popular_page_"):
+                for movie in value.get("results", []):
+                    movies[movie["id"]] = movie
+    except (OSError, ValueError):
+        pass
+    if not movies:
+        movies = {movie_id: _synthetic_movie(movie_id) for movie_id in range(1000, 1060)}
+    return movies
+
+
+class FakeTMDbHandler(BaseHTTPRequestHandler):
+    movies: dict = {}
+    latency = 0.0
+    fail_rate = 0.0
+    page_size = 20
+    # Respostas roteirizadas ainda não usadas e caminhos já pedidos
+    script: list = []
+    paths: list = []
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: dict = None) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        path = re.sub(r"^/3", "", url.path)
+
+        with self.lock:
+            self.paths.append(path)
+            step = self.script.pop(0) if self.script else {}
+        if step.get("delay"):
+            time.sleep(step["delay"])
+        if step.get("status"):
+            headers = {"Retry-After": step["retry_after"]} if "retry_after" in step else None
+            return self._send(step["status"], {"status_message": "Scripted"}, headers)
+
+        if self.latency:
+            time.sleep(self.latency)
+        if not params.get("api_key"):
+            return self._send(401, {"status_message": "Invalid API key"})
+        if random.random() < self.fail_rate:
+            if random.random() < 0.5:
+                return self._send(429, {"status_message": "Rate limit"}, {"Retry-After": "0"})
+            return self._send(503, {"status_message": "Unavailable"})
+
+        ordered = sorted(self.movies.values(), key=lambda movie: -movie.get("popularity", 0))
+        if path == "/movie/popular":
+            page = int(params.get("page", ["1"])[0])
+            start = (page - 1) * self.page_size
+            results = ordered[start:start + self.page_size]
+            total_pages = max(1, -(-len(ordered) // self.page_size))
+            return self._send(200, {"page": page, "results": results, "total_pages": total_pages})
+
+        if path == "/genre/movie/list":
+            return self._send(200, {"genres": GENRES})
+
+        match = re.fullmatch(r"/movie/(\d+)", path)
+        if match and int(match.group(1)) in self.movies:
+            movie = dict(self.movies[int(match.group(1))])
+            movie["genres"] = [g for g in GENRES if g["id"] in movie.get("genre_ids", [])]
+            rng = random.Random(movie["id"])
+            movie["keywords"] = {"keywords": [{"id": i, "name": name} for i, name in enumerate(rng.sample(KEYWORDS, 3))]}
+            movie["credits"] = {"cast": [], "crew": []}
+            return self._send(200, movie)
+
+        return self._send(404, {"status_message": "Not found"})
+
+
+def start_fake_tmdb_server(port: int = 0, latency: float = 0.0, fail_rate: float = 0.0, script: list = None):
+    """Iniciar o servidor em uma thread. Retorna (servidor, URL base no formato de TMDB_API_URL).
+
+    Os caminhos pedidos ficam em ``server.RequestHandlerClass.paths``.
+    """
+    handler = type("Handler", (FakeTMDbHandler,), {
+        "movies": load_movies(),
+        "latency": latency,
+        "fail_rate": fail_rate,
+        "script": list(script or []),
+        "paths": [],
+        "lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, name="fake-tmdb", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/3"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor TMDb falso")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="atraso de cada resposta (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fração de respostas 429/503")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_tmdb_server(args.port, args.latency, args.fail_rate)
+    print(f"TMDb falso em {base_url} ({len(server.RequestHandlerClass.movies)} filmes)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: bingo_engine.py - Cartelas e sorteio do Bingo com máscaras de bits
+#
+# Os números sorteados de um jogo são um inteiro de 75 bits (bit n-1 ligado
+# quando o número n saiu). Cada cartela guarda as máscaras das suas 12 linhas
+# (5 linhas, 5 colunas e 2 diagonais; o espaço livre do centro não entra em
+# nenhuma), então verificar se ela fez Bingo são 12 operações AND. O sorteio
+# retira números de uma sequência embaralhada no início do jogo.
+#
+# Para descobrir os vencedores a cada sorteio sem varrer todas as cartelas, o
+# jogo mantém um índice invertido número -> (cartela, linha) e quantos números
+# faltam em cada linha. Um sorteio só visita as linhas que contêm o número
+# sorteado (cerca de 1/15 das cartelas, em até 3 linhas cada).
+#
+# A cartela continua no formato usado pelos handlers: uma lista de 5 colunas
+# (B, I, N, G, O) com 5 números cada e 0 no centro. Para gravar, ela é
+# empacotada em 24 bytes (um por número, coluna a coluna, sem o centro).
+
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+BINGO_CARTELA_SIZE = 5  # Cartela 5x5
+BINGO_MAX_NUMBER = 75   # Números de 1 a 75
+
+# Faixa de números de cada coluna (B, I, N, G, O)
+COLUMN_RANGES = [(1, 15), (16, 30), (31, 45), (46, 60), (61, 75)]
+
+
+def number_bit(number: int) -> int:
+    """Bit do número (o espaço livre, 0, não tem bit)."""
+    return 1 << (number - 1) if number else 0
+
+
+def numbers_mask(numbers: Iterable[int]) -> int:
+    mask = 0
+    for number in numbers:
+        mask |= number_bit(number)
+    return mask
+
+
+def mask_numbers(mask: int) -> List[int]:
+    """Números presentes em uma máscara, em ordem crescente."""
+    return [number for number in range(1, BINGO_MAX_NUMBER + 1) if mask >> (number - 1) & 1]
+
+
+def card_lines(cartela: Sequence[Sequence[int]]) -> List[Tuple[str, int]]:
+    """As 12 linhas da cartela como (tipo, máscara).
+
+    A ordem é a da verificação antiga: linha i, coluna i (i = 0..4) e depois
+    as duas diagonais.
+    """
+    size = len(cartela)
+    lines = []
+    for i in range(size):
+        lines.append(("linha", numbers_mask(cartela[col][i] for col in range(size))))
+        lines.append(("coluna", numbers_mask(cartela[i])))
+    lines.append(("diagonal", numbers_mask(cartela[i][i] for i in range(size))))
+    lines.append(("diagonal", numbers_mask(cartela[i][size - 1 - i] for i in range(size))))
+    return lines
+
+
+def card_key(cartela: Sequence[Sequence[int]]) -> Tuple[int, ...]:
+    """Chave imutável da cartela, para detectar cartelas repetidas."""
+    return tuple(number for column in cartela for number in column)
+
+
+def pack_card(cartela: Sequence[Sequence[int]]) -> bytes:
+    """Cartela em 24 bytes (o centro livre não é gravado)."""
+    middle = BINGO_CARTELA_SIZE // 2
+    return bytes(
+        number for col, column in enumerate(cartela) for row, number in enumerate(column)
+        if (col, row) != (middle, middle)
+    )
+
+
+def unpack_card(data: bytes) -> List[List[int]]:
+    """Cartela gravada por ``pack_card``."""
+    numbers = list(bytes(data))
+    middle = BINGO_CARTELA_SIZE // 2
+    numbers.insert(middle * BINGO_CARTELA_SIZE + middle, 0)
+    return [numbers[i:i + BINGO_CARTELA_SIZE] for i in range(0, len(numbers), BINGO_CARTELA_SIZE)]
+
+
+def random_card(rng: random.Random = random) -> List[List[int]]:
+    """Uma cartela aleatória (lista de colunas, com 0 no centro)."""
+    cartela = [rng.sample(range(low, high + 1), BINGO_CARTELA_SIZE) for low, high in COLUMN_RANGES]
+    middle = BINGO_CARTELA_SIZE // 2
+    cartela[middle][middle] = 0
+    return cartela
+
+
+def new_draw_order(rng: random.Random = random, exclude_mask: int = 0) -> List[int]:
+    """Sequência embaralhada dos números ainda não sorteados."""
+    order = [number for number in range(1, BINGO_MAX_NUMBER + 1) if not exclude_mask & number_bit(number)]
+    rng.shuffle(order)
+    return order
+
+
+class BingoCard:
+    """Cartela com as máscaras das 12 linhas pré-calculadas."""
+
+    __slots__ = ("cartela", "lines", "mask", "missing", "won")
+
+    def __init__(self, cartela: Sequence[Sequence[int]]):
+        self.cartela = cartela
+        self.lines = card_lines(cartela)
+        self.mask = numbers_mask(card_key(cartela))
+        # Números ainda não sorteados de cada linha (mantido pelo BingoGame)
+        self.missing = [bin(line_mask).count("1") for _, line_mask in self.lines]
+        self.won = False
+
+    def win_type(self, drawn_mask: int) -> str:
+        """Tipo da primeira linha completa ("linha", "coluna", "diagonal") ou ""."""
+        for kind, line_mask in self.lines:
+            if line_mask & drawn_mask == line_mask:
+                return kind
+        return ""
+
+
+class BingoGame:
+    """Cartelas e sorteio de um jogo de Bingo em memória."""
+
+    def __init__(self, draw_order: Optional[Sequence[int]] = None, drawn_numbers: Sequence[int] = (),
+                 rng: random.Random = random):
+        self.rng = rng
+        self.cards: Dict[str, BingoCard] = {}
+        self._card_keys: Set[Tuple[int, ...]] = set()
+        # número -> [(id do participante, índice da linha)]
+        self._number_lines: Dict[int, List[Tuple[str, int]]] = {}
+        # Vencedores revelados pelo último sorteio: [(id do participante, tipo)]
+        self.last_winners: List[Tuple[str, str]] = []
+        self.drawn_mask = numbers_mask(drawn_numbers)
+        self.drawn_count = len(drawn_numbers)
+        self.last_number: Optional[int] = drawn_numbers[-1] if drawn_numbers else None
+        if draw_order:
+            # Sequência salva: continuar de onde parou
+            self.draw_order = [number for number in draw_order if not self.drawn_mask & number_bit(number)]
+        else:
+            self.draw_order = new_draw_order(rng, self.drawn_mask)
+        self.draw_order.reverse()  # retirar do fim da lista é O(1)
+
+    def add_card(self, user_id, cartela: Optional[Sequence[Sequence[int]]] = None) -> Sequence[Sequence[int]]:
+        """Registrar a cartela de um participante (gera uma nova e única se ``cartela`` for None)."""
+        if cartela is None:
+            while True:
+                cartela = random_card(self.rng)
+                if card_key(cartela) not in self._card_keys:
+                    break
+        user_id = str(user_id)
+        card = BingoCard(cartela)
+        self._card_keys.add(card_key(cartela))
+        self.cards[user_id] = card
+
+        for line_index, (_, line_mask) in enumerate(card.lines):
+            card.missing[line_index] -= bin(line_mask & self.drawn_mask).count("1")
+            pending = line_mask & ~self.drawn_mask
+            while pending:
+                bit = pending & -pending
+                self._number_lines.setdefault(bit.bit_length(), []).append((user_id, line_index))
+                pending ^= bit
+        # Cartela recarregada depois de já ter completado uma linha
+        card.won = any(missing == 0 for missing in card.missing)
+        return cartela
+
+    def draw(self) -> Optional[int]:
+        """Sortear o próximo número (None quando todos já saíram)."""
+        if not self.draw_order:
+            return None
+        number = self.draw_order.pop()
+        self.drawn_mask |= number_bit(number)
+        self.drawn_count += 1
+        self.last_number = number
+
+        # Atualizar só as linhas que contêm o número
+        completed: Dict[str, int] = {}
+        for user_id, line_index in self._number_lines.pop(number, ()):
+            card = self.cards[user_id]
+            card.missing[line_index] -= 1
+            if card.missing[line_index] == 0 and not card.won:
+                completed[user_id] = min(line_index, completed.get(user_id, line_index))
+        self.last_winners = []
+        for user_id, line_index in completed.items():
+            card = self.cards[user_id]
+            card.won = True
+            self.last_winners.append((user_id, card.lines[line_index][0]))
+        return number
+
+    def drawn_numbers(self) -> List[int]:
+        """Números já sorteados, em ordem crescente."""
+        return mask_numbers(self.drawn_mask)
+
+    def remaining_order(self) -> List[int]:
+        """Números ainda não sorteados, na ordem em que vão sair."""
+        return self.draw_order[::-1]
+
+    def win_type(self, user_id) -> str:
+        card = self.cards.get(str(user_id))
+        return card.win_type(self.drawn_mask) if card else ""
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: data/catalog.py - Catálogos de conteúdo dos jogos em arquivos JSONL
+#
+# Perguntas do quiz, sequências de emoji, mímicas e filmes locais ficam em
+# data/catalogs/*.jsonl, um item por linha. O arquivo só é lido no primeiro
+# acesso: uma passada guarda a posição (em bytes) de cada linha e monta os
+# índices por id e pelos campos pedidos (categoria, dificuldade...). O
+# conteúdo fica em memória como um único bloco de bytes e cada item é
+# decodificado da sua linha só quando usado, então catálogos com milhares de
+# itens não ocupam memória com objetos Python.
+#
+# Se o arquivo mudar (data de modificação ou tamanho), o catálogo é
+# recarregado no próximo acesso, sem reiniciar o bot. A verificação é feita
+# no máximo a cada CATALOG_RELOAD_SECONDS. Cada carga gera um snapshot
+# imutável (bytes, posições e índices) trocado de uma só vez; as leituras
+# usam sempre um único snapshot, então editar o arquivo no lugar não afeta
+# quem está lendo (no máximo entrega a versão anterior até a recarga).
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+CATALOG_DIR = os.environ.get(
+    "CONTENT_CATALOG_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogs")
+)
+CATALOG_RELOAD_SECONDS = float(os.environ.get("CATALOG_RELOAD_SECONDS", "30"))
+
+
+class _Snapshot:
+    """Conteúdo de uma carga do arquivo: bytes, posição de cada linha e índices."""
+
+    __slots__ = ("buffer", "offsets", "by_id", "indexes")
+
+    def __init__(self, buffer: bytes = b"", offsets: Sequence[int] = (), by_id: Optional[Dict] = None,
+                 indexes: Optional[Dict[str, Dict[Any, List[int]]]] = None):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.by_id = by_id or {}
+        self.indexes = indexes or {}
+
+    def read(self, position: int) -> Dict:
+        start = self.offsets[position]
+        end = self.buffer.find(b"\n", start)
+        return json.loads(self.buffer[start:end if end != -1 else len(self.buffer)])
+
+
+class ContentCatalog(Sequence):
+    """Lista de itens de um arquivo JSONL, com índices por id e por campo.
+
+    Funciona como uma sequência (``len``, ``catalog[i]``, iteração), então
+    pode ser usada diretamente pelo deck_dealer e por ``random.choice``.
+    """
+
+    def __init__(self, name: str, indexed_fields: Sequence[str] = ()):
+        self.name = name
+        self.path = os.path.join(CATALOG_DIR, f"{name}.jsonl")
+        self.indexed_fields = tuple(indexed_fields)
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot(indexes={field: {} for field in self.indexed_fields})
+        self._signature = None
+        self._checked_at = 0.0
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _current(self) -> _Snapshot:
+        """Snapshot atual, recarregando o arquivo se ele mudou."""
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < CATALOG_RELOAD_SECONDS:
+            return self._snapshot
+        with self._lock:
+            if self._signature is None or now - self._checked_at >= CATALOG_RELOAD_SECONDS:
+                self._checked_at = now
+                signature = self._file_signature()
+                if signature is not None and signature != self._signature:
+                    self._load(signature)
+            return self._snapshot
+
+    def _load(self, signature) -> None:
+        """Ler o arquivo e montar um novo snapshot (com o lock adquirido)."""
+        offsets: List[int] = []
+        by_id: Dict[Any, int] = {}
+        indexes: Dict[str, Dict[Any, List[int]]] = {field: defaultdict(list) for field in self.indexed_fields}
+
+        with open(self.path, "rb") as f:
+            buffer = f.read()
+
+        start = 0
+        size = len(buffer)
+        while start < size:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                end = size
+            line = buffer[start:end].strip()
+            if line:
+                try:
+                    item = json.loads(line)
+                except ValueError as e:
+                    logger.error(f"Catálogo {self.name}: linha inválida no byte {start}: {e}")
+                else:
+                    position = len(offsets)
+                    offsets.append(start)
+                    if "id" in item:
+                        by_id.setdefault(item["id"], position)
+                    for field in self.indexed_fields:
+                        if field in item:
+                            indexes[field][item[field]].append(position)
+            start = end + 1
+
+        # Uma única atribuição: quem já pegou o snapshot anterior continua lendo dele
+        self._snapshot = _Snapshot(buffer, tuple(offsets), by_id,
+                                   {field: dict(index) for field, index in indexes.items()})
+        reloaded = self._signature is not None
+        self._signature = signature
+        logger.info(f"Catálogo {self.name} {'recarregado' if reloaded else 'carregado'}: {len(offsets)} itens")
+
+    def reload(self) -> None:
+        """Forçar a releitura do arquivo no próximo acesso."""
+        with self._lock:
+            self._signature = None
+            self._checked_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._current().offsets)
+
+    def __getitem__(self, position):
+        snapshot = self._current()
+        if isinstance(position, slice):
+            return [snapshot.read(i) for i in range(*position.indices(len(snapshot.offsets)))]
+        return snapshot.read(position)
+
+    def __iter__(self) -> Iterator[Dict]:
+        snapshot = self._current()
+        for position in range(len(snapshot.offsets)):
+            yield snapshot.read(position)
+
+    def get(self, item_id) -> Optional[Dict]:
+        """Item pelo id, ou None."""
+        snapshot = self._current()
+        position = snapshot.by_id.get(item_id)
+        return snapshot.read(position) if position is not None else None
+
+    def values(self, field: str) -> List:
+        """Valores distintos de um campo indexado (ex.: categorias)."""
+        return list(self._current().indexes[field])
+
+    def find(self, field: str, value) -> List[Dict]:
+        """Todos os itens com ``field == value`` (campo indexado)."""
+        snapshot = self._current()
+        return [snapshot.read(position) for position in snapshot.indexes[field].get(value, ())]
+
+    def sample(self, k: int, exclude=None, **filters) -> List[Dict]:
+        """Até ``k`` itens aleatórios distintos, opcionalmente filtrados por um campo indexado.
+
+        ``exclude`` descarta os itens para os quais retorna verdadeiro (ex.: a
+        resposta certa ao montar opções).
+        """
+        snapshot = self._current()
+        if filters:
+            (field, value), = filters.items()
+            positions = snapshot.indexes[field].get(value, [])
+        else:
+            positions = range(len(snapshot.offsets))
+        if exclude is None:
+            return [snapshot.read(position) for position in random.sample(positions, min(len(positions), k))]
+
+        # Percorrer todas as posições em ordem aleatória até juntar k itens,
+        # já que ``exclude`` pode descartar mais de um
+        chosen = []
+        for position in random.sample(positions, len(positions)):
+            if len(chosen) >= k:
+                break
+            item = snapshot.read(position)
+            if not exclude(item):
+                chosen.append(item)
+        return chosen
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: data/distractor_index.py - Opções erradas parecidas com o filme certo
+#
+# Para montar as opções do jogo de filmes, o bot percorria duas páginas de
+# populares a cada jogo e sorteava títulos quaisquer. O
+# DistractorIndex guarda os filmes conhecidos em grupos por (gênero, faixa de
+# popularidade) e, para cada filme, a lista dos mais parecidos (mais gêneros
+# em comum, popularidade próxima), procurados nas faixas vizinhas e, se
+# faltarem, em faixas cada vez mais distantes. Montar as opções vira um
+# sorteio nessa lista. Filmes novos entram no índice conforme chegam ao cache
+# e só invalidam as listas que poderiam incluí-los.
+
+import math
+import random
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Quantos distratores guardar por filme (as opções são sorteadas entre eles)
+DISTRACTORS_PER_MOVIE = 12
+
+
+def popularity_band(popularity: float) -> int:
+    """Faixa de popularidade em escala logarítmica (cada faixa dobra a anterior)."""
+    return int(math.log2(max(popularity or 0, 1)))
+
+
+def movie_genre_ids(movie: Dict) -> Tuple[int, ...]:
+    """Gêneros do filme, tanto no formato da lista de populares quanto no de detalhes.
+
+    Os dois formatos listam os gêneros em ordem diferente; a tupla ordenada
+    faz o mesmo filme gerar a mesma entrada no índice.
+    """
+    if "genre_ids" in movie:
+        return tuple(sorted(movie["genre_ids"]))
+    return tuple(sorted(genre["id"] for genre in movie.get("genres", [])))
+
+
+class DistractorIndex:
+    """Índice de filmes parecidos, atualizado incrementalmente."""
+
+    def __init__(self, per_movie: int = DISTRACTORS_PER_MOVIE):
+        self.per_movie = per_movie
+        # id -> (título, gêneros, faixa de popularidade)
+        self._movies: Dict[int, Tuple[str, Tuple[int, ...], int]] = {}
+        self._buckets: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self._distractors: Dict[int, List[int]] = {}
+        # Distância máxima de faixa examinada ao montar cada lista
+        self._radius: Dict[int, float] = {}
+        # gênero -> faixas que têm filmes desse gênero
+        self._bands: Dict[int, Set[int]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._movies)
+
+    def __contains__(self, movie_id: int) -> bool:
+        return movie_id in self._movies
+
+    @staticmethod
+    def _bucket_keys(genres: Tuple[int, ...], band: int) -> List[Tuple[int, int]]:
+        return [(genre, band) for genre in genres or (0,)]
+
+    def _ids_at_distance(self, genres: Tuple[int, ...], band: int, distance: int) -> Set[int]:
+        ids = set()
+        for genre in genres or (0,):
+            for neighbor_band in {band - distance, band + distance}:
+                ids |= self._buckets.get((genre, neighbor_band), set())
+        return ids
+
+    def add_movies(self, movies: Iterable[Dict]) -> int:
+        """Adicionar (ou atualizar) filmes. Retorna quantos mudaram o índice."""
+        changed = 0
+        with self._lock:
+            for movie in movies:
+                if not movie.get("id") or not movie.get("title"):
+                    continue
+                entry = (movie["title"], movie_genre_ids(movie), popularity_band(movie.get("popularity", 0)))
+                old = self._movies.get(movie["id"])
+                if old == entry:
+                    continue
+                if old is not None:
+                    for key in self._bucket_keys(old[1], old[2]):
+                        self._buckets[key].discard(movie["id"])
+                    self._invalidate(old[1], old[2])
+                self._movies[movie["id"]] = entry
+                for key in self._bucket_keys(entry[1], entry[2]):
+                    self._buckets[key].add(movie["id"])
+                    self._bands[key[0]].add(key[1])
+                self._invalidate(entry[1], entry[2])
+                self._distractors.pop(movie["id"], None)
+                self._radius.pop(movie["id"], None)
+                changed += 1
+        return changed
+
+    def _invalidate(self, genres: Tuple[int, ...], band: int) -> None:
+        # O filme muda as listas dos filmes do mesmo gênero que examinaram
+        # a faixa dele
+        for genre in genres or (0,):
+            for other_band in self._bands[genre]:
+                distance = abs(other_band - band)
+                for movie_id in self._buckets.get((genre, other_band), ()):
+                    if self._radius.get(movie_id, -1) >= distance:
+                        self._distractors.pop(movie_id, None)
+                        del self._radius[movie_id]
+
+    def _compute(self, movie_id: int) -> List[int]:
+        title, genres, band = self._movies[movie_id]
+        genre_set = set(genres)
+        max_distance = max((abs(b - band) for genre in genres or (0,) for b in self._bands[genre]), default=0)
+
+        # Ampliar a busca faixa a faixa até ter distratores suficientes.
+        # Títulos repetidos (refilmagens) ficam com o filme mais parecido.
+        best: Dict[str, Tuple[int, int, int]] = {}
+        distance = 0
+        for distance in range(max_distance + 1):
+            for other_id in self._ids_at_distance(genres, band, distance):
+                other_title, other_genres, _ = self._movies[other_id]
+                if other_id == movie_id or other_title == title:
+                    continue
+                score = (-len(genre_set.intersection(other_genres)), distance, other_id)
+                if other_title not in best or score < best[other_title]:
+                    best[other_title] = score
+            if len(best) >= self.per_movie:
+                break
+        else:
+            # Lista incompleta: qualquer filme novo do mesmo gênero pode entrar
+            distance = math.inf
+        self._radius[movie_id] = distance
+
+        return [other_id for _, _, other_id in sorted(best.values())[:self.per_movie]]
+
+    def distractors(self, movie_id: int) -> List[str]:
+        """Títulos dos filmes mais parecidos com ``movie_id``, do mais ao menos parecido."""
+        with self._lock:
+            if movie_id not in self._movies:
+                return []
+            distractors = self._distractors.get(movie_id)
+            if distractors is None:
+                distractors = self._distractors[movie_id] = self._compute(movie_id)
+            return [self._movies[other_id][0] for other_id in distractors]
+
+    def options(self, movie: Dict, num_options: int = 4) -> Optional[List[str]]:
+        """Opções de resposta (embaralhadas, com o título certo) ou None se faltarem distratores."""
+        # Filmes já indexados não são regravados: a popularidade dos detalhes
+        # pode cair em outra faixa e invalidaria as listas a cada jogo
+        if movie["id"] not in self:
+            self.add_movies([movie])
+        candidates = self.distractors(movie["id"])
+        if len(candidates) < num_options - 1:
+            return None
+        options = random.sample(candidates, num_options - 1)
+        options.append(movie["title"])
+        random.shuffle(options)
+        return options
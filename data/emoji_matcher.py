@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: data/emoji_matcher.py - Busca de palavras-chave em um único passo
+#
+# generate_emoji_for_movie testava cada entrada do KEYWORD_EMOJI_MAP como
+# substring de cada palavra-chave do TMDb. O KeywordEmojiMatcher monta uma
+# única vez um autômato Aho–Corasick com todas as chaves do mapa e encontra
+# todas as chaves contidas em uma palavra-chave percorrendo-a uma vez só.
+
+import hashlib
+import json
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+
+class KeywordEmojiMatcher:
+    """Encontra os emojis cujas chaves aparecem dentro de um texto.
+
+    A ordem do resultado segue a ordem das chaves no mapa, como no laço
+    antigo: o primeiro emoji da lista é o que o laço teria escolhido.
+    """
+
+    def __init__(self, mapping: Dict[str, str]):
+        self.keys: List[str] = [key.lower() for key in mapping]
+        self.emojis: List[str] = list(mapping.values())
+        # Identifica o mapa usado, para invalidar codificações pré-calculadas
+        self.version = hashlib.sha1(
+            json.dumps(list(mapping.items()), ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:12]
+
+        # Autômato: transições, links de falha e chaves que terminam em cada estado
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for index, key in enumerate(self.keys):
+            self._add_key(key, index)
+        self._build_failure_links()
+
+        self.candidates = lru_cache(maxsize=4096)(self._candidates)
+
+    def _add_key(self, key: str, index: int) -> None:
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Herdar as chaves que terminam no estado de falha (sufixos)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def match(self, text: str) -> List[int]:
+        """Índices (em ordem do mapa) das chaves contidas em ``text``."""
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._output[state]:
+                found.update(self._output[state])
+        return sorted(found)
+
+    def _candidates(self, keyword: str) -> Tuple[str, ...]:
+        """Emojis possíveis para uma palavra-chave, em ordem de preferência e sem repetição."""
+        candidates = []
+        for index in self.match(keyword):
+            emoji = self.emojis[index]
+            if emoji not in candidates:
+                candidates.append(emoji)
+        return tuple(candidates)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: data/movie_prefetch.py - Fila de jogos de filme já preparados
+#
+# Preparar um filme do TMDb (página popular, detalhes, emojis e opções) leva
+# algumas requisições. Uma tarefa em segundo plano mantém uma fila de filmes
+# prontos (no idioma do tmdb_client) e o start_movie_game só retira o primeiro
+# que ainda não foi usado no chat. Quando a fila fica abaixo do limite de reposição, a
+# tarefa volta a completá-la.
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Set as AbstractSet
+from typing import Deque, Dict, Iterable, Optional
+
+from data.tmdb_api import get_tmdb_movie_puzzle, get_tmdb_api_key
+
+logger = logging.getLogger(__name__)
+
+# Tamanho desejado da fila e limite abaixo do qual ela é reposta
+PREFETCH_TARGET_SIZE = int(os.environ.get("MOVIE_PREFETCH_SIZE", "12"))
+PREFETCH_REFILL_THRESHOLD = int(os.environ.get("MOVIE_PREFETCH_REFILL_AT", "4"))
+# Filmes preparados em paralelo durante a reposição
+PREFETCH_CONCURRENCY = 3
+# Preparações por vaga da fila em cada reposição (duplicados gastam tentativas)
+PREFETCH_ATTEMPTS_PER_SLOT = 3
+# Intervalo de verificação mesmo sem consumo (para repor após falhas)
+PREFETCH_IDLE_SECONDS = 60
+
+
+class MoviePuzzlePrefetcher:
+    """Mantém uma fila de filmes prontos para o jogo."""
+
+    def __init__(self, target_size: int = PREFETCH_TARGET_SIZE,
+                 refill_threshold: int = PREFETCH_REFILL_THRESHOLD,
+                 concurrency: int = PREFETCH_CONCURRENCY):
+        self.target_size = target_size
+        self.refill_threshold = refill_threshold
+        self.concurrency = concurrency
+        self._queue: Deque[dict] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "served": 0,
+            "misses": 0,
+            "refills": 0,
+            "prepared": 0,
+            "failures": 0,
+            "last_refill_seconds": 0.0,
+            "max_refill_seconds": 0.0,
+            "total_refill_seconds": 0.0,
+        }
+
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def get(self, exclude_ids: Iterable[str] = ()) -> Optional[dict]:
+        """Retirar da fila o primeiro filme que não esteja em ``exclude_ids``."""
+        queue = self._queue
+        # Conjuntos (como a janela de seen_content) são usados sem copiar
+        if not isinstance(exclude_ids, AbstractSet):
+            exclude_ids = set(exclude_ids)
+        puzzle = None
+        for index, candidate in enumerate(queue):
+            if str(candidate["id"]) not in exclude_ids:
+                puzzle = candidate
+                del queue[index]
+                break
+
+        if puzzle:
+            self._stats["served"] += 1
+        else:
+            self._stats["misses"] += 1
+        if len(queue) < self.refill_threshold:
+            self.request_refill()
+        return puzzle
+
+    def request_refill(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _prepare(self, queued_ids) -> Optional[dict]:
+        try:
+            return await get_tmdb_movie_puzzle(queued_ids)
+        except Exception as e:
+            self._stats["failures"] += 1
+            logger.error(f"Erro ao preparar filme para a fila: {e}")
+            return None
+
+    async def refill(self) -> int:
+        """Completar a fila até o tamanho desejado."""
+        queue = self._queue
+        started = time.monotonic()
+        added = 0
+        attempts_left = self.target_size * PREFETCH_ATTEMPTS_PER_SLOT
+        while len(queue) < self.target_size and attempts_left > 0:
+            batch = min(self.target_size - len(queue), self.concurrency, attempts_left)
+            attempts_left -= batch
+            queued_ids = {str(puzzle["id"]) for puzzle in queue}
+            results = await asyncio.gather(*[self._prepare(queued_ids) for _ in range(batch)])
+            if not any(results):
+                # TMDb fora do ar ou sem filmes novos: tentar de novo na próxima rodada
+                break
+            # Preparações paralelas podem escolher o mesmo filme; as repetidas
+            # só gastam tentativas
+            for puzzle in results:
+                if puzzle and str(puzzle["id"]) not in queued_ids and len(queue) < self.target_size:
+                    queue.append(puzzle)
+                    queued_ids.add(str(puzzle["id"]))
+                    added += 1
+
+        elapsed = time.monotonic() - started
+        self._stats["refills"] += 1
+        self._stats["prepared"] += added
+        self._stats["last_refill_seconds"] = elapsed
+        self._stats["total_refill_seconds"] += elapsed
+        self._stats["max_refill_seconds"] = max(self._stats["max_refill_seconds"], elapsed)
+        logger.info(f"Fila de filmes: +{added}, {len(queue)} prontos em {elapsed:.2f}s")
+        return added
+
+    async def _run(self) -> None:
+        while True:
+            if get_tmdb_api_key() and len(self._queue) < self.target_size:
+                await self.refill()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), PREFETCH_IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Iniciar a tarefa de reposição (dentro do event loop do bot)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats["queue_depth"] = len(self._queue)
+        refills = stats["refills"]
+        stats["avg_refill_seconds"] = stats["total_refill_seconds"] / refills if refills else 0.0
+        return stats
+
+# Instância compartilhada
+movie_prefetcher = MoviePuzzlePrefetcher()
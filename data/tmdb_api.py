@@ -3,22 +3,45 @@
 # Arquivo: data/tmdb_api.py - Integração com a API do TMDb
 
 import os
-import requests
+import time
 import random
-import json
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import argparse
+import threading
+from collections.abc import Set as AbstractSet
+from typing import Dict, Iterable, List, Optional
+
+from data.tmdb_client import tmdb_client
+# Cache local (SQLite) para diminuir o número de requisições à API
+from data.tmdb_cache import tmdb_cache, TMDbCache
+from data.emoji_matcher import KeywordEmojiMatcher
+from data.distractor_index import DistractorIndex
+from utils.ttl_cache import TTLCache
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# URL base da API
-TMDB_API_URL = "https://api.themoviedb.org/3"
+# Camada em memória na frente do cache em disco: páginas populares, detalhes
+# e gêneros já usados não voltam ao SQLite a cada jogo, e vários chats
+# pedindo a mesma página ao mesmo tempo geram uma única busca
+TMDB_MEMORY_CACHE_MB = int(os.environ.get("TMDB_MEMORY_CACHE_MB", "32"))
+_memory_cache = TTLCache(
+    "tmdb",
+    max_entries=2048,
+    max_bytes=TMDB_MEMORY_CACHE_MB * 1024 * 1024,
+    ttl=15 * 60
+)
+
+# Filmes parecidos entre si, para as opções erradas do jogo. É alimentado por
+# tudo que passa pelo cache em disco (páginas populares e detalhes)
+_distractor_index = DistractorIndex()
+_distractor_index_lock = threading.Lock()
 
-# Cache local para diminuir o número de requisições à API
-MOVIE_CACHE_FILE = "data/movie_cache.json"
-GENRE_CACHE_FILE = "data/genre_cache.json"
+def get_tmdb_cache_stats() -> Dict:
+    """Contadores do cache em memória do TMDb (acertos, falhas, remoções, bytes)."""
+    return _memory_cache.stats()
 
 # Dicionário de emojis por gênero de filme
 GENRE_EMOJI_MAP = {
@@ -121,128 +144,89 @@ KEYWORD_EMOJI_MAP = {
     "past": "⏳"
 }
 
-def load_cache(cache_file: str) -> dict:
-    """Carrega dados do cache local."""
+# Autômato das chaves acima, montado uma vez na importação
+_keyword_matcher = KeywordEmojiMatcher(KEYWORD_EMOJI_MAP)
+
+def _index_entry(key: str, value) -> None:
+    """Adiciona ao índice de distratores os filmes de uma entrada do cache."""
+    if not isinstance(value, dict):
+        return
+    if key.startswith("popular_page_"):
+        _distractor_index.add_movies(value.get("results", []))
+    elif key.startswith("movie_"):
+        _distractor_index.add_movies([value])
+
+def _ensure_distractor_index() -> None:
+    """Monta o índice de distratores com todo o cache em disco, na primeira vez."""
+    if _distractor_index.loaded:
+        return
+    with _distractor_index_lock:
+        if _distractor_index.loaded:
+            return
+        try:
+            for prefix in ("popular_page_", "movie_"):
+                for key, value, _ in tmdb_cache.items_with_prefix(prefix):
+                    _index_entry(key, value)
+        except Exception as e:
+            logger.error(f"Erro ao montar índice de distratores: {e}")
+        _distractor_index.loaded = True
+        logger.info(f"Índice de distratores: {len(_distractor_index)} filmes")
+
+def _cache_get(key: str, allow_expired: bool = False):
+    """Obtém uma entrada do cache em disco (None se ausente ou vencida)."""
     try:
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        value = tmdb_cache.get(key, allow_expired=allow_expired)
     except Exception as e:
-        logger.error(f"Erro ao carregar cache {cache_file}: {e}")
-    return {}
+        logger.error(f"Erro ao ler cache {key}: {e}")
+        return None
+    _index_entry(key, value)
+    return value
 
-def save_cache(cache_file: str, data: dict) -> None:
-    """Salva dados no cache local."""
+def _cache_set(key: str, value) -> None:
+    """Grava uma entrada no cache em disco."""
+    _index_entry(key, value)
     try:
-        # Cria o diretório se não existir
-        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        tmdb_cache.set(key, value)
     except Exception as e:
-        logger.error(f"Erro ao salvar cache {cache_file}: {e}")
+        logger.error(f"Erro ao salvar cache {key}: {e}")
+
+def _cached_popular_results() -> List[Dict]:
+    """Filmes da página popular mais recente do cache, mesmo vencida (quando a API falha)."""
+    try:
+        page = tmdb_cache.first_with_prefix("popular_page_")
+    except Exception as e:
+        logger.error(f"Erro ao ler cache de filmes populares: {e}")
+        return []
+    return page.get("results", []) if page else []
+
+def _stale_results(cache_key: str) -> List[Dict]:
+    """Resultados vencidos de uma página, usados quando a API não responde."""
+    stale = _cache_get(cache_key, allow_expired=True)
+    return stale.get("results", []) if stale else []
 
 def get_tmdb_api_key() -> Optional[str]:
     """Obtém a chave da API do TMDb a partir de variáveis de ambiente."""
     return os.getenv("TMDB_API_KEY")
 
-def get_movie_genres() -> List[Dict]:
-    """Obtém lista de gêneros de filmes da API ou do cache."""
-    cache = load_cache(GENRE_CACHE_FILE)
-    if cache and "genres" in cache:
-        return cache["genres"]
-    
-    api_key = get_tmdb_api_key()
-    if not api_key:
-        logger.warning("Chave da API do TMDb não configurada")
-        return []
-    
-    try:
-        response = requests.get(
-            f"{TMDB_API_URL}/genre/movie/list",
-            params={"api_key": api_key, "language": "pt-BR"}
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        # Salvar no cache
-        save_cache(GENRE_CACHE_FILE, data)
-        
-        return data.get("genres", [])
-    except Exception as e:
-        logger.error(f"Erro ao obter gêneros de filmes: {e}")
-        return []
+def encode_movie_keywords(movie: Dict) -> List[List[str]]:
+    """Emojis candidatos de cada uma das 3 primeiras palavras-chave do filme."""
+    if "keywords" in movie and "keywords" in movie["keywords"]:
+        keywords = [kw["name"] for kw in movie["keywords"]["keywords"][:3]]
+    else:
+        keywords = []
+    return [list(_keyword_matcher.candidates(keyword)) for keyword in keywords]
 
-def get_popular_movies(page: int = 1) -> List[Dict]:
-    """Obtém filmes populares da API ou do cache."""
-    cache = load_cache(MOVIE_CACHE_FILE)
-    cache_key = f"popular_page_{page}"
-    
-    if cache and cache_key in cache:
-        return cache[cache_key].get("results", [])
-    
-    api_key = get_tmdb_api_key()
-    if not api_key:
-        logger.warning("Chave da API do TMDb não configurada")
-        return []
-    
-    try:
-        response = requests.get(
-            f"{TMDB_API_URL}/movie/popular",
-            params={
-                "api_key": api_key,
-                "language": "pt-BR",
-                "page": page
-            }
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        # Salvar no cache
-        if not cache:
-            cache = {}
-        cache[cache_key] = data
-        save_cache(MOVIE_CACHE_FILE, cache)
-        
-        return data.get("results", [])
-    except Exception as e:
-        logger.error(f"Erro ao obter filmes populares: {e}")
-        return []
+def annotate_movie_emojis(movie: Dict) -> Dict:
+    """Guarda no próprio filme os emojis das palavras-chave, para não recalcular a cada jogo."""
+    movie["emoji_keywords"] = encode_movie_keywords(movie)
+    movie["emoji_keywords_version"] = _keyword_matcher.version
+    return movie
 
-def get_movie_details(movie_id: int) -> Optional[Dict]:
-    """Obtém detalhes de um filme específico."""
-    cache = load_cache(MOVIE_CACHE_FILE)
-    cache_key = f"movie_{movie_id}"
-    
-    if cache and cache_key in cache:
-        return cache[cache_key]
-    
-    api_key = get_tmdb_api_key()
-    if not api_key:
-        logger.warning("Chave da API do TMDb não configurada")
-        return None
-    
-    try:
-        response = requests.get(
-            f"{TMDB_API_URL}/movie/{movie_id}",
-            params={
-                "api_key": api_key,
-                "language": "pt-BR",
-                "append_to_response": "keywords,credits"
-            }
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        # Salvar no cache
-        if not cache:
-            cache = {}
-        cache[cache_key] = data
-        save_cache(MOVIE_CACHE_FILE, cache)
-        
-        return data
-    except Exception as e:
-        logger.error(f"Erro ao obter detalhes do filme {movie_id}: {e}")
-        return None
+def _keyword_emoji_candidates(movie: Dict) -> List[List[str]]:
+    # Codificações geradas com outra versão do KEYWORD_EMOJI_MAP são ignoradas
+    if movie.get("emoji_keywords_version") == _keyword_matcher.version:
+        return movie["emoji_keywords"]
+    return encode_movie_keywords(movie)
 
 def generate_emoji_for_movie(movie: Dict) -> str:
     """Gera uma representação em emoji para um filme."""
@@ -262,14 +246,13 @@ def generate_emoji_for_movie(movie: Dict) -> str:
             if emoji not in emojis:
                 emojis.append(emoji)
     
-    # Adicionar emojis baseados em palavras-chave
-    if "keywords" in movie and "keywords" in movie["keywords"]:
-        keywords = [kw["name"] for kw in movie["keywords"]["keywords"]]
-        for keyword in keywords[:3]:  # Limitar a 3 palavras-chave
-            for key, emoji in KEYWORD_EMOJI_MAP.items():
-                if key in keyword.lower() and emoji not in emojis:
-                    emojis.append(emoji)
-                    break
+    # Adicionar emojis baseados em palavras-chave (até 3, pré-calculados
+    # quando o filme veio do cache)
+    for candidates in _keyword_emoji_candidates(movie):
+        for emoji in candidates:
+            if emoji not in emojis:
+                emojis.append(emoji)
+                break
     
     # Se não conseguimos emojis suficientes, adicione alguns genéricos
     generic_emojis = ["🎬", "🍿", "🎭", "📽️", "🎞️"]
@@ -281,36 +264,22 @@ def generate_emoji_for_movie(movie: Dict) -> str:
     # Limitar a 5 emojis e juntar com espaço
     return " ".join(emojis[:5])
 
-def get_random_tmdb_movie() -> Optional[Dict]:
-    """Obtém um filme aleatório do TMDb e adiciona representação em emoji."""
-    # Tentar obter filmes da API - limitando para as primeiras 3 páginas para ter filmes mais populares
-    page = random.randint(1, 3)  # Aleatoriamente escolher entre as primeiras 3 páginas
-    movies = get_popular_movies(page)
-    
-    if not movies:
-        # Se não conseguir da API, usar o cache local
-        cache = load_cache(MOVIE_CACHE_FILE)
-        for key, value in cache.items():
-            if key.startswith("popular_page_") and "results" in value:
-                movies = value["results"]
-                break
-    
-    if not movies:
-        logger.warning("Nenhum filme encontrado no TMDb ou cache")
-        return None
-    
+def _choose_popular_movie(movies: List[Dict], exclude_ids: Iterable[str] = ()) -> Optional[Dict]:
+    """Escolhe um filme entre os mais populares (top 60%) ainda não usados."""
     # Limitar a filmes realmente populares (top 60%)
     movies_sorted = sorted(movies, key=lambda x: x.get('popularity', 0), reverse=True)
-    top_movies = movies_sorted[:int(len(movies_sorted) * 0.6)]
-    
-    # Escolher um filme aleatoriamente entre os mais populares
-    movie = random.choice(top_movies if top_movies else movies)
-    
-    # Obter detalhes completos se possível
-    movie_details = get_movie_details(movie["id"])
-    if movie_details:
-        movie = movie_details
+    top_movies = movies_sorted[:int(len(movies_sorted) * 0.6)] or movies_sorted
     
+    # Conjuntos (como a janela de seen_content) são usados sem copiar
+    if not isinstance(exclude_ids, AbstractSet):
+        exclude_ids = set(exclude_ids)
+    candidates = [movie for movie in top_movies if str(movie["id"]) not in exclude_ids]
+    if not candidates:
+        return None
+    return random.choice(candidates)
+
+def _build_movie_data(movie: Dict) -> Dict:
+    """Monta os dados do jogo (emojis, poster, sinopse) a partir de um filme."""
     # Gerar emojis para o filme
     emoji = generate_emoji_for_movie(movie)
     
@@ -329,36 +298,133 @@ def get_random_tmdb_movie() -> Optional[Dict]:
         "popularity": movie.get("popularity", 0)
     }
 
-def get_movie_options_tmdb(correct_movie_id: int, num_options: int = 4) -> List[str]:
-    """Obtém opções de resposta para um filme específico."""
-    # Obter detalhes do filme correto
-    correct_movie = get_movie_details(correct_movie_id)
-    if not correct_movie:
-        return []
-    
-    correct_title = correct_movie["title"]
-    other_titles = []
+def _build_options(correct_movie_id: int, correct_title: str, movie_lists: Iterable[List[Dict]],
+                   num_options: int = 4) -> List[str]:
+    """Monta as opções de resposta: o título correto e outros títulos populares.
     
-    # Obter filmes populares para opções
-    for page in range(1, 3):  # Tentar as primeiras 2 páginas
-        movies = get_popular_movies(page)
-        for movie in movies:
-            if movie["id"] != correct_movie_id and movie["title"] not in other_titles:
-                other_titles.append(movie["title"])
-    
-    # Se não tivermos opções suficientes, usar o cache
-    if len(other_titles) < num_options - 1:
-        cache = load_cache(MOVIE_CACHE_FILE)
-        for key, value in cache.items():
-            if key.startswith("popular_page_") and "results" in value:
-                for movie in value["results"]:
-                    if movie["id"] != correct_movie_id and movie["title"] not in other_titles:
-                        other_titles.append(movie["title"])
+    Usado quando o índice de distratores ainda não tem filmes parecidos o bastante.
+    """
+    other_titles = {
+        movie["title"]
+        for movies in movie_lists
+        for movie in movies
+        if movie["id"] != correct_movie_id and movie["title"] != correct_title
+    }
     
     # Misturar e pegar apenas o número necessário
+    other_titles = list(other_titles)
     random.shuffle(other_titles)
     options = other_titles[:num_options-1]
     options.append(correct_title)
     random.shuffle(options)
     
-    return options
\ No newline at end of file
+    return options
+
+# Acesso à API: todas as requisições passam pelo cliente httpx compartilhado
+# (data/tmdb_client.py, com tempo limite e retentativas) e o acesso ao cache
+# em disco roda em uma thread
+
+async def get_popular_movies_async(page: int = 1) -> List[Dict]:
+    """Obtém filmes populares da API ou do cache, sem bloquear o event loop."""
+    return await _memory_cache.get_or_load(f"popular_page_{page}", lambda: _fetch_popular_movies_async(page))
+
+async def _fetch_popular_movies_async(page: int) -> List[Dict]:
+    """Obtém filmes populares do cache em disco ou da API (cliente assíncrono)."""
+    cache_key = f"popular_page_{page}"
+    cached = await asyncio.to_thread(_cache_get, cache_key)
+    if cached:
+        return cached.get("results", [])
+    
+    if not get_tmdb_api_key():
+        logger.warning("Chave da API do TMDb não configurada")
+        return []
+    
+    try:
+        data = await tmdb_client.popular_movies(page)
+    except Exception as e:
+        logger.error(f"Erro ao obter filmes populares: {e}")
+        return await asyncio.to_thread(_stale_results, cache_key)
+    
+    await asyncio.to_thread(_cache_set, cache_key, data)
+    return data.get("results", [])
+
+async def get_movie_details_async(movie_id: int) -> Optional[Dict]:
+    """Obtém detalhes de um filme da API ou do cache, sem bloquear o event loop."""
+    return await _memory_cache.get_or_load(f"movie_{movie_id}", lambda: _fetch_movie_details_async(movie_id))
+
+async def _fetch_movie_details_async(movie_id: int) -> Optional[Dict]:
+    """Obtém detalhes de um filme do cache em disco ou da API (cliente assíncrono)."""
+    cache_key = f"movie_{movie_id}"
+    cached = await asyncio.to_thread(_cache_get, cache_key)
+    if cached:
+        return cached
+    
+    if not get_tmdb_api_key():
+        logger.warning("Chave da API do TMDb não configurada")
+        return None
+    
+    try:
+        data = await tmdb_client.movie_details(movie_id)
+    except Exception as e:
+        logger.error(f"Erro ao obter detalhes do filme {movie_id}: {e}")
+        return await asyncio.to_thread(_cache_get, cache_key, True)
+    
+    annotate_movie_emojis(data)
+    await asyncio.to_thread(_cache_set, cache_key, data)
+    return data
+
+async def get_tmdb_movie_puzzle(exclude_ids: Iterable[str] = (), num_options: int = 4) -> Optional[Dict]:
+    """Obtém um filme aleatório ainda não usado, já com emojis e opções de resposta.
+    
+    As opções vêm do índice de distratores; só quando ele não tem filmes
+    parecidos o bastante as páginas populares 1 e 2 são buscadas.
+    """
+    page = random.randint(1, 3)
+    movies = await get_popular_movies_async(page)
+    if not movies:
+        movies = await asyncio.to_thread(_cached_popular_results)
+    if not movies:
+        logger.warning("Nenhum filme encontrado no TMDb ou cache")
+        return None
+    
+    movie = _choose_popular_movie(movies, exclude_ids)
+    if not movie:
+        return None
+    
+    if not _distractor_index.loaded:
+        await asyncio.to_thread(_ensure_distractor_index)
+    details = await get_movie_details_async(movie["id"])
+    
+    movie_data = _build_movie_data(details or movie)
+    options = _distractor_index.options(details or movie, num_options)
+    if not options:
+        option_pages = await asyncio.gather(get_popular_movies_async(1), get_popular_movies_async(2))
+        options = _build_options(movie["id"], movie_data["title"], list(option_pages) + [movies], num_options)
+    movie_data["options"] = options
+    return movie_data
+
+def precompute_movie_emojis(cache: TMDbCache = tmdb_cache) -> int:
+    """Calcula os emojis das palavras-chave de todos os filmes do cache em disco.
+    
+    Só regrava as entradas sem codificação ou com codificação de outra versão
+    do mapa; a validade de cada entrada é mantida. Retorna quantas mudaram.
+    """
+    updated = 0
+    for key, movie, expires_at in cache.items_with_prefix("movie_"):
+        if not isinstance(movie, dict) or movie.get("emoji_keywords_version") == _keyword_matcher.version:
+            continue
+        annotate_movie_emojis(movie)
+        cache.set(key, movie, ttl=expires_at - time.time())
+        updated += 1
+    return updated
+
+if __name__ == "__main__":
+    # Uso: python -m data.tmdb_api --precompute-emojis
+    parser = argparse.ArgumentParser(description="Ferramentas do cache do TMDb")
+    parser.add_argument("--precompute-emojis", action="store_true",
+                        help="calcular os emojis de todos os filmes do cache")
+    args = parser.parse_args()
+    if args.precompute_emojis:
+        print(f"{precompute_movie_emojis()} filmes atualizados em {tmdb_cache.path}")
+    else:
+        parser.print_help()
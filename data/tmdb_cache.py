@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: data/tmdb_cache.py - Cache em disco das respostas do TMDb
+#
+# Substitui o antigo data/movie_cache.json, que era lido inteiro a cada
+# consulta e regravado inteiro a cada filme novo. Aqui cada resposta é uma
+# linha de uma tabela SQLite indexada pela chave ("popular_page_1",
+# "movie_123", "genres"), com validade própria. Cada gravação é uma transação,
+# então um processo interrompido não deixa o cache corrompido, e o modo WAL
+# permite leituras enquanto outra thread grava.
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+TMDB_CACHE_PATH = os.environ.get("TMDB_CACHE_PATH", "data/tmdb_cache.sqlite3")
+
+# Arquivo JSON do formato antigo, importado uma única vez
+LEGACY_JSON_CACHE = "data/movie_cache.json"
+
+# Validade das entradas (segundos)
+POPULAR_TTL = 24 * 60 * 60
+DETAILS_TTL = 30 * 24 * 60 * 60
+GENRES_TTL = 30 * 24 * 60 * 60
+
+
+def ttl_for_key(key: str) -> float:
+    """Validade padrão de uma entrada conforme o tipo da chave."""
+    if key.startswith("popular_page_"):
+        return POPULAR_TTL
+    if key == "genres":
+        return GENRES_TTL
+    return DETAILS_TTL
+
+
+class TMDbCache:
+    """Armazenamento chave/valor em SQLite com validade por entrada."""
+
+    def __init__(self, path: str = TMDB_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 não compartilha conexões entre threads: uma por thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            self._initialize(conn)
+        return conn
+
+    def _initialize(self, conn: sqlite3.Connection) -> None:
+        with self._init_lock:
+            if self._initialized:
+                return
+            with conn:
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """)
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+                """)
+            self._migrate_legacy_json(conn)
+            self._initialized = True
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection) -> None:
+        """Importar data/movie_cache.json uma única vez."""
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_json_migrated'").fetchone():
+            return
+
+        imported = 0
+        if os.path.exists(LEGACY_JSON_CACHE):
+            try:
+                with open(LEGACY_JSON_CACHE, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+            except Exception as e:
+                logger.error(f"Erro ao ler {LEGACY_JSON_CACHE} para migração: {e}")
+                legacy = {}
+            now = time.time()
+            rows = [
+                (key, json.dumps(value, ensure_ascii=False), now + ttl_for_key(key), now)
+                for key, value in legacy.items()
+            ]
+            with conn:
+                # Não sobrescrever entradas já gravadas pelo cache novo
+                conn.executemany(
+                    "INSERT OR IGNORE INTO entries (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+            imported = len(rows)
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_json_migrated', ?)",
+                (str(time.time()),)
+            )
+        if imported:
+            logger.info(f"{imported} entradas importadas de {LEGACY_JSON_CACHE}")
+
+    def get(self, key: str, allow_expired: bool = False):
+        """Obter o valor de uma chave, ou None se ausente (ou vencida)."""
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if not allow_expired and expires_at < time.time():
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        """Gravar uma entrada (substitui a anterior atomicamente)."""
+        if ttl is None:
+            ttl = ttl_for_key(key)
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now)
+            )
+
+    def delete(self, key: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def first_with_prefix(self, prefix: str, allow_expired: bool = True):
+        """Valor da entrada mais recente cuja chave começa com ``prefix``."""
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = "SELECT value FROM entries WHERE key LIKE ? ESCAPE '\\'"
+        params = [escaped + "%"]
+        if not allow_expired:
+            query += " AND expires_at >= ?"
+            params.append(time.time())
+        row = self._connect().execute(query + " ORDER BY updated_at DESC LIMIT 1", params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def items_with_prefix(self, prefix: str):
+        """Todas as entradas cuja chave começa com ``prefix``: (chave, valor, expira_em)."""
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        rows = self._connect().execute(
+            "SELECT key, value, expires_at FROM entries WHERE key LIKE ? ESCAPE '\\' ORDER BY key",
+            (escaped + "%",)
+        ).fetchall()
+        return [(key, json.loads(value), expires_at) for key, value, expires_at in rows]
+
+    def purge_expired(self, grace_seconds: float = 0) -> int:
+        """Apagar entradas vencidas há mais de ``grace_seconds``."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time() - grace_seconds,))
+        return cursor.rowcount
+
+# Instância compartilhada
+tmdb_cache = TMDbCache()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: data/tmdb_client.py - Cliente assíncrono da API do TMDb
+#
+# Usado pelo jogo de filmes dentro do event loop do bot. Uma única sessão
+# httpx (na mesma versão exigida pelo python-telegram-bot) mantém as
+# conexões abertas entre requisições, cada requisição tem tempo limite e
+# falhas temporárias (timeout, 429, 5xx) são repetidas com backoff exponencial
+# com jitter, respeitando o Retry-After do TMDb.
+
+import os
+import random
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# TMDB_API_URL pode apontar para um servidor local (benchmarks/fake_tmdb_server.py)
+TMDB_API_URL = os.environ.get("TMDB_API_URL", "https://api.themoviedb.org/3")
+
+# Tempo limite de cada requisição (segundos)
+TMDB_TIMEOUT = float(os.environ.get("TMDB_TIMEOUT", "5"))
+TMDB_CONNECT_TIMEOUT = 3.0
+
+# Tentativas e backoff para falhas temporárias
+TMDB_MAX_RETRIES = 3
+TMDB_BACKOFF_BASE = 0.5
+TMDB_BACKOFF_MAX = 8.0
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TMDbError(Exception):
+    """A requisição ao TMDb falhou depois de todas as tentativas."""
+
+
+class TMDbClient:
+    """Cliente assíncrono do TMDb com sessão compartilhada."""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = TMDB_API_URL,
+                 timeout: float = TMDB_TIMEOUT, max_retries: int = TMDB_MAX_RETRIES,
+                 language: str = "pt-BR"):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, TMDB_CONNECT_TIMEOUT))
+        self.max_retries = max_retries
+        self.language = language
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                headers={"Accept": "application/json"}
+            )
+        return self._client
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Espera antes da próxima tentativa (full jitter, ou o Retry-After)."""
+        if retry_after:
+            try:
+                return min(float(retry_after), TMDB_BACKOFF_MAX)
+            except ValueError:
+                pass
+        return random.uniform(0, min(TMDB_BACKOFF_MAX, TMDB_BACKOFF_BASE * (2 ** attempt)))
+
+    async def get(self, path: str, **params) -> Dict:
+        """GET em um endpoint do TMDb, com repetição de falhas temporárias."""
+        api_key = self.api_key or os.getenv("TMDB_API_KEY")
+        if not api_key:
+            raise TMDbError("Chave da API do TMDb não configurada")
+        params = {"api_key": api_key, "language": self.language, **params}
+
+        client = self._get_client()
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._stats["retries"] += 1
+            self._stats["requests"] += 1
+            retry_after = None
+            try:
+                response = await client.get(path, params=params)
+                if response.status_code not in _RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = response.headers.get("Retry-After")
+                last_error = TMDbError(f"HTTP {response.status_code} em {path}")
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                last_error = e
+            except httpx.HTTPStatusError as e:
+                # 4xx (exceto 429) não melhora repetindo
+                self._stats["failures"] += 1
+                raise TMDbError(f"HTTP {e.response.status_code} em {path}") from e
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, retry_after)
+                logger.warning(f"TMDb {path} falhou ({last_error}); nova tentativa em {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        self._stats["failures"] += 1
+        raise TMDbError(f"TMDb {path} falhou após {self.max_retries + 1} tentativas: {last_error}")
+
+    async def popular_movies(self, page: int = 1) -> Dict:
+        return await self.get("/movie/popular", page=page)
+
+    async def movie_details(self, movie_id: int) -> Dict:
+        return await self.get(f"/movie/{movie_id}", append_to_response="keywords,credits")
+
+    async def genres(self) -> Dict:
+        return await self.get("/genre/movie/list")
+
+    def stats(self) -> Dict:
+        return dict(self._stats)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+# Instância compartilhada (a sessão é criada no primeiro uso, dentro do event loop)
+tmdb_client = TMDbClient()
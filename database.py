@@ -2,44 +2,98 @@
 # -*- coding: utf-8 -*-
 
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import time
 import uuid
 import json
 import logging
+import threading
 from datetime import datetime, timedelta
+from db_pool import ConnectionPool
+from db_notify import NotificationListener
+from leaderboard import Leaderboard
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pool de conexões compartilhado (criado na primeira utilização)
+_pool = None
+_pool_lock = threading.Lock()
+
+# Janela de /ativos e retenção das atividades (em dias)
+ACTIVITY_WINDOW_DAYS = int(os.environ.get("ACTIVITY_WINDOW_DAYS", "30"))
+ACTIVITY_DAILY_RETENTION_DAYS = int(os.environ.get("ACTIVITY_DAILY_RETENTION_DAYS", "90"))
+
+# Quantos conteúdos recentes (filmes, perguntas...) são lembrados por chat e jogo
+SEEN_CONTENT_WINDOW = int(os.environ.get("SEEN_CONTENT_WINDOW", "500"))
+
+def get_connection_pool():
+    """Return the shared connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                DATABASE_URL = os.environ.get("DATABASE_URL")
+                if not DATABASE_URL:
+                    raise Exception("DATABASE_URL não configurada")
+
+                _pool = ConnectionPool(
+                    DATABASE_URL,
+                    minconn=int(os.environ.get("DB_POOL_MIN", "1")),
+                    maxconn=int(os.environ.get("DB_POOL_MAX", "10")),
+                    idle_timeout=float(os.environ.get("DB_POOL_IDLE_TIMEOUT", "300")),
+                    checkout_timeout=float(os.environ.get("DB_POOL_CHECKOUT_TIMEOUT", "10"))
+                )
+    return _pool
+
 def get_db_connection():
-    """Create a database connection and return it"""
-    DATABASE_URL = os.environ.get("DATABASE_URL")
-    if not DATABASE_URL:
-        raise Exception("DATABASE_URL não configurada")
+    """Check out a pooled database connection (use as a context manager)"""
+    return get_connection_pool().connection()
+
+# Listener de NOTIFY compartilhado pelos caches em memória (ver db_notify.py)
+_notification_listener = NotificationListener(os.environ.get("DATABASE_URL"))
+
+def start_notification_listener():
+    """Start the NOTIFY listener thread that keeps in-memory caches in sync"""
+    _notification_listener.start()
 
-    conn = psycopg2.connect(DATABASE_URL)
-    return conn
+def get_pool_stats():
+    """Get connection pool statistics (checkout waits, connections in use, ...)"""
+    return get_connection_pool().stats()
 
 def setup_database():
     """Create database tables if they don't exist"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
     
-    try:
-        # Verificar se a tabela users já existe
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'users'
-            );
-        """)
-        table_exists = cursor.fetchone()[0]
+        try:
+            # Verificar se a tabela users já existe
+            cursor.execute("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.tables 
+                    WHERE table_name = 'users'
+                );
+            """)
+            table_exists = cursor.fetchone()[0]
         
-        if not table_exists:
-            # Tabela de usuários
+            if not table_exists:
+                # Tabela de usuários
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id BIGINT PRIMARY KEY,
+                    username TEXT,
+                    first_name TEXT,
+                    last_name TEXT,
+                    points INTEGER DEFAULT 0,
+                    invited_by BIGINT,
+                    join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    CONSTRAINT fk_invited_by FOREIGN KEY (invited_by) REFERENCES users(user_id) ON DELETE SET NULL
+                )
+                ''')
+        except Exception as e:
+            logger.error(f"Erro ao verificar ou criar tabela users: {e}")
+            # Tentativa simplificada se ocorrer erro
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
                 user_id BIGINT PRIMARY KEY,
@@ -48,312 +102,538 @@ def setup_database():
                 last_name TEXT,
                 points INTEGER DEFAULT 0,
                 invited_by BIGINT,
-                join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                CONSTRAINT fk_invited_by FOREIGN KEY (invited_by) REFERENCES users(user_id) ON DELETE SET NULL
+                join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
             ''')
-    except Exception as e:
-        logger.error(f"Erro ao verificar ou criar tabela users: {e}")
-        # Tentativa simplificada se ocorrer erro
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            user_id BIGINT PRIMARY KEY,
-            username TEXT,
-            first_name TEXT,
-            last_name TEXT,
-            points INTEGER DEFAULT 0,
-            invited_by BIGINT,
-            join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+
+        # Tabela de histórico de pontos
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS points_history (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT,
+            points INTEGER,
+            game_type TEXT,
+            response_time REAL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            chat_id BIGINT,
+            CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
         )
         ''')
 
-    # Tabela de histórico de pontos
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS points_history (
-        id SERIAL PRIMARY KEY,
-        user_id BIGINT,
-        points INTEGER,
-        game_type TEXT,
-        response_time REAL,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''')
+        # Chat onde os pontos foram ganhos (NULL para convites e registros antigos)
+        cursor.execute('''
+        ALTER TABLE points_history ADD COLUMN IF NOT EXISTS chat_id BIGINT
+        ''')
 
-    # Tabela de links de convite
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS invites (
-        id SERIAL PRIMARY KEY,
-        user_id BIGINT,
-        invite_code TEXT UNIQUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        used BOOLEAN DEFAULT FALSE,
-        used_by BIGINT,
-        used_at TIMESTAMP,
-        CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-        CONSTRAINT fk_used_by FOREIGN KEY (used_by) REFERENCES users(user_id) ON DELETE SET NULL
-    )
-    ''')
+        # Tabela de links de convite
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS invites (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT,
+            invite_code TEXT UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            used BOOLEAN DEFAULT FALSE,
+            used_by BIGINT,
+            used_at TIMESTAMP,
+            CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            CONSTRAINT fk_used_by FOREIGN KEY (used_by) REFERENCES users(user_id) ON DELETE SET NULL
+        )
+        ''')
 
-    # Tabela para jogos ativos
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS active_games (
-        id SERIAL PRIMARY KEY,
-        chat_id BIGINT,
-        game_type TEXT,
-        data TEXT,
-        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        end_time TIMESTAMP,
-        is_active BOOLEAN DEFAULT TRUE,
-        used_questions TEXT[] DEFAULT '{}',
-        UNIQUE(chat_id, game_type)
-    )
-    ''')
+        # Tabela para jogos ativos
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS active_games (
+            id SERIAL PRIMARY KEY,
+            chat_id BIGINT,
+            game_type TEXT,
+            data TEXT,
+            start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            end_time TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE,
+            used_questions TEXT[] DEFAULT '{}',
+            UNIQUE(chat_id, game_type)
+        )
+        ''')
 
-    # Tabela para reclamação de prêmios
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS prize_claims (
-        id SERIAL PRIMARY KEY,
-        user_id BIGINT,
-        amount INTEGER,
-        status TEXT DEFAULT 'pending',
-        pix_key TEXT,
-        platform_photo_id TEXT,
-        claimed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        processed_at TIMESTAMP,
-        CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''')
+        # Tabela para reclamação de prêmios
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS prize_claims (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT,
+            amount INTEGER,
+            status TEXT DEFAULT 'pending',
+            pix_key TEXT,
+            platform_photo_id TEXT,
+            claimed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed_at TIMESTAMP,
+            CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''')
 
-    # Tabela para itens da lojinha
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS shop_items (
-        id SERIAL PRIMARY KEY,
-        name TEXT NOT NULL,
-        description TEXT,
-        points_cost INTEGER NOT NULL,
-        is_active BOOLEAN DEFAULT TRUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
+        # Tabela para itens da lojinha
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shop_items (
+            id SERIAL PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            points_cost INTEGER NOT NULL,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
 
-    # Tabela para compras da lojinha
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS shop_purchases (
-        id SERIAL PRIMARY KEY,
-        user_id BIGINT,
-        item_id INTEGER,
-        points_spent INTEGER,
-        status TEXT DEFAULT 'pending',
-        delivery_info TEXT,
-        purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        processed_at TIMESTAMP,
-        CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-        CONSTRAINT fk_item_id FOREIGN KEY (item_id) REFERENCES shop_items(id) ON DELETE CASCADE
-    )
-    ''')
+        # Tabela para compras da lojinha
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shop_purchases (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT,
+            item_id INTEGER,
+            points_spent INTEGER,
+            status TEXT DEFAULT 'pending',
+            delivery_info TEXT,
+            purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed_at TIMESTAMP,
+            CONSTRAINT fk_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            CONSTRAINT fk_item_id FOREIGN KEY (item_id) REFERENCES shop_items(id) ON DELETE CASCADE
+        )
+        ''')
 
-    # Tabela para configuração do sistema
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS settings (
-        id SERIAL PRIMARY KEY,
-        setting_key TEXT UNIQUE NOT NULL,
-        setting_value TEXT,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
+        # Tabela para configuração do sistema
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            id SERIAL PRIMARY KEY,
+            setting_key TEXT UNIQUE NOT NULL,
+            setting_value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
     
-    # Tabela para rastreamento de atividade dos usuários
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS user_activity (
-        id SERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        chat_id BIGINT NOT NULL,
-        activity_type VARCHAR(50) NOT NULL,
-        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-        CONSTRAINT fk_activity_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''')
+        # Tabela para rastreamento de atividade dos usuários
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_activity (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            chat_id BIGINT NOT NULL,
+            activity_type VARCHAR(50) NOT NULL,
+            event_count INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT fk_activity_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''')
+
+        # Bancos criados antes do agrupamento de atividades não têm event_count
+        cursor.execute('''
+        ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS event_count INTEGER NOT NULL DEFAULT 1
+        ''')
     
-    # Índice para consultas de atividade
-    cursor.execute('''
-    CREATE INDEX IF NOT EXISTS idx_user_activity_chat_user 
-    ON user_activity(chat_id, user_id)
-    ''')
+        # Índice para consultas de atividade
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_activity_chat_user 
+        ON user_activity(chat_id, user_id)
+        ''')
     
-    cursor.execute('''
-    CREATE INDEX IF NOT EXISTS idx_user_activity_created_at 
-    ON user_activity(created_at)
-    ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_activity_created_at 
+        ON user_activity(created_at)
+        ''')
 
-    # Inserir configurações padrão se não existirem
-    default_settings = [
-        ("points_per_correct_answer", "10"),
-        ("points_per_second", "1"),
-        ("game_frequency_minutes", "30"),
-        ("notification_time_minutes", "5"),
-        ("invitation_points", "5"),
-        ("invitation_enabled", "true"),
-        ("shop_enabled", "true"),
-        ("retry_timeout_seconds", "5"),
-        ("max_game_duration_seconds", "300"),
-        ("admin_ids", "[]")  # Lista vazia de IDs de administradores em formato JSON
-    ]
-
-    for key, value in default_settings:
-        cursor.execute('''
-        INSERT INTO settings (setting_key, setting_value)
-        VALUES (%s, %s)
-        ON CONFLICT (setting_key) DO NOTHING
-        ''', (key, value))
+        setup_activity_rollup(cursor)
+        setup_points_buckets(cursor)
+        setup_seen_content(cursor)
+        setup_content_decks(cursor)
+        setup_bingo_tables(cursor)
+        setup_game_schedules(cursor)
+
+        # Inserir configurações padrão se não existirem
+        default_settings = [
+            ("points_per_correct_answer", "10"),
+            ("points_per_second", "1"),
+            ("game_frequency_minutes", "30"),
+            ("notification_time_minutes", "5"),
+            ("invitation_points", "5"),
+            ("invitation_enabled", "true"),
+            ("shop_enabled", "true"),
+            ("retry_timeout_seconds", "5"),
+            ("max_game_duration_seconds", "300"),
+            ("admin_ids", "[]")  # Lista vazia de IDs de administradores em formato JSON
+        ]
+
+        for key, value in default_settings:
+            cursor.execute('''
+            INSERT INTO settings (setting_key, setting_value)
+            VALUES (%s, %s)
+            ON CONFLICT (setting_key) DO NOTHING
+            ''', (key, value))
 
-    conn.commit()
-    conn.close()
-    logger.info("Database setup complete")
+        conn.commit()
+        logger.info("Database setup complete")
 
 def register_user(user_id, username, first_name, last_name, invited_by=None):
     """Register a new user or update existing one"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Check if user exists
-    cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
-    user = cursor.fetchone()
+        # Check if user exists
+        cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
+        user = cursor.fetchone()
 
-    if user:
-        # Update existing user
-        cursor.execute('''
-        UPDATE users 
-        SET username = %s, first_name = %s, last_name = %s 
-        WHERE user_id = %s
-        ''', (username, first_name, last_name, user_id))
-    else:
-        # Create new user
-        cursor.execute('''
-        INSERT INTO users (user_id, username, first_name, last_name, invited_by, points)
-        VALUES (%s, %s, %s, %s, %s, 0)
-        ''', (user_id, username, first_name, last_name, invited_by))
+        change = {"user_id": user_id, "username": username, "first_name": first_name, "last_name": last_name}
+
+        if user:
+            if (user["username"], user["first_name"], user["last_name"]) == (username, first_name, last_name):
+                # Nada mudou: evitar a escrita e a notificação do placar
+                return True
+
+            # Update existing user
+            cursor.execute('''
+            UPDATE users 
+            SET username = %s, first_name = %s, last_name = %s 
+            WHERE user_id = %s
+            ''', (username, first_name, last_name, user_id))
+        else:
+            # Create new user
+            cursor.execute('''
+            INSERT INTO users (user_id, username, first_name, last_name, invited_by, points)
+            VALUES (%s, %s, %s, %s, %s, 0)
+            ''', (user_id, username, first_name, last_name, invited_by))
+            change["points"] = 0
+
+        _publish_user_change(cursor, change)
+        conn.commit()
 
-    conn.commit()
-    conn.close()
+    _apply_user_change(change)
     return True
 
-def add_points(user_id, points, game_type, response_time=None):
-    """Add points to a user and record game history"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def add_points(user_id, points, game_type, response_time=None, chat_id=None):
+    """Add points to a user and record game history
 
-    # Add points to user
-    cursor.execute("UPDATE users SET points = points + %s WHERE user_id = %s", (points, user_id))
+    ``chat_id`` is the group where the points were earned; it feeds the
+    per-chat leaderboards.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    # Record history
-    cursor.execute('''
-    INSERT INTO points_history (user_id, points, game_type, response_time)
-    VALUES (%s, %s, %s, %s)
-    ''', (user_id, points, game_type, response_time))
+        # Add points to user
+        cursor.execute("UPDATE users SET points = points + %s WHERE user_id = %s RETURNING points", (points, user_id))
+        row = cursor.fetchone()
+
+        # Record history
+        cursor.execute('''
+        INSERT INTO points_history (user_id, points, game_type, response_time, chat_id)
+        VALUES (%s, %s, %s, %s, %s)
+        ''', (user_id, points, game_type, response_time, chat_id))
+
+        if row:
+            _add_to_points_buckets(cursor, user_id, points, chat_id)
+
+        change = {"user_id": user_id, "points": row[0]} if row else None
+        if change:
+            _publish_user_change(cursor, change)
+
+        conn.commit()
 
-    conn.commit()
-    conn.close()
+    if change:
+        _apply_user_change(change)
     return True
 
 def subtract_points(user_id, points):
     """Subtract points from a user (for shop purchases)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE users SET points = points - %s WHERE user_id = %s AND points >= %s", 
-                  (points, user_id, points))
-
-    affected = cursor.rowcount
-    conn.commit()
-    conn.close()
-    return affected > 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("UPDATE users SET points = points - %s WHERE user_id = %s AND points >= %s RETURNING points", 
+                      (points, user_id, points))
+        row = cursor.fetchone()
+
+        change = {"user_id": user_id, "points": row[0]} if row else None
+        if change:
+            _publish_user_change(cursor, change)
+
+        conn.commit()
+
+    if change:
+        _apply_user_change(change)
+    return change is not None
+
+# Placar em memória: carregado uma vez da tabela users e mantido a cada
+# alteração de pontos ou de nome. As alterações vão por NOTIFY no canal abaixo
+# (na mesma transação) para que o outro processo, bot ou painel Flask, também
+# atualize o seu placar.
+POINTS_CHANNEL = "points_changed"
+
+_leaderboard = Leaderboard()
+_leaderboard_loaded = False
+_leaderboard_lock = threading.Lock()
+
+def _publish_user_change(cursor, change):
+    """Notify other processes about a user points/name change (delivered on commit)"""
+    cursor.execute("SELECT pg_notify(%s, %s)", (POINTS_CHANNEL, json.dumps(change)))
+
+def _apply_user_change(change):
+    """Apply a user points/name change to the in-memory leaderboard"""
+    # O lock faz uma alteração que chega durante a carga ser aplicada depois
+    # dela, e não sobrescrita pela leitura da tabela
+    with _leaderboard_lock:
+        if not _leaderboard_loaded:
+            return
+        user_id = change["user_id"]
+        if "username" in change:
+            _leaderboard.set_user(user_id, change["username"], change["first_name"], change["last_name"])
+        if "points" in change:
+            _leaderboard.set_points(user_id, change["points"])
+
+def _invalidate_leaderboard():
+    global _leaderboard_loaded
+    _leaderboard_loaded = False
+
+def _get_loaded_leaderboard():
+    """Return the in-memory leaderboard, loading it from the users table if needed"""
+    global _leaderboard_loaded
+    if not _leaderboard_loaded:
+        with _leaderboard_lock:
+            if not _leaderboard_loaded:
+                with get_db_connection() as conn:
+                    cursor = conn.cursor(cursor_factory=RealDictCursor)
+                    cursor.execute("SELECT user_id, username, first_name, last_name, points FROM users")
+                    rows = cursor.fetchall()
+                _leaderboard.load(rows)
+                _leaderboard_loaded = True
+                start_notification_listener()
+    return _leaderboard
+
+_notification_listener.subscribe(
+    POINTS_CHANNEL,
+    lambda payload: _apply_user_change(json.loads(payload)),
+    _invalidate_leaderboard
+)
 
 def get_leaderboard(limit=10):
     """Get the top users by points"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    return _get_loaded_leaderboard().top(limit)
+
+# Placares por período e por grupo: cada ganho de pontos soma em "baldes"
+# (período, início do período, chat) na mesma transação de add_points, então
+# os placares semanal, mensal e de cada grupo são lidos direto dos baldes sem
+# varrer points_history. chat_id = 0 é o balde geral. Gastos na lojinha não
+# entram nos baldes: os placares por período medem pontos ganhos.
+LEADERBOARD_PERIODS = ("all", "week", "month")
+_ALL_TIME_START = datetime(1970, 1, 1).date()
+
+def _period_start(period, now=None):
+    """First day of the current ``period`` ('week' starts on Monday)"""
+    today = (now or datetime.now()).date()
+    if period == "week":
+        return today - timedelta(days=today.weekday())
+    if period == "month":
+        return today.replace(day=1)
+    return _ALL_TIME_START
+
+def setup_points_buckets(cursor):
+    """Criar a tabela de pontos por período e preencher o período atual"""
+    cursor.execute("SELECT to_regclass('points_buckets') IS NOT NULL")
+    buckets_exist = cursor.fetchone()[0]
 
     cursor.execute('''
-    SELECT user_id, username, first_name, last_name, points 
-    FROM users 
-    ORDER BY points DESC 
-    LIMIT %s
-    ''', (limit,))
+    CREATE TABLE IF NOT EXISTS points_buckets (
+        period TEXT NOT NULL,
+        period_start DATE NOT NULL,
+        chat_id BIGINT NOT NULL DEFAULT 0,
+        user_id BIGINT NOT NULL,
+        points INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, period_start, chat_id, user_id),
+        CONSTRAINT fk_buckets_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_points_buckets_ranking 
+    ON points_buckets(period, period_start, chat_id, points DESC, user_id)
+    ''')
+
+    if not buckets_exist:
+        # Semana e mês atuais no balde geral (o histórico antigo não tem chat_id)
+        for period in ("week", "month"):
+            cursor.execute('''
+            INSERT INTO points_buckets (period, period_start, chat_id, user_id, points)
+            SELECT %s, %s, 0, user_id, SUM(points)
+            FROM points_history
+            WHERE timestamp >= %s AND points > 0 AND user_id IS NOT NULL
+            GROUP BY user_id
+            ''', (period, _period_start(period), _period_start(period)))
+
+def _add_to_points_buckets(cursor, user_id, points, chat_id=None):
+    """Add earned points to the current week/month buckets (and the chat's)"""
+    if points <= 0:
+        return
+    rows = [("week", _period_start("week"), 0, user_id, points),
+            ("month", _period_start("month"), 0, user_id, points)]
+    if chat_id:
+        rows += [(period, _period_start(period), chat_id, user_id, points) for period in LEADERBOARD_PERIODS]
+
+    execute_values(cursor, '''
+    INSERT INTO points_buckets (period, period_start, chat_id, user_id, points)
+    VALUES %s
+    ON CONFLICT (period, period_start, chat_id, user_id)
+    DO UPDATE SET points = points_buckets.points + EXCLUDED.points
+    ''', rows)
+
+def purge_old_points_buckets(now=None):
+    """Apagar os baldes semanais e mensais anteriores ao período passado
+
+    O período atual e o anterior são mantidos. Retorna quantas linhas foram apagadas.
+    """
+    previous_week = _period_start("week", now) - timedelta(weeks=1)
+    previous_month = (_period_start("month", now) - timedelta(days=1)).replace(day=1)
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        DELETE FROM points_buckets
+        WHERE (period = 'week' AND period_start < %s)
+           OR (period = 'month' AND period_start < %s)
+        ''', (previous_week, previous_month))
+        deleted = cursor.rowcount
+        conn.commit()
+        return deleted
+
+def get_period_leaderboard(period="all", chat_id=None, limit=10):
+    """Get the top users for a period ('all', 'week' or 'month'), optionally in one chat"""
+    if period not in LEADERBOARD_PERIODS:
+        raise ValueError(f"Período inválido: {period}")
+    if period == "all" and not chat_id:
+        return get_leaderboard(limit)
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    leaderboard = cursor.fetchall()
-    conn.close()
-    return leaderboard
+        cursor.execute('''
+        SELECT u.user_id, u.username, u.first_name, u.last_name, b.points
+        FROM points_buckets b
+        JOIN users u ON u.user_id = b.user_id
+        WHERE b.period = %s AND b.period_start = %s AND b.chat_id = %s
+        ORDER BY b.points DESC, b.user_id
+        LIMIT %s
+        ''', (period, _period_start(period), chat_id or 0, limit))
+
+        return cursor.fetchall()
+
+def get_user_period_rank(user_id, period="all", chat_id=None):
+    """Get a user's rank, points and the number of ranked players for a period
+
+    Returns a dict with rank, points and total, or None if the user has no
+    points in that period.
+    """
+    if period not in LEADERBOARD_PERIODS:
+        raise ValueError(f"Período inválido: {period}")
+    if period == "all" and not chat_id:
+        return get_user_rank(user_id, 0)
+
+    key = (period, _period_start(period), chat_id or 0)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+        cursor.execute('''
+        SELECT points FROM points_buckets
+        WHERE period = %s AND period_start = %s AND chat_id = %s AND user_id = %s
+        ''', key + (user_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+
+        # Mesma ordem de get_period_leaderboard: pontos e, no empate, user_id
+        cursor.execute('''
+        SELECT
+            COUNT(*) FILTER (WHERE points > %s OR (points = %s AND user_id < %s)) AS ahead,
+            COUNT(*) AS total
+        FROM points_buckets
+        WHERE period = %s AND period_start = %s AND chat_id = %s
+        ''', (row["points"], row["points"], user_id) + key)
+        counts = cursor.fetchone()
+
+        return {
+            "user_id": user_id,
+            "rank": counts["ahead"] + 1,
+            "points": row["points"],
+            "total": counts["total"],
+        }
+
+def get_user_rank(user_id, radius=2):
+    """Get a user's rank, points and the ``radius`` players above and below
+
+    Returns a dict with user_id, rank, points, total and neighbors (each
+    neighbor has the get_leaderboard fields plus rank), or None.
+    """
+    return _get_loaded_leaderboard().around(user_id, radius)
 
 def get_invite_leaderboard(limit=10):
     """Get the top users by successful invites"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    cursor.execute('''
-    SELECT u.user_id, u.username, u.first_name, u.last_name, COUNT(i.id) AS invite_count 
-    FROM users u
-    JOIN invites i ON u.user_id = i.user_id
-    WHERE i.used = TRUE
-    GROUP BY u.user_id, u.username, u.first_name, u.last_name
-    ORDER BY invite_count DESC 
-    LIMIT %s
-    ''', (limit,))
-
-    leaderboard = cursor.fetchall()
-    conn.close()
-    return leaderboard
+        cursor.execute('''
+        SELECT u.user_id, u.username, u.first_name, u.last_name, COUNT(i.id) AS invite_count 
+        FROM users u
+        JOIN invites i ON u.user_id = i.user_id
+        WHERE i.used = TRUE
+        GROUP BY u.user_id, u.username, u.first_name, u.last_name
+        ORDER BY invite_count DESC 
+        LIMIT %s
+        ''', (limit,))
+
+        leaderboard = cursor.fetchall()
+        return leaderboard
 
 def create_invite(user_id, invite_code):
     """Create a new invitation link"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-    INSERT INTO invites (user_id, invite_code)
-    VALUES (%s, %s)
-    ''', (user_id, invite_code))
+        cursor.execute('''
+        INSERT INTO invites (user_id, invite_code)
+        VALUES (%s, %s)
+        ''', (user_id, invite_code))
 
-    conn.commit()
-    conn.close()
-    return True
+        conn.commit()
+        return True
 
 def use_invite(invite_code, joined_user_id):
     """Record that an invite was used and award points if enabled"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    # Find the invite
-    cursor.execute("SELECT * FROM invites WHERE invite_code = %s AND used = FALSE", (invite_code,))
-    invite = cursor.fetchone()
+    # Configurações do convite vindas do cache (antes de pegar a conexão, já
+    # que uma recarga do cache usa outra)
+    invitation_points = None
+    if get_setting_bool("invitation_enabled"):
+        invitation_points = get_setting_int("invitation_points", None)
 
-    if not invite:
-        conn.close()
-        return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Mark invite as used
-    cursor.execute('''
-    UPDATE invites 
-    SET used = TRUE, used_by = %s, used_at = CURRENT_TIMESTAMP 
-    WHERE invite_code = %s
-    ''', (joined_user_id, invite_code))
+        # Find the invite
+        cursor.execute("SELECT * FROM invites WHERE invite_code = %s AND used = FALSE", (invite_code,))
+        invite = cursor.fetchone()
 
-    # Check if invitation points are enabled
-    cursor.execute("SELECT setting_value FROM settings WHERE setting_key = 'invitation_enabled'")
-    invitation_enabled = cursor.fetchone()
+        if not invite:
+            return False
 
-    if invitation_enabled and invitation_enabled['setting_value'].lower() == 'true':
-        # Get points per invitation
-        cursor.execute("SELECT setting_value FROM settings WHERE setting_key = 'invitation_points'")
-        points_row = cursor.fetchone()
+        change = None
 
-        if points_row:
-            invitation_points = int(points_row['setting_value'])
+        # Mark invite as used
+        cursor.execute('''
+        UPDATE invites 
+        SET used = TRUE, used_by = %s, used_at = CURRENT_TIMESTAMP 
+        WHERE invite_code = %s
+        ''', (joined_user_id, invite_code))
 
+        # Award points if invitation points are enabled
+        if invitation_points is not None:
             # Add points to inviter
-            cursor.execute("UPDATE users SET points = points + %s WHERE user_id = %s", 
+            cursor.execute("UPDATE users SET points = points + %s WHERE user_id = %s RETURNING points", 
                           (invitation_points, invite['user_id']))
+            row = cursor.fetchone()
+            if row:
+                change = {"user_id": invite['user_id'], "points": row['points']}
+                _publish_user_change(cursor, change)
+                _add_to_points_buckets(cursor, invite['user_id'], invitation_points)
 
             # Record points history
             cursor.execute('''
@@ -361,263 +641,669 @@ def use_invite(invite_code, joined_user_id):
             VALUES (%s, %s, %s, NULL)
             ''', (invite['user_id'], invitation_points, 'invite'))
 
-    conn.commit()
-    conn.close()
+        conn.commit()
+
+    if change:
+        _apply_user_change(change)
     return invite["user_id"]  # Return the inviter user_id
 
 def record_game_start(chat_id, game_type, data, duration_seconds):
     """Record start of a game in a chat"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    # Calculate end time
-    end_time = datetime.now() + timedelta(seconds=duration_seconds)
+        # Calculate end time
+        end_time = datetime.now() + timedelta(seconds=duration_seconds)
 
-    # Try to end any existing active games of this type in this chat
-    cursor.execute('''
-    UPDATE active_games 
-    SET is_active = FALSE, end_time = CURRENT_TIMESTAMP 
-    WHERE chat_id = %s AND game_type = %s AND is_active = TRUE
-    ''', (chat_id, game_type))
+        # Try to end any existing active games of this type in this chat
+        cursor.execute('''
+        UPDATE active_games 
+        SET is_active = FALSE, end_time = CURRENT_TIMESTAMP 
+        WHERE chat_id = %s AND game_type = %s AND is_active = TRUE
+        ''', (chat_id, game_type))
 
-    # Insert new game
-    cursor.execute('''
-    INSERT INTO active_games (chat_id, game_type, data, start_time, end_time, is_active)
-    VALUES (%s, %s, %s, CURRENT_TIMESTAMP, %s, TRUE)
-    ''', (chat_id, game_type, data, end_time.strftime('%Y-%m-%d %H:%M:%S')))
+        # Insert new game
+        cursor.execute('''
+        INSERT INTO active_games (chat_id, game_type, data, start_time, end_time, is_active)
+        VALUES (%s, %s, %s, CURRENT_TIMESTAMP, %s, TRUE)
+        ''', (chat_id, game_type, data, end_time.strftime('%Y-%m-%d %H:%M:%S')))
 
-    conn.commit()
-    conn.close()
-    return True
+        conn.commit()
+        return True
 
 def get_active_game(chat_id, game_type):
     """Get active game data for a chat"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    cursor.execute('''
-    SELECT * FROM active_games 
-    WHERE chat_id = %s AND game_type = %s AND is_active = TRUE
-    ''', (chat_id, game_type))
+        cursor.execute('''
+        SELECT * FROM active_games 
+        WHERE chat_id = %s AND game_type = %s AND is_active = TRUE
+        ''', (chat_id, game_type))
 
-    game = cursor.fetchone()
-    conn.close()
+        game = cursor.fetchone()
 
-    return game
+        return game
 
 def end_game(chat_id, game_type):
     """Mark a game as ended"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        UPDATE active_games 
+        SET is_active = FALSE, end_time = CURRENT_TIMESTAMP 
+        WHERE chat_id = %s AND game_type = %s AND is_active = TRUE
+        ''', (chat_id, game_type))
+
+        conn.commit()
+        return True
+
+def save_active_games(games):
+    """Persist a batch of in-memory game states in a single upsert
+
+    Each item is (chat_id, game_type, data_json, start_time, end_time, is_active),
+    with start_time/end_time as datetime objects.
+    """
+    if not games:
+        return True
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        execute_values(cursor, '''
+        INSERT INTO active_games (chat_id, game_type, data, start_time, end_time, is_active)
+        VALUES %s
+        ON CONFLICT (chat_id, game_type)
+        DO UPDATE SET data = EXCLUDED.data, start_time = EXCLUDED.start_time,
+                      end_time = EXCLUDED.end_time, is_active = EXCLUDED.is_active
+        ''', games)
+
+        conn.commit()
+        return True
+
+def load_active_games():
+    """Close expired games and return the ones still active (used to rehydrate the game store)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+        cursor.execute('''
+        UPDATE active_games 
+        SET is_active = FALSE 
+        WHERE is_active = TRUE AND end_time IS NOT NULL AND end_time < %s
+        ''', (datetime.now(),))
+
+        cursor.execute('''
+        SELECT chat_id, game_type, data, start_time, end_time 
+        FROM active_games 
+        WHERE is_active = TRUE
+        ''')
+
+        games = cursor.fetchall()
+        conn.commit()
+        return games
+
+def setup_seen_content(cursor):
+    """Criar a tabela de conteúdos já usados por chat
+
+    Na primeira criação ela recebe o que estava acumulado em
+    active_games.used_questions.
+    """
+    cursor.execute("SELECT to_regclass('seen_content') IS NOT NULL")
+    seen_exists = cursor.fetchone()[0]
 
     cursor.execute('''
-    UPDATE active_games 
-    SET is_active = FALSE, end_time = CURRENT_TIMESTAMP 
-    WHERE chat_id = %s AND game_type = %s AND is_active = TRUE
-    ''', (chat_id, game_type))
+    CREATE TABLE IF NOT EXISTS seen_content (
+        chat_id BIGINT NOT NULL,
+        content_type TEXT NOT NULL,
+        content_id TEXT NOT NULL,
+        seen_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (chat_id, content_type, content_id)
+    )
+    ''')
 
-    conn.commit()
-    conn.close()
-    return True
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_seen_content_recent 
+    ON seen_content(chat_id, content_type, seen_at DESC)
+    ''')
 
-def record_used_question(chat_id, game_type, question_id):
-    """Record that a question was used to avoid repetition"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    if not seen_exists:
+        cursor.execute('''
+        INSERT INTO seen_content (chat_id, content_type, content_id)
+        SELECT DISTINCT chat_id, game_type, unnest(used_questions)
+        FROM active_games
+        ON CONFLICT DO NOTHING
+        ''')
+        logger.info(f"{cursor.rowcount} conteúdos usados importados de active_games")
+
+def record_seen_content(chat_id, content_type, content_id, window=SEEN_CONTENT_WINDOW):
+    """Registrar um conteúdo usado no chat, mantendo só os ``window`` mais recentes"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        INSERT INTO seen_content (chat_id, content_type, content_id, seen_at)
+        VALUES (%s, %s, %s, clock_timestamp())
+        ON CONFLICT (chat_id, content_type, content_id)
+        DO UPDATE SET seen_at = EXCLUDED.seen_at
+        ''', (chat_id, content_type, str(content_id)))
+
+        # Descartar o que saiu da janela
+        cursor.execute('''
+        DELETE FROM seen_content
+        WHERE chat_id = %s AND content_type = %s AND seen_at <= (
+            SELECT seen_at FROM seen_content
+            WHERE chat_id = %s AND content_type = %s
+            ORDER BY seen_at DESC
+            OFFSET %s LIMIT 1
+        )
+        ''', (chat_id, content_type, chat_id, content_type, window))
+
+        conn.commit()
+        return True
+
+def get_seen_content(chat_id, content_type, window=SEEN_CONTENT_WINDOW):
+    """Conteúdos usados no chat, do mais antigo ao mais recente (no máximo ``window``)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
+        cursor.execute('''
+        SELECT content_id FROM (
+            SELECT content_id, seen_at FROM seen_content
+            WHERE chat_id = %s AND content_type = %s
+            ORDER BY seen_at DESC
+            LIMIT %s
+        ) recent
+        ORDER BY seen_at
+        ''', (chat_id, content_type, window))
+
+        return [row[0] for row in cursor.fetchall()]
+
+def setup_content_decks(cursor):
+    """Criar a tabela dos baralhos de conteúdo por chat (ver deck_dealer.py)"""
     cursor.execute('''
-    UPDATE active_games 
-    SET used_questions = array_append(used_questions, %s)
-    WHERE chat_id = %s AND game_type = %s
-    ''', (question_id, chat_id, game_type))
+    CREATE TABLE IF NOT EXISTS content_decks (
+        chat_id BIGINT NOT NULL,
+        deck TEXT NOT NULL,
+        seed BIGINT NOT NULL,
+        position INTEGER NOT NULL DEFAULT 0,
+        size INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (chat_id, deck)
+    )
+    ''')
 
-    conn.commit()
-    conn.close()
-    return True
+def get_content_deck(chat_id, deck):
+    """Estado salvo de um baralho: (semente, posição, tamanho) ou None"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-def get_used_questions(chat_id, game_type):
-    """Get list of questions already used"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute('''
+        SELECT seed, position, size FROM content_decks
+        WHERE chat_id = %s AND deck = %s
+        ''', (chat_id, deck))
+
+        row = cursor.fetchone()
+        return tuple(row) if row else None
+
+def save_content_deck(chat_id, deck, seed, position, size):
+    """Gravar o estado de um baralho"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        INSERT INTO content_decks (chat_id, deck, seed, position, size, updated_at)
+        VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (chat_id, deck)
+        DO UPDATE SET seed = EXCLUDED.seed, position = EXCLUDED.position,
+                      size = EXCLUDED.size, updated_at = EXCLUDED.updated_at
+        ''', (chat_id, deck, seed, position, size))
+
+        conn.commit()
+        return True
+
+def setup_bingo_tables(cursor):
+    """Criar as tabelas de cartelas e sorteios do Bingo
+
+    Cada jogo é identificado por (chat_id, game_id), com game_id = início do
+    jogo em milissegundos. As cartelas são gravadas uma vez, empacotadas em 24
+    bytes (bingo_engine.pack_card), e cada sorteio é uma linha pequena.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS bingo_cards (
+        chat_id BIGINT NOT NULL,
+        game_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        first_name TEXT,
+        card BYTEA NOT NULL,
+        PRIMARY KEY (chat_id, game_id, user_id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS bingo_draws (
+        chat_id BIGINT NOT NULL,
+        game_id BIGINT NOT NULL,
+        seq SMALLINT NOT NULL,
+        number SMALLINT NOT NULL,
+        PRIMARY KEY (chat_id, game_id, seq)
+    )
+    ''')
+
+    # Jogos que não foram encerrados normalmente (ex.: bot desligado)
+    stale_before = int((datetime.now() - timedelta(days=1)).timestamp() * 1000)
+    cursor.execute("DELETE FROM bingo_cards WHERE game_id < %s", (stale_before,))
+    cursor.execute("DELETE FROM bingo_draws WHERE game_id < %s", (stale_before,))
+
+def save_bingo_card(chat_id, game_id, user_id, first_name, card):
+    """Gravar a cartela (empacotada) de um participante do Bingo"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        INSERT INTO bingo_cards (chat_id, game_id, user_id, first_name, card)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (chat_id, game_id, user_id)
+        DO UPDATE SET first_name = EXCLUDED.first_name, card = EXCLUDED.card
+        ''', (chat_id, game_id, user_id, first_name, card))
+
+        conn.commit()
+        return True
+
+def record_bingo_draw(chat_id, game_id, seq, number):
+    """Gravar o ``seq``-ésimo número sorteado de um jogo de Bingo"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        INSERT INTO bingo_draws (chat_id, game_id, seq, number)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (chat_id, game_id, seq) DO UPDATE SET number = EXCLUDED.number
+        ''', (chat_id, game_id, seq, number))
+
+        conn.commit()
+        return True
+
+def load_bingo_game(chat_id, game_id):
+    """Cartelas [(user_id, first_name, card)] e números sorteados (em ordem) de um jogo"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        SELECT user_id, first_name, card FROM bingo_cards
+        WHERE chat_id = %s AND game_id = %s
+        ''', (chat_id, game_id))
+        cards = [(row[0], row[1], bytes(row[2])) for row in cursor.fetchall()]
+
+        cursor.execute('''
+        SELECT number FROM bingo_draws
+        WHERE chat_id = %s AND game_id = %s
+        ORDER BY seq
+        ''', (chat_id, game_id))
+        draws = [row[0] for row in cursor.fetchall()]
+
+        return cards, draws
+
+def delete_bingo_game(chat_id, game_id):
+    """Apagar as cartelas e sorteios de um jogo de Bingo encerrado"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("DELETE FROM bingo_cards WHERE chat_id = %s AND game_id = %s", (chat_id, game_id))
+        cursor.execute("DELETE FROM bingo_draws WHERE chat_id = %s AND game_id = %s", (chat_id, game_id))
+
+        conn.commit()
+        return True
+
+def setup_game_schedules(cursor):
+    """Criar a tabela dos jogos automáticos agendados por chat (ver utils/scheduler.py)"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS game_schedules (
+        chat_id BIGINT PRIMARY KEY,
+        frequency_minutes INTEGER NOT NULL,
+        notification_minutes INTEGER NOT NULL DEFAULT 0,
+        next_run_at TIMESTAMP NOT NULL,
+        interval_factor REAL NOT NULL DEFAULT 1,
+        participation REAL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
 
+    # Frequência adaptativa (multiplicador do intervalo e média de jogadores)
+    cursor.execute('''
+    ALTER TABLE game_schedules ADD COLUMN IF NOT EXISTS interval_factor REAL NOT NULL DEFAULT 1
+    ''')
     cursor.execute('''
-    SELECT used_questions FROM active_games 
-    WHERE chat_id = %s AND game_type = %s
-    ''', (chat_id, game_type))
+    ALTER TABLE game_schedules ADD COLUMN IF NOT EXISTS participation REAL
+    ''')
+
+def save_game_schedule(chat_id, frequency_minutes, notification_minutes, next_run_at):
+    """Gravar (ou substituir) o agendamento de jogos automáticos de um chat"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        INSERT INTO game_schedules (chat_id, frequency_minutes, notification_minutes, next_run_at, updated_at)
+        VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (chat_id)
+        DO UPDATE SET frequency_minutes = EXCLUDED.frequency_minutes,
+                      notification_minutes = EXCLUDED.notification_minutes,
+                      next_run_at = EXCLUDED.next_run_at, updated_at = EXCLUDED.updated_at
+        ''', (chat_id, frequency_minutes, notification_minutes, next_run_at))
+
+        conn.commit()
+        return True
+
+def update_game_schedule_run(chat_id, next_run_at, interval_factor=1.0, participation=None):
+    """Registrar o horário do próximo jogo automático de um chat e a frequência adaptada"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    result = cursor.fetchone()
-    conn.close()
+        cursor.execute('''
+        UPDATE game_schedules
+        SET next_run_at = %s, interval_factor = %s, participation = %s, updated_at = CURRENT_TIMESTAMP
+        WHERE chat_id = %s
+        ''', (next_run_at, interval_factor, participation, chat_id))
+
+        conn.commit()
+        return True
+
+def update_game_schedules_frequency(frequency_minutes, notification_minutes):
+    """Aplicar uma nova frequência a todos os agendamentos"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        UPDATE game_schedules
+        SET frequency_minutes = %s, notification_minutes = %s, updated_at = CURRENT_TIMESTAMP
+        ''', (frequency_minutes, notification_minutes))
+
+        conn.commit()
+        return True
+
+def delete_game_schedule(chat_id):
+    """Remover o agendamento de jogos automáticos de um chat"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("DELETE FROM game_schedules WHERE chat_id = %s", (chat_id,))
+
+        conn.commit()
+        return True
 
-    return result['used_questions'] if result and 'used_questions' in result else []
+def load_game_schedules():
+    """Todos os agendamentos de jogos automáticos (usado para recriar os jobs na inicialização)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+        cursor.execute('''
+        SELECT chat_id, frequency_minutes, notification_minutes, next_run_at,
+               interval_factor, participation
+        FROM game_schedules
+        ''')
+
+        return cursor.fetchall()
+
+def record_used_question(chat_id, game_type, question_id):
+    """Record that a question was used to avoid repetition"""
+    return record_seen_content(chat_id, game_type, question_id)
+
+def get_used_questions(chat_id, game_type):
+    """Get list of questions already used"""
+    return get_seen_content(chat_id, game_type)
 
 def create_prize_claim(user_id, amount):
     """Create a new prize claim"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-    INSERT INTO prize_claims (user_id, amount, status)
-    VALUES (%s, %s, 'pending')
-    RETURNING id
-    ''', (user_id, amount))
+        cursor.execute('''
+        INSERT INTO prize_claims (user_id, amount, status)
+        VALUES (%s, %s, 'pending')
+        RETURNING id
+        ''', (user_id, amount))
 
-    claim_id = cursor.fetchone()[0]
+        claim_id = cursor.fetchone()[0]
 
-    conn.commit()
-    conn.close()
-    return claim_id
+        conn.commit()
+        return claim_id
 
 def update_prize_payment(prize_id, pix_key, platform_photo_id=None):
     """Update prize payment information"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    if platform_photo_id:
-        cursor.execute('''
-        UPDATE prize_claims 
-        SET pix_key = %s, platform_photo_id = %s, status = 'processing' 
-        WHERE id = %s
-        ''', (pix_key, platform_photo_id, prize_id))
-    else:
-        cursor.execute('''
-        UPDATE prize_claims 
-        SET pix_key = %s, status = 'processing' 
-        WHERE id = %s
-        ''', (pix_key, prize_id))
+        if platform_photo_id:
+            cursor.execute('''
+            UPDATE prize_claims 
+            SET pix_key = %s, platform_photo_id = %s, status = 'processing' 
+            WHERE id = %s
+            ''', (pix_key, platform_photo_id, prize_id))
+        else:
+            cursor.execute('''
+            UPDATE prize_claims 
+            SET pix_key = %s, status = 'processing' 
+            WHERE id = %s
+            ''', (pix_key, prize_id))
 
-    conn.commit()
-    conn.close()
-    return True
+        conn.commit()
+        return True
 
 def get_prize_claims(status=None, limit=50):
     """Get all prize claims for admin view"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    if status:
-        cursor.execute('''
-        SELECT p.*, u.username, u.first_name, u.last_name 
-        FROM prize_claims p
-        JOIN users u ON p.user_id = u.user_id
-        WHERE p.status = %s
-        ORDER BY p.claimed_at DESC
-        LIMIT %s
-        ''', (status, limit))
-    else:
-        cursor.execute('''
-        SELECT p.*, u.username, u.first_name, u.last_name 
-        FROM prize_claims p
-        JOIN users u ON p.user_id = u.user_id
-        ORDER BY p.claimed_at DESC
-        LIMIT %s
-        ''', (limit,))
+        if status:
+            cursor.execute('''
+            SELECT p.*, u.username, u.first_name, u.last_name 
+            FROM prize_claims p
+            JOIN users u ON p.user_id = u.user_id
+            WHERE p.status = %s
+            ORDER BY p.claimed_at DESC
+            LIMIT %s
+            ''', (status, limit))
+        else:
+            cursor.execute('''
+            SELECT p.*, u.username, u.first_name, u.last_name 
+            FROM prize_claims p
+            JOIN users u ON p.user_id = u.user_id
+            ORDER BY p.claimed_at DESC
+            LIMIT %s
+            ''', (limit,))
 
-    claims = cursor.fetchall()
-    conn.close()
+        claims = cursor.fetchall()
 
-    return claims
+        return claims
 
 def update_prize_claim_status(claim_id, status):
     """Update the status of a prize claim"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    if status == 'completed':
-        cursor.execute('''
-        UPDATE prize_claims 
-        SET status = %s, processed_at = CURRENT_TIMESTAMP 
-        WHERE id = %s
-        ''', (status, claim_id))
-    else:
-        cursor.execute('''
-        UPDATE prize_claims 
-        SET status = %s 
-        WHERE id = %s
-        ''', (status, claim_id))
+        if status == 'completed':
+            cursor.execute('''
+            UPDATE prize_claims 
+            SET status = %s, processed_at = CURRENT_TIMESTAMP 
+            WHERE id = %s
+            ''', (status, claim_id))
+        else:
+            cursor.execute('''
+            UPDATE prize_claims 
+            SET status = %s 
+            WHERE id = %s
+            ''', (status, claim_id))
 
-    conn.commit()
-    conn.close()
-    return True
+        conn.commit()
+        return True
 
 def get_user_invites(user_id):
     """Get all invites created by a user"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    cursor.execute('''
-    SELECT * FROM invites 
-    WHERE user_id = %s 
-    ORDER BY created_at DESC
-    ''', (user_id,))
+        cursor.execute('''
+        SELECT * FROM invites 
+        WHERE user_id = %s 
+        ORDER BY created_at DESC
+        ''', (user_id,))
 
-    invites = cursor.fetchall()
-    conn.close()
+        invites = cursor.fetchall()
 
-    return invites
+        return invites
 
 def get_user_points(user_id):
     """Get points for a specific user"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+        cursor.execute("SELECT points FROM users WHERE user_id = %s", (user_id,))
+        user = cursor.fetchone()
+
+        return user["points"] if user else 0
+
+# Cache das configurações: a tabela settings é carregada uma vez e recarregada
+# quando chega um NOTIFY no canal abaixo (enviado por update_setting, seja pelo
+# painel Flask ou pelo bot). Como salvaguarda, o cache expira após
+# SETTINGS_CACHE_MAX_AGE segundos caso o listener perca alguma notificação.
+SETTINGS_CHANNEL = "settings_changed"
+SETTINGS_CACHE_MAX_AGE = 300
+
+class SettingsCache:
+    """Valores da tabela settings em memória, com versões já convertidas"""
+
+    def __init__(self, max_age=SETTINGS_CACHE_MAX_AGE):
+        self.max_age = max_age
+        # (valores brutos, valores convertidos) trocados juntos a cada recarga
+        self._state = None
+        self._loaded_at = 0.0
+        # Incrementado a cada invalidação: uma carga que começou antes dela é descartada
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        state = self._state
+        if state is not None and time.monotonic() - self._loaded_at < self.max_age:
+            return state
+
+        with self._lock:
+            if self._state is not None and time.monotonic() - self._loaded_at < self.max_age:
+                return self._state
+
+            start_notification_listener()
+            for _ in range(3):
+                generation = self._generation
+                with get_db_connection() as conn:
+                    cursor = conn.cursor(cursor_factory=RealDictCursor)
+                    cursor.execute("SELECT setting_key, setting_value FROM settings")
+                    rows = cursor.fetchall()
+
+                state = ({row["setting_key"]: row["setting_value"] for row in rows}, {})
+                if generation == self._generation:
+                    self._state = state
+                    self._loaded_at = time.monotonic()
+                    return state
+            # Invalidações seguidas durante as cargas: usar a última leitura sem guardá-la
+            return state
+
+    def invalidate(self):
+        """Descartar os valores em cache (recarregados no próximo acesso)"""
+        self._generation += 1
+        self._state = None
+
+    def get(self, key, default=None):
+        values, _ = self._ensure_loaded()
+        return values.get(key, default)
+
+    def all(self):
+        values, _ = self._ensure_loaded()
+        return dict(values)
+
+    def get_parsed(self, key, parser, default):
+        """Obter o valor convertido por ``parser``, guardando o resultado"""
+        values, parsed = self._ensure_loaded()
+        cache_key = (key, parser)
+        if cache_key not in parsed:
+            raw = values.get(key)
+            try:
+                parsed[cache_key] = parser(raw) if raw is not None else default
+            except (TypeError, ValueError):
+                parsed[cache_key] = default
+        return parsed[cache_key]
+
+_settings_cache = SettingsCache()
+_notification_listener.subscribe(
+    SETTINGS_CHANNEL,
+    lambda payload: _settings_cache.invalidate(),
+    _settings_cache.invalidate
+)
+
+def _parse_bool(value):
+    return value.strip().lower() in ("true", "1", "yes", "sim")
+
+def _parse_id_set(value):
+    return frozenset(json.loads(value))
+
+def _parse_str_set(value):
+    return frozenset(str(item) for item in json.loads(value))
 
-    cursor.execute("SELECT points FROM users WHERE user_id = %s", (user_id,))
-    user = cursor.fetchone()
+def get_setting(key, default=None):
+    """Get a setting value (served from the settings cache)"""
+    return _settings_cache.get(key, default)
 
-    conn.close()
-    return user["points"] if user else 0
+def get_setting_int(key, default=0):
+    """Get a setting converted to int"""
+    return _settings_cache.get_parsed(key, int, default)
 
-def get_setting(key, default=None):
-    """Get a setting value from the database"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+def get_setting_float(key, default=0.0):
+    """Get a setting converted to float"""
+    return _settings_cache.get_parsed(key, float, default)
 
-    cursor.execute("SELECT setting_value FROM settings WHERE setting_key = %s", (key,))
-    setting = cursor.fetchone()
+def get_setting_bool(key, default=False):
+    """Get a setting converted to bool ('true', '1', ...)"""
+    return _settings_cache.get_parsed(key, _parse_bool, default)
 
-    conn.close()
-    return setting["setting_value"] if setting else default
+def get_admin_ids():
+    """Get the set of bot admin ids from the admin_ids setting"""
+    return _settings_cache.get_parsed("admin_ids", _parse_id_set, frozenset())
 
-def update_setting(key, value):
-    """Update a setting value in the database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def get_allowed_chats():
+    """Get the set of allowed chat ids (as strings); empty means every chat"""
+    return _settings_cache.get_parsed("allowed_chats", _parse_str_set, frozenset())
 
-    cursor.execute('''
-    INSERT INTO settings (setting_key, setting_value, updated_at)
-    VALUES (%s, %s, CURRENT_TIMESTAMP)
-    ON CONFLICT (setting_key) 
-    DO UPDATE SET setting_value = %s, updated_at = CURRENT_TIMESTAMP
-    ''', (key, value, value))
-
-    conn.commit()
-    conn.close()
-    return True
+def invalidate_settings_cache():
+    """Force the settings to be reloaded on the next access"""
+    _settings_cache.invalidate()
 
-def get_all_settings():
-    """Get all settings as a dictionary"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+def update_setting(key, value):
+    """Update a setting value in the database and notify every process"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("SELECT setting_key, setting_value FROM settings")
-    settings = cursor.fetchall()
+        cursor.execute('''
+        INSERT INTO settings (setting_key, setting_value, updated_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (setting_key) 
+        DO UPDATE SET setting_value = %s, updated_at = CURRENT_TIMESTAMP
+        ''', (key, value, value))
+
+        # Entregue aos listeners somente após o commit
+        cursor.execute("SELECT pg_notify(%s, %s)", (SETTINGS_CHANNEL, key))
 
-    conn.close()
+        conn.commit()
 
-    result = {}
-    for setting in settings:
-        result[setting["setting_key"]] = setting["setting_value"]
+    _settings_cache.invalidate()
+    return True
 
-    return result
+def get_all_settings():
+    """Get all settings as a dictionary"""
+    return _settings_cache.all()
 
 def is_admin(user_id, admin_ids=None):
     """Verificar se um usuário é administrador do bot"""
     if admin_ids is None:
-        # Obter lista de administradores do banco de dados
-        admin_ids_str = get_setting("admin_ids", "[]")
-        try:
-            admin_ids = json.loads(admin_ids_str)
-        except:
-            admin_ids = []
+        # Conjunto de administradores já convertido, vindo do cache
+        admin_ids = get_admin_ids()
     
     return user_id in admin_ids
 
@@ -644,295 +1330,380 @@ def is_group_admin(update):
 
 def is_chat_allowed(chat_id):
     """Verificar se o chat está na lista de grupos permitidos"""
-    allowed_chats_str = get_setting("allowed_chats", "[]")
-    try:
-        allowed_chats = json.loads(allowed_chats_str)
-        # Se a lista estiver vazia, permitir todos os grupos (configuração padrão)
-        if not allowed_chats:
-            return True
-        
-        # Verificar se o chat está na lista de permitidos
-        return str(chat_id) in [str(c) for c in allowed_chats]
-    except:
-        # Em caso de erro, permitir (comportamento mais seguro)
+    # Conjunto já convertido vindo do cache; se a configuração for inválida o
+    # conjunto fica vazio e todos os grupos são permitidos (comportamento anterior)
+    allowed_chats = get_allowed_chats()
+    
+    # Se a lista estiver vazia, permitir todos os grupos (configuração padrão)
+    if not allowed_chats:
         return True
+    
+    # Verificar se o chat está na lista de permitidos
+    return str(chat_id) in allowed_chats
 
 def add_user_activity(user_id, chat_id, activity_type):
     """Registrar atividade de um usuário em um grupo"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Verificar se o usuário já está registrado
-    cursor.execute("SELECT id FROM users WHERE user_id = %s", (user_id,))
-    if cursor.fetchone() is None:
-        # Não registrar atividade se o usuário não estiver no sistema
-        conn.close()
-        return False
-    
-    # Registrar nova atividade
+    return add_user_activity_batch([(user_id, chat_id, activity_type, 1, datetime.now())]) > 0
+
+def add_user_activity_batch(rows):
+    """Registrar várias atividades com um único INSERT de múltiplas linhas
+
+    Cada item é (user_id, chat_id, activity_type, event_count, created_at).
+    Atividades de usuários que não estão na tabela users são ignoradas.
+    Retorna o número de linhas inseridas.
+    """
+    if not rows:
+        return 0
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        # O JOIN com users descarta usuários não registrados sem violar a
+        # chave estrangeira e derrubar o lote inteiro
+        execute_values(cursor, '''
+        INSERT INTO user_activity (user_id, chat_id, activity_type, event_count, created_at)
+        SELECT v.user_id, v.chat_id, v.activity_type, v.event_count, v.created_at
+        FROM (VALUES %s) AS v(user_id, chat_id, activity_type, event_count, created_at)
+        JOIN users u ON u.user_id = v.user_id
+        ''', rows, template="(%s::bigint, %s::bigint, %s, %s::integer, %s::timestamp)", page_size=len(rows))
+        inserted = cursor.rowcount
+
+        # Manter a contagem diária na mesma transação
+        execute_values(cursor, '''
+        INSERT INTO user_activity_daily (chat_id, user_id, day, event_count)
+        SELECT v.chat_id, v.user_id, v.created_at::date, SUM(v.event_count)
+        FROM (VALUES %s) AS v(user_id, chat_id, activity_type, event_count, created_at)
+        JOIN users u ON u.user_id = v.user_id
+        GROUP BY v.chat_id, v.user_id, v.created_at::date
+        ON CONFLICT (chat_id, user_id, day)
+        DO UPDATE SET event_count = user_activity_daily.event_count + EXCLUDED.event_count
+        ''', rows, template="(%s::bigint, %s::bigint, %s, %s::integer, %s::timestamp)", page_size=len(rows))
+
+        conn.commit()
+        return inserted
+
+def setup_activity_rollup(cursor):
+    """Criar a tabela de contagem diária de atividade por (chat, usuário)
+
+    Na primeira criação a tabela é preenchida a partir das atividades
+    brutas da janela de ACTIVITY_WINDOW_DAYS dias, os mesmos dias lidos por
+    get_active_members (day > CURRENT_DATE - ACTIVITY_WINDOW_DAYS).
+    """
+    cursor.execute("SELECT to_regclass('user_activity_daily') IS NOT NULL")
+    rollup_exists = cursor.fetchone()[0]
+
     cursor.execute('''
-    INSERT INTO user_activity (user_id, chat_id, activity_type, created_at)
-    VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
-    ''', (user_id, chat_id, activity_type))
-    
-    conn.commit()
-    conn.close()
-    return True
+    CREATE TABLE IF NOT EXISTS user_activity_daily (
+        chat_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        day DATE NOT NULL,
+        event_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (chat_id, user_id, day),
+        CONSTRAINT fk_activity_daily_user_id FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_user_activity_daily_day 
+    ON user_activity_daily(day)
+    ''')
+
+    if not rollup_exists:
+        cursor.execute('''
+        INSERT INTO user_activity_daily (chat_id, user_id, day, event_count)
+        SELECT chat_id, user_id, created_at::date, SUM(event_count)
+        FROM user_activity
+        WHERE created_at >= CURRENT_DATE - %s + 1
+        GROUP BY chat_id, user_id, created_at::date
+        ''', (ACTIVITY_WINDOW_DAYS,))
+        logger.info(f"Contagem diária de atividade preenchida com {cursor.rowcount} linhas")
+
+def purge_old_activity(raw_days=ACTIVITY_WINDOW_DAYS, daily_days=ACTIVITY_DAILY_RETENTION_DAYS, batch_size=10000):
+    """Apagar atividades brutas e contagens diárias fora do período de retenção
+
+    As linhas brutas são apagadas em lotes para não segurar locks longos.
+    Retorna (linhas brutas apagadas, linhas diárias apagadas).
+    """
+    raw_deleted = 0
+    while True:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            DELETE FROM user_activity
+            WHERE id IN (
+                SELECT id FROM user_activity
+                WHERE created_at < CURRENT_DATE - %s
+                LIMIT %s
+            )
+            ''', (raw_days, batch_size))
+            deleted = cursor.rowcount
+            conn.commit()
+        raw_deleted += deleted
+        if deleted < batch_size:
+            break
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        DELETE FROM user_activity_daily
+        WHERE day < CURRENT_DATE - %s
+        ''', (daily_days,))
+        daily_deleted = cursor.rowcount
+        conn.commit()
+
+    return raw_deleted, daily_deleted
 
 def get_active_members(chat_id, limit=20):
     """Obter lista de membros mais ativos em um grupo"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
     
-    # Consulta para obter os membros mais ativos
-    cursor.execute('''
-    SELECT 
-        u.user_id, 
-        u.username, 
-        u.first_name, 
-        u.last_name,
-        COUNT(a.id) as activity_score
-    FROM 
-        users u
-    JOIN 
-        user_activity a ON u.user_id = a.user_id
-    WHERE 
-        a.chat_id = %s
-        AND a.created_at > CURRENT_TIMESTAMP - INTERVAL '30 days'
-    GROUP BY 
-        u.user_id, u.username, u.first_name, u.last_name
-    ORDER BY 
-        activity_score DESC
-    LIMIT %s
-    ''', (chat_id, limit))
+        # Soma das contagens diárias da janela (no máximo uma linha por dia
+        # para cada usuário), juntando com users só os membros do topo
+        cursor.execute('''
+        SELECT 
+            u.user_id, 
+            u.username, 
+            u.first_name, 
+            u.last_name,
+            d.activity_score
+        FROM (
+            SELECT user_id, SUM(event_count) AS activity_score
+            FROM user_activity_daily
+            WHERE chat_id = %s AND day > CURRENT_DATE - %s
+            GROUP BY user_id
+            ORDER BY activity_score DESC
+            LIMIT %s
+        ) d
+        JOIN 
+            users u ON u.user_id = d.user_id
+        ORDER BY 
+            d.activity_score DESC
+        ''', (chat_id, ACTIVITY_WINDOW_DAYS, limit))
     
-    active_members = cursor.fetchall()
-    conn.close()
+        active_members = cursor.fetchall()
     
-    return active_members
+        return active_members
 
 def setup_activity_tables():
     """Configurar tabelas para rastreamento de atividade"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
     
-    # Tabela para armazenar atividades dos usuários
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS user_activity (
-        id SERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        chat_id BIGINT NOT NULL,
-        activity_type VARCHAR(50) NOT NULL,
-        created_at TIMESTAMP NOT NULL,
-        FOREIGN KEY (user_id) REFERENCES users(user_id)
-    )
-    ''')
+        # Tabela para armazenar atividades dos usuários
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_activity (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            chat_id BIGINT NOT NULL,
+            activity_type VARCHAR(50) NOT NULL,
+            event_count INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+        ''')
+
+        cursor.execute('''
+        ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS event_count INTEGER NOT NULL DEFAULT 1
+        ''')
     
-    # Índice para consultas de atividade
-    cursor.execute('''
-    CREATE INDEX IF NOT EXISTS idx_user_activity_chat_user 
-    ON user_activity(chat_id, user_id)
-    ''')
+        # Índice para consultas de atividade
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_activity_chat_user 
+        ON user_activity(chat_id, user_id)
+        ''')
     
-    cursor.execute('''
-    CREATE INDEX IF NOT EXISTS idx_user_activity_created_at 
-    ON user_activity(created_at)
-    ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_activity_created_at 
+        ON user_activity(created_at)
+        ''')
+
+        setup_activity_rollup(cursor)
     
-    conn.commit()
-    conn.close()
+        conn.commit()
 
 # Funções para a lojinha
 def create_shop_item(name, description, points_cost):
     """Create a new item in the shop"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-    INSERT INTO shop_items (name, description, points_cost)
-    VALUES (%s, %s, %s)
-    RETURNING id
-    ''', (name, description, points_cost))
+        cursor.execute('''
+        INSERT INTO shop_items (name, description, points_cost)
+        VALUES (%s, %s, %s)
+        RETURNING id
+        ''', (name, description, points_cost))
 
-    item_id = cursor.fetchone()[0]
+        item_id = cursor.fetchone()[0]
 
-    conn.commit()
-    conn.close()
-    return item_id
+        conn.commit()
+        return item_id
 
 def update_shop_item(item_id, name, description, points_cost, is_active):
     """Update an existing shop item"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-    UPDATE shop_items 
-    SET name = %s, description = %s, points_cost = %s, is_active = %s, updated_at = CURRENT_TIMESTAMP
-    WHERE id = %s
-    ''', (name, description, points_cost, is_active, item_id))
+        cursor.execute('''
+        UPDATE shop_items 
+        SET name = %s, description = %s, points_cost = %s, is_active = %s, updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s
+        ''', (name, description, points_cost, is_active, item_id))
 
-    conn.commit()
-    conn.close()
-    return True
+        conn.commit()
+        return True
 
 def delete_shop_item(item_id):
     """Delete a shop item"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("DELETE FROM shop_items WHERE id = %s", (item_id,))
+        cursor.execute("DELETE FROM shop_items WHERE id = %s", (item_id,))
     
-    deleted = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
-    return deleted
+        deleted = cursor.rowcount > 0
+        conn.commit()
+        return deleted
 
 def get_shop_items(active_only=True):
     """Get all items from the shop"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    if active_only:
-        cursor.execute("SELECT * FROM shop_items WHERE is_active = TRUE ORDER BY points_cost ASC")
-    else:
-        cursor.execute("SELECT * FROM shop_items ORDER BY points_cost ASC")
+        if active_only:
+            cursor.execute("SELECT * FROM shop_items WHERE is_active = TRUE ORDER BY points_cost ASC")
+        else:
+            cursor.execute("SELECT * FROM shop_items ORDER BY points_cost ASC")
 
-    items = cursor.fetchall()
-    conn.close()
+        items = cursor.fetchall()
 
-    return items
+        return items
 
 def get_shop_item(item_id):
     """Get a specific shop item"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    cursor.execute("SELECT * FROM shop_items WHERE id = %s", (item_id,))
-    item = cursor.fetchone()
+        cursor.execute("SELECT * FROM shop_items WHERE id = %s", (item_id,))
+        item = cursor.fetchone()
 
-    conn.close()
-    return item
+        return item
 
 def purchase_shop_item(user_id, item_id, delivery_info):
     """Purchase an item from the shop"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Get the item and user points
-    cursor.execute("SELECT * FROM shop_items WHERE id = %s AND is_active = TRUE", (item_id,))
-    item = cursor.fetchone()
+        # Get the item and user points
+        cursor.execute("SELECT * FROM shop_items WHERE id = %s AND is_active = TRUE", (item_id,))
+        item = cursor.fetchone()
 
-    if not item:
-        conn.close()
-        return False, "Item não encontrado ou inativo"
+        if not item:
+            return False, "Item não encontrado ou inativo"
 
-    cursor.execute("SELECT points FROM users WHERE user_id = %s", (user_id,))
-    user = cursor.fetchone()
+        cursor.execute("SELECT points FROM users WHERE user_id = %s", (user_id,))
+        user = cursor.fetchone()
 
-    if not user:
-        conn.close()
-        return False, "Usuário não encontrado"
+        if not user:
+            return False, "Usuário não encontrado"
 
-    if user["points"] < item["points_cost"]:
-        conn.close()
-        return False, "Pontos insuficientes"
+        if user["points"] < item["points_cost"]:
+            return False, "Pontos insuficientes"
 
-    try:
-        # Begin transaction
-        cursor.execute("BEGIN")
+        try:
+            # Begin transaction
+            cursor.execute("BEGIN")
 
-        # Subtract points from user
-        cursor.execute("UPDATE users SET points = points - %s WHERE user_id = %s", 
-                      (item["points_cost"], user_id))
+            # Subtract points from user
+            cursor.execute("UPDATE users SET points = points - %s WHERE user_id = %s RETURNING points", 
+                          (item["points_cost"], user_id))
+            change = {"user_id": user_id, "points": cursor.fetchone()["points"]}
 
-        # Create purchase record
-        cursor.execute('''
-        INSERT INTO shop_purchases (user_id, item_id, points_spent, delivery_info)
-        VALUES (%s, %s, %s, %s)
-        RETURNING id
-        ''', (user_id, item_id, item["points_cost"], delivery_info))
+            # Create purchase record
+            cursor.execute('''
+            INSERT INTO shop_purchases (user_id, item_id, points_spent, delivery_info)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id
+            ''', (user_id, item_id, item["points_cost"], delivery_info))
 
-        purchase_id = cursor.fetchone()["id"]
+            purchase_id = cursor.fetchone()["id"]
 
-        # Record points history
-        cursor.execute('''
-        INSERT INTO points_history (user_id, points, game_type, response_time)
-        VALUES (%s, %s, %s, NULL)
-        ''', (user_id, -item["points_cost"], 'shop_purchase'))
+            # Record points history
+            cursor.execute('''
+            INSERT INTO points_history (user_id, points, game_type, response_time)
+            VALUES (%s, %s, %s, NULL)
+            ''', (user_id, -item["points_cost"], 'shop_purchase'))
+
+            _publish_user_change(cursor, change)
 
-        # Commit transaction
-        cursor.execute("COMMIT")
+            # Commit transaction
+            cursor.execute("COMMIT")
 
-        conn.close()
-        return True, purchase_id
+            _apply_user_change(change)
+            return True, purchase_id
 
-    except Exception as e:
-        cursor.execute("ROLLBACK")
-        conn.close()
-        return False, str(e)
+        except Exception as e:
+            cursor.execute("ROLLBACK")
+            return False, str(e)
 
 def get_user_purchases(user_id):
     """Get all purchases made by a user"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    cursor.execute('''
-    SELECT p.*, i.name as item_name, i.description as item_description 
-    FROM shop_purchases p
-    JOIN shop_items i ON p.item_id = i.id
-    WHERE p.user_id = %s
-    ORDER BY p.purchased_at DESC
-    ''', (user_id,))
+        cursor.execute('''
+        SELECT p.*, i.name as item_name, i.description as item_description 
+        FROM shop_purchases p
+        JOIN shop_items i ON p.item_id = i.id
+        WHERE p.user_id = %s
+        ORDER BY p.purchased_at DESC
+        ''', (user_id,))
 
-    purchases = cursor.fetchall()
-    conn.close()
+        purchases = cursor.fetchall()
 
-    return purchases
+        return purchases
 
 def get_all_purchases(status=None, limit=50):
     """Get all purchases for admin view"""
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-    if status:
-        cursor.execute('''
-        SELECT p.*, u.username, u.first_name, u.last_name, i.name as item_name 
-        FROM shop_purchases p
-        JOIN users u ON p.user_id = u.user_id
-        JOIN shop_items i ON p.item_id = i.id
-        WHERE p.status = %s
-        ORDER BY p.purchased_at DESC
-        LIMIT %s
-        ''', (status, limit))
-    else:
-        cursor.execute('''
-        SELECT p.*, u.username, u.first_name, u.last_name, i.name as item_name 
-        FROM shop_purchases p
-        JOIN users u ON p.user_id = u.user_id
-        JOIN shop_items i ON p.item_id = i.id
-        ORDER BY p.purchased_at DESC
-        LIMIT %s
-        ''', (limit,))
+        if status:
+            cursor.execute('''
+            SELECT p.*, u.username, u.first_name, u.last_name, i.name as item_name 
+            FROM shop_purchases p
+            JOIN users u ON p.user_id = u.user_id
+            JOIN shop_items i ON p.item_id = i.id
+            WHERE p.status = %s
+            ORDER BY p.purchased_at DESC
+            LIMIT %s
+            ''', (status, limit))
+        else:
+            cursor.execute('''
+            SELECT p.*, u.username, u.first_name, u.last_name, i.name as item_name 
+            FROM shop_purchases p
+            JOIN users u ON p.user_id = u.user_id
+            JOIN shop_items i ON p.item_id = i.id
+            ORDER BY p.purchased_at DESC
+            LIMIT %s
+            ''', (limit,))
 
-    purchases = cursor.fetchall()
-    conn.close()
+        purchases = cursor.fetchall()
 
-    return purchases
+        return purchases
 
 def update_purchase_status(purchase_id, status):
     """Update the status of a purchase"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-    UPDATE shop_purchases 
-    SET status = %s, processed_at = CURRENT_TIMESTAMP 
-    WHERE id = %s
-    ''', (status, purchase_id))
+        cursor.execute('''
+        UPDATE shop_purchases 
+        SET status = %s, processed_at = CURRENT_TIMESTAMP 
+        WHERE id = %s
+        ''', (status, purchase_id))
 
-    conn.commit()
-    conn.close()
-    return True
+        conn.commit()
+        return True
 
 # Função get_user_invites já existe acima
 
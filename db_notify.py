@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: db_notify.py - Escuta de LISTEN/NOTIFY do PostgreSQL para os caches
+#
+# O bot e o painel Flask rodam em processos separados e cada um mantém caches
+# em memória (configurações, placar). Quem altera os dados envia um NOTIFY na
+# mesma transação; aqui uma thread com conexão dedicada recebe as notificações
+# de todos os canais inscritos e repassa para os callbacks de cada cache.
+
+import time
+import select
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psycopg2
+import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationListener:
+    """Thread única que escuta vários canais NOTIFY.
+
+    Cada inscrição tem ``on_notify(payload)``, chamado a cada notificação, e
+    ``on_reset()``, chamado quando a conexão é (re)estabelecida ou cai, já que
+    notificações enviadas nesse intervalo se perdem e o cache deve recarregar.
+    """
+
+    def __init__(self, dsn: str, reconnect_delay: float = 5, poll_timeout: float = 5):
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self.poll_timeout = poll_timeout
+        self._subscribers: Dict[str, List[Tuple[Callable, Optional[Callable]]]] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._resubscribe = False
+
+    def subscribe(self, channel: str, on_notify: Callable, on_reset: Optional[Callable] = None) -> None:
+        """Inscrever callbacks em um canal (a thread é iniciada por ``start``)."""
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append((on_notify, on_reset))
+            self._resubscribe = True
+
+    def start(self) -> None:
+        """Iniciar a thread de escuta, se ainda não estiver rodando."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-notify", daemon=True)
+                self._thread.start()
+
+    def _reset_all(self) -> None:
+        with self._lock:
+            callbacks = [on_reset for subs in self._subscribers.values() for _, on_reset in subs if on_reset]
+        for on_reset in callbacks:
+            try:
+                on_reset()
+            except Exception as e:
+                logger.error(f"Erro ao reiniciar cache após reconexão: {e}")
+
+    def _dispatch(self, notify) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(notify.channel, ()))
+        for on_notify, _ in subscribers:
+            try:
+                on_notify(notify.payload)
+            except Exception as e:
+                logger.error(f"Erro ao processar notificação de {notify.channel}: {e}")
+
+    def _run(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = conn.cursor()
+                with self._lock:
+                    channels = list(self._subscribers)
+                    self._resubscribe = False
+                for channel in channels:
+                    cursor.execute(f"LISTEN {channel}")
+                # Alterações feitas antes do LISTEN podem ter se perdido
+                self._reset_all()
+
+                while not self._resubscribe:
+                    if select.select([conn], [], [], self.poll_timeout) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0))
+            except Exception as e:
+                logger.error(f"Erro no listener de notificações: {e}")
+                self._reset_all()
+                time.sleep(self.reconnect_delay)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: db_pool.py - Pool de conexões PostgreSQL usado por database.py
+
+import os
+import time
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhaustedError(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo máximo de espera."""
+
+
+class ConnectionPool:
+    """Pool de conexões limitado, seguro para threads.
+
+    - Mantém entre ``minconn`` e ``maxconn`` conexões abertas.
+    - Conexões paradas há mais de ``health_check_interval`` segundos são
+      testadas com ``SELECT 1`` antes de serem entregues.
+    - Conexões ociosas há mais de ``idle_timeout`` segundos são fechadas,
+      respeitando o mínimo.
+    - Quando o pool está cheio, ``getconn`` espera até ``checkout_timeout``
+      segundos por uma conexão devolvida.
+    """
+
+    def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 10,
+                 idle_timeout: float = 300, health_check_interval: float = 30,
+                 checkout_timeout: float = 10):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Limites do pool inválidos")
+
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+
+        # Conexões livres como (conexão, instante da devolução); a mais
+        # recente fica à direita para que as antigas envelheçam e sejam fechadas
+        self._idle = deque()
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self._closed = False
+
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "created": 0,
+            "reaped_idle": 0,
+            "discarded_broken": 0,
+        }
+
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _check_fork(self) -> None:
+        """Descartar conexões herdadas do processo pai (ex.: workers do gunicorn)."""
+        if os.getpid() != self._pid:
+            self._idle.clear()
+            self._in_use = 0
+            self._pid = os.getpid()
+
+    def _reap_idle(self) -> None:
+        """Fechar conexões ociosas além do mínimo. Chamar com o lock adquirido."""
+        now = time.monotonic()
+        while self._idle and len(self._idle) + self._in_use > self.minconn:
+            conn, returned_at = self._idle[0]
+            if now - returned_at < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._close_quietly(conn)
+            self._stats["reaped_idle"] += 1
+
+    def _is_healthy(self, conn, returned_at: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Retirar uma conexão do pool, abrindo uma nova se houver espaço."""
+        if timeout is None:
+            timeout = self.checkout_timeout
+
+        started = time.monotonic()
+        waited = False
+        conn = None
+        returned_at = None
+
+        with self._cond:
+            if self._closed:
+                raise PoolExhaustedError("O pool de conexões foi encerrado")
+            self._check_fork()
+            while True:
+                self._reap_idle()
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._in_use < self.maxconn:
+                    break
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolExhaustedError(
+                        f"Nenhuma conexão livre após {timeout:.1f}s "
+                        f"({self._in_use}/{self.maxconn} em uso)"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            wait_seconds = time.monotonic() - started
+            self._stats["checkouts"] += 1
+            self._stats["total_wait_seconds"] += wait_seconds
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], wait_seconds)
+            if waited:
+                self._stats["waits"] += 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn, returned_at):
+                self._close_quietly(conn)
+                with self._cond:
+                    self._stats["discarded_broken"] += 1
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """Devolver uma conexão ao pool, desfazendo transações pendentes."""
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._in_use = max(0, self._in_use - 1)
+            if discard or conn.closed or self._closed:
+                self._close_quietly(conn)
+                if discard:
+                    self._stats["discarded_broken"] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._reap_idle()
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager que retira e devolve uma conexão do pool."""
+        conn = self.getconn(timeout)
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def stats(self) -> Dict:
+        """Estatísticas de uso do pool, incluindo tempos de espera no checkout."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["in_use"] = self._in_use
+            stats["idle"] = len(self._idle)
+            stats["minconn"] = self.minconn
+            stats["maxconn"] = self.maxconn
+        checkouts = stats["checkouts"]
+        stats["avg_wait_seconds"] = stats["total_wait_seconds"] / checkouts if checkouts else 0.0
+        return stats
+
+    def closeall(self) -> None:
+        """Fechar todas as conexões ociosas e recusar novos checkouts."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._close_quietly(conn)
+            self._cond.notify_all()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: deck_dealer.py - Distribuição de conteúdo sem repetição por chat
+#
+# Cada chat tem, para cada jogo, um "baralho": uma permutação das posições da
+# lista de conteúdo (perguntas do quiz, sequências de emoji, mímicas, filmes
+# locais) e um cursor. Cada sorteio entrega a carta do cursor e avança, então
+# nada se repete até o baralho acabar; aí ele é embaralhado de novo.
+#
+# A permutação não é gravada: ela é gerada a partir de uma semente, e o banco
+# guarda só (semente, posição, tamanho) por chat e baralho. Se o tamanho da
+# lista mudar, o baralho é refeito.
+
+import random
+import asyncio
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import database
+from async_database import run_in_db_executor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Deck:
+    """Permutação de ``size`` posições gerada a partir de ``seed``, com cursor."""
+
+    __slots__ = ("seed", "position", "size", "order")
+
+    def __init__(self, seed: int, position: int, size: int):
+        self.seed = seed
+        self.position = position
+        self.size = size
+        self.order: List[int] = list(range(size))
+        random.Random(seed).shuffle(self.order)
+
+    @classmethod
+    def shuffled(cls, size: int, avoid_first: Optional[int] = None) -> "Deck":
+        """Novo baralho; ``avoid_first`` evita repetir a última carta do baralho anterior."""
+        while True:
+            deck = cls(random.getrandbits(63), 0, size)
+            if size < 2 or deck.order[0] != avoid_first:
+                return deck
+
+    @property
+    def exhausted(self) -> bool:
+        return self.position >= self.size
+
+
+class DeckDealer:
+    """Baralhos por (chat, jogo), persistidos de forma compacta em content_decks."""
+
+    def __init__(self):
+        self._decks: Dict[Tuple[int, str], Deck] = {}
+        # Não são descartados: um lock novo deixaria o mesmo baralho ser
+        # carregado duas vezes em paralelo
+        self._load_locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+
+    async def _load(self, chat_id: int, name: str, size: int) -> Deck:
+        key = (chat_id, name)
+        deck = self._decks.get(key)
+        if deck is not None and deck.size == size:
+            return deck
+
+        lock = self._load_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            deck = self._decks.get(key)
+            if deck is None:
+                try:
+                    row = await run_in_db_executor(database.get_content_deck, chat_id, name)
+                except Exception as e:
+                    logger.error(f"Erro ao carregar baralho {name} do chat {chat_id}: {e}")
+                    row = None
+                if row:
+                    deck = Deck(*row)
+            if deck is None or deck.size != size:
+                deck = Deck.shuffled(size)
+            self._decks[key] = deck
+        return deck
+
+    async def draw(self, chat_id: int, name: str, items: Sequence[T]) -> Optional[T]:
+        """Entregar o próximo item do baralho ``name`` do chat (sem repetição até acabar)."""
+        if not items:
+            return None
+        deck = await self._load(chat_id, name, len(items))
+        if deck.exhausted:
+            deck = self._decks[(chat_id, name)] = Deck.shuffled(len(items), avoid_first=deck.order[-1])
+
+        item = items[deck.order[deck.position]]
+        deck.position += 1
+        try:
+            await run_in_db_executor(
+                database.save_content_deck, chat_id, name, deck.seed, deck.position, deck.size
+            )
+        except Exception as e:
+            logger.error(f"Erro ao gravar baralho {name} do chat {chat_id}: {e}")
+        return item
+
+# Instância compartilhada
+deck_dealer = DeckDealer()
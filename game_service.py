@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: game_service.py - Início dos jogos, independente de comandos do Telegram
+#
+# Cada módulo de jogo registra aqui a função que prepara e envia o jogo a um
+# chat (decorador ``game_starter``). Os comandos (/quiz, /filme...) e o
+# agendador de jogos automáticos chamam ``start_game(chat_id, game_type,
+# initiator)``: os comandos passam o usuário que pediu o jogo, e o agendador
+# não passa ninguém, sem precisar montar um Update nem registrar um usuário.
+#
+# Quando o jogo não pode começar (já existe um em andamento, sem conteúdo...)
+# a função levanta GameStartError com a mensagem para quem pediu.
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# starter(bot, chat_id, initiator) envia o jogo ao chat
+GameStarter = Callable[[Any, int, Optional[Any]], Awaitable[None]]
+
+
+class GameStartError(Exception):
+    """O jogo não pôde ser iniciado; a mensagem é mostrada a quem pediu."""
+
+
+class GameService:
+    """Registro das funções de início de cada jogo."""
+
+    def __init__(self):
+        self.bot = None
+        # game_type -> (starter, pode começar sem alguém que peça)
+        self._starters: Dict[str, Tuple[GameStarter, bool]] = {}
+
+    def attach(self, bot) -> None:
+        """Definir o bot usado para enviar os jogos (chamado no post_init do bot)."""
+        self.bot = bot
+
+    def register(self, game_type: str, starter: GameStarter, automatic: bool = True) -> None:
+        self._starters[game_type] = (starter, automatic)
+
+    def automatic_games(self) -> List[str]:
+        """Jogos que podem ser iniciados pelo agendador."""
+        return [game_type for game_type, (_, automatic) in self._starters.items() if automatic]
+
+    async def start_game(self, chat_id: int, game_type: str, initiator=None) -> None:
+        """Iniciar um jogo no chat. ``initiator`` é o usuário que pediu (None para jogos automáticos)."""
+        if game_type not in self._starters:
+            raise GameStartError(f"⚠️ Jogo desconhecido: {game_type}")
+        starter, automatic = self._starters[game_type]
+        if initiator is None and not automatic:
+            raise GameStartError(f"⚠️ O jogo {game_type} precisa de alguém para iniciá-lo.")
+        await starter(self.bot, chat_id, initiator)
+
+# Instância compartilhada
+game_service = GameService()
+start_game = game_service.start_game
+
+
+def game_starter(game_type: str, automatic: bool = True):
+    """Decorador que registra a função de início de um jogo."""
+    def decorator(starter: GameStarter) -> GameStarter:
+        game_service.register(game_type, starter, automatic)
+        return starter
+    return decorator
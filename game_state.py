@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: game_state.py - Estado dos jogos ativos mantido em memória
+#
+# Os handlers consultam e alteram os jogos diretamente em um dicionário
+# indexado por (chat_id, game_type). A tabela active_games passa a ser apenas
+# a cópia persistente: alterações são gravadas em lote (write-behind), de
+# imediato quando um jogo começa ou termina e periodicamente para as demais
+# alterações. Na inicialização do bot os jogos ainda ativos são recarregados.
+
+import json
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import database
+from async_database import run_in_db_executor
+
+logger = logging.getLogger(__name__)
+
+# Intervalo da gravação periódica das alterações pendentes
+GAME_STATE_FLUSH_SECONDS = 10
+
+@dataclass
+class ActiveGame:
+    """Um jogo em andamento em um chat."""
+    chat_id: int
+    game_type: str
+    data: dict
+    start_time: float = field(default_factory=time.time)
+    end_time: float = 0.0
+    is_active: bool = True
+
+    @property
+    def key(self) -> Tuple[int, str]:
+        return (self.chat_id, self.game_type)
+
+    def remaining_seconds(self) -> float:
+        return max(0.0, self.end_time - time.time())
+
+    def to_row(self) -> tuple:
+        """Linha para database.save_active_games."""
+        return (
+            self.chat_id,
+            self.game_type,
+            json.dumps(self.data),
+            datetime.fromtimestamp(self.start_time),
+            datetime.fromtimestamp(self.end_time),
+            self.is_active
+        )
+
+class GameStateStore:
+    """Jogos ativos em memória com persistência write-behind em active_games."""
+
+    def __init__(self):
+        self._games: Dict[Tuple[int, str], ActiveGame] = {}
+        # Última versão de cada jogo ainda não gravada (inclui jogos encerrados)
+        self._pending: Dict[Tuple[int, str], ActiveGame] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_again = False
+        # Uma gravação por vez: lotes concorrentes poderiam ser confirmados
+        # fora de ordem e reativar no banco um jogo já encerrado
+        self._flush_lock = asyncio.Lock()
+
+    def get(self, chat_id: int, game_type: str) -> Optional[ActiveGame]:
+        """Obter o jogo ativo de um chat, sem acessar o banco de dados."""
+        return self._games.get((chat_id, game_type))
+
+    def start(self, chat_id: int, game_type: str, data: dict, duration_seconds: float) -> ActiveGame:
+        """Iniciar (ou substituir) o jogo de um tipo em um chat."""
+        now = time.time()
+        game = ActiveGame(chat_id, game_type, data, start_time=now, end_time=now + duration_seconds)
+        self._games[game.key] = game
+        self._pending[game.key] = game
+        self._schedule_flush()
+        return game
+
+    def update(self, game: ActiveGame, duration_seconds: Optional[float] = None, flush: bool = False) -> None:
+        """Marcar um jogo como alterado, opcionalmente redefinindo o tempo restante.
+
+        Por padrão a gravação fica para o próximo ciclo periódico; use
+        ``flush=True`` em mudanças de estado que precisam ir logo para o banco.
+        """
+        if duration_seconds is not None:
+            game.end_time = time.time() + duration_seconds
+        self._pending[game.key] = game
+        if flush:
+            self._schedule_flush()
+
+    def end(self, chat_id: int, game_type: str) -> Optional[ActiveGame]:
+        """Encerrar o jogo ativo de um chat, se houver."""
+        game = self._games.pop((chat_id, game_type), None)
+        if game:
+            game.is_active = False
+            game.end_time = time.time()
+            self._pending[game.key] = game
+            self._schedule_flush()
+        return game
+
+    def active_games(self):
+        """Todos os jogos ativos (cópia da lista)."""
+        return list(self._games.values())
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _schedule_flush(self) -> None:
+        """Agendar uma gravação imediata, agrupando pedidos simultâneos."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Fora do event loop: a gravação periódica cuida disso
+            return
+        if self._flush_task and not self._flush_task.done():
+            self._flush_again = True
+            return
+        self._flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            self._flush_again = False
+            await self.flush()
+            if not self._flush_again:
+                break
+
+    async def flush(self) -> None:
+        """Gravar no banco todas as alterações pendentes em uma única operação."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending = self._pending
+            self._pending = {}
+            rows = [game.to_row() for game in pending.values()]
+            try:
+                await run_in_db_executor(database.save_active_games, rows)
+            except Exception as e:
+                logger.error(f"Erro ao gravar estado dos jogos: {e}")
+                # Devolver as alterações que não foram substituídas nesse meio tempo
+                for key, game in pending.items():
+                    self._pending.setdefault(key, game)
+
+    async def rehydrate(self) -> int:
+        """Recarregar os jogos ainda ativos do banco de dados."""
+        rows = await run_in_db_executor(database.load_active_games)
+        for row in rows:
+            try:
+                data = json.loads(row["data"]) if row["data"] else {}
+            except ValueError:
+                logger.warning(f"Dados inválidos para o jogo {row['game_type']} no chat {row['chat_id']}")
+                continue
+            start_time = row["start_time"].timestamp() if row["start_time"] else time.time()
+            end_time = row["end_time"].timestamp() if row["end_time"] else start_time
+            game = ActiveGame(row["chat_id"], row["game_type"], data, start_time=start_time, end_time=end_time)
+            self._games[game.key] = game
+        logger.info(f"{len(rows)} jogos ativos recarregados do banco de dados")
+        return len(rows)
+
+# Instância compartilhada pelos handlers
+game_store = GameStateStore()
+
+async def flush_game_states(context) -> None:
+    """Job periódico que grava as alterações pendentes dos jogos."""
+    await game_store.flush()
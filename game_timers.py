@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: game_timers.py - Timers dos jogos (timeouts, novas tentativas e sorteios)
+#
+# Em vez de um job do job_queue (APScheduler) para cada timeout de jogo,
+# espera de nova tentativa e sorteio do Bingo, todos os chats compartilham um
+# único heap de timers atendido por uma task. Cada timer tem uma chave (ex.:
+# ("quiz_timeout", chat_id)): agendar com uma chave já usada substitui o timer
+# anterior e cancelar é O(1) pelo dicionário de chaves. Os timers cancelados
+# ficam no heap só até saírem pelo topo ou até a próxima compactação.
+#
+# Os callbacks recebem o bot e os dados do timer como argumentos nomeados:
+#     await callback(bot, **data)
+
+import heapq
+import asyncio
+import logging
+import itertools
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TimerCallback = Callable[..., Awaitable[Any]]
+
+
+class _Timer:
+    __slots__ = ("when", "seq", "key", "callback", "data", "cancelled")
+
+    def __init__(self, when: float, seq: int, key: Hashable, callback: TimerCallback, data: Dict):
+        self.when = when
+        self.seq = seq
+        self.key = key
+        self.callback = callback
+        self.data = data
+        self.cancelled = False
+
+    def __lt__(self, other: "_Timer") -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class GameTimers:
+    """Heap de timers com chave, atendido por uma única task do event loop."""
+
+    def __init__(self):
+        self._heap: List[_Timer] = []
+        self._timers: Dict[Hashable, _Timer] = {}
+        self._seq = itertools.count()
+        self._cancelled = 0
+        self._bot = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = set()
+        self._fired = 0
+        self._failures = 0
+        self._max_lateness = 0.0
+
+    def start(self, bot) -> None:
+        """Iniciar a task dos timers (chamado no post_init do bot)."""
+        self._bot = bot
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule(self, key: Hashable, delay: float, callback: TimerCallback, **data) -> None:
+        """Agendar ``callback(bot, **data)`` daqui a ``delay`` segundos, substituindo o timer da mesma chave."""
+        self.cancel(key)
+        when = asyncio.get_running_loop().time() + max(delay, 0)
+        timer = _Timer(when, next(self._seq), key, callback, data)
+        self._timers[key] = timer
+        heapq.heappush(self._heap, timer)
+        # Acordar a task se este timer vence antes do que ela espera
+        if self._wakeup is not None and self._heap[0] is timer:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancelar o timer de uma chave (True se havia um pendente)."""
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        timer.cancelled = True
+        self._cancelled += 1
+        if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+            self._compact()
+        return True
+
+    def update(self, key: Hashable, **data) -> bool:
+        """Alterar os dados de um timer pendente (ex.: o id da mensagem enviada depois)."""
+        timer = self._timers.get(key)
+        if timer is None:
+            return False
+        timer.data.update(data)
+        return True
+
+    def pending(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def pending_count(self) -> int:
+        return len(self._timers)
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._timers),
+            "heap_size": len(self._heap),
+            "running": len(self._running),
+            "fired": self._fired,
+            "failures": self._failures,
+            "max_lateness": round(self._max_lateness, 3),
+        }
+
+    def _compact(self) -> None:
+        self._heap = [timer for timer in self._heap if not timer.cancelled]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            while self._heap and self._heap[0].cancelled:
+                heapq.heappop(self._heap)
+                self._cancelled -= 1
+
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0].when - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            timer = heapq.heappop(self._heap)
+            del self._timers[timer.key]
+            self._max_lateness = max(self._max_lateness, -delay)
+            # Cada callback roda na sua própria task: um envio lento não atrasa os outros timers
+            task = loop.create_task(self._fire(timer))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, timer: _Timer) -> None:
+        self._fired += 1
+        try:
+            await timer.callback(self._bot, **timer.data)
+        except Exception as e:
+            self._failures += 1
+            logger.error(f"Erro no timer {timer.key}: {e}")
+
+# Instância compartilhada pelos handlers
+game_timers = GameTimers()
@@ -5,10 +5,9 @@ import json
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import (
-    register_user, get_active_members, is_admin, 
-    is_group_admin, is_chat_allowed, add_user_activity
-)
+from database import is_admin, is_group_admin, is_chat_allowed
+from async_database import register_user, get_active_members
+from activity_buffer import activity_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +17,10 @@ async def show_active_members(update: Update, context: ContextTypes.DEFAULT_TYPE
     user = update.effective_user
     
     # Registrar usuário se ainda não estiver registrado
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
     
     # Registrar atividade do usuário ao usar este comando
-    add_user_activity(user.id, chat_id, "command")
+    await activity_buffer.record(user.id, chat_id, "command")
     
     # Verificar se é um grupo
     chat_type = update.effective_chat.type
@@ -50,7 +49,7 @@ async def show_active_members(update: Update, context: ContextTypes.DEFAULT_TYPE
         except ValueError:
             pass
     
-    active_members = get_active_members(chat_id, limit)
+    active_members = await get_active_members(chat_id, limit)
     
     if not active_members:
         await update.message.reply_text(
@@ -106,5 +105,5 @@ async def record_user_activity(update: Update, context: ContextTypes.DEFAULT_TYP
     user = update.effective_user
     chat_id = update.effective_chat.id
     
-    # Registrar atividade do usuário
-    add_user_activity(user.id, chat_id, "message")
\ No newline at end of file
+    # Registrar atividade do usuário (gravada em lote por activity_buffer)
+    await activity_buffer.record(user.id, chat_id, "message")
\ No newline at end of file
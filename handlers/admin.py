@@ -229,7 +229,7 @@ async def set_game_frequency(update: Update, context: ContextTypes.DEFAULT_TYPE)
         
         # Reschedule games
         from utils.scheduler import reschedule_games
-        reschedule_games(context.application)
+        await reschedule_games(context.application)
         
     except (IndexError, ValueError):
         await update.message.reply_text("⚠️ Formato inválido. Use /set_game_frequency [minutos]")
@@ -1,38 +1,109 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import random
-import json
 import time
 import logging
 import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import (
-    register_user, add_points, record_game_start, 
-    get_active_game, end_game, get_setting, 
-    record_used_question, get_used_questions,
-    is_admin, is_group_admin, is_chat_allowed
+from telegram.helpers import escape_markdown
+from database import is_admin, is_group_admin, is_chat_allowed, get_setting_int
+from async_database import (
+    register_user, add_points, 
+    save_bingo_card, record_bingo_draw, load_bingo_game, delete_bingo_game
 )
+from game_state import game_store
+from game_timers import game_timers
+from outbound import outbound, PRIORITY_ANNOUNCEMENT, PRIORITY_DRAW, PRIORITY_RESULT
+from bingo_engine import BingoGame, BINGO_MAX_NUMBER, new_draw_order, pack_card, unpack_card
+
+logger = logging.getLogger(__name__)
 
 # Configurações para o jogo de Bingo
-BINGO_CARTELA_SIZE = 5  # Cartela 5x5
-BINGO_MAX_NUMBER = 75   # Números de 1 a 75
 BINGO_WAITING_SECONDS = 5  # Tempo entre sorteios
+BINGO_MAX_ANNOUNCED_WINNERS = 10  # Nomes listados no anúncio de um sorteio
 
 # Estados do jogo de Bingo
 BINGO_STATE_REGISTRATION = "registration"  # Fase de registros
 BINGO_STATE_PLAYING = "playing"  # Jogo em andamento
 BINGO_STATE_ENDED = "ended"  # Jogo finalizado
 
+# O game_data do Bingo guarda só o estado do jogo (fase, horários, sequência
+# do sorteio e vencedores). As cartelas e os números sorteados ficam em
+# memória, por chat, e no banco em bingo_cards (uma linha de 24 bytes por
+# cartela, gravada no registro) e bingo_draws (uma linha por sorteio). Assim
+# um sorteio grava uma linha pequena em vez de regravar o jogo inteiro. Depois
+# de reiniciar o bot o jogo é recarregado dessas tabelas.
+
+@dataclass
+class LoadedBingo:
+    """Cartelas e sorteio de um jogo de Bingo carregados em memória."""
+    start_time: float
+    game: BingoGame
+    names: dict = field(default_factory=dict)  # user_id -> primeiro nome
+
+_bingo_games = {}
+# Um lock por chat, mantido mesmo depois do carregamento: descartá-lo com
+# alguém ainda esperando deixaria uma terceira chamada carregar em paralelo
+_load_locks = {}
+
+def _game_id(game_data: dict) -> int:
+    """Identificador do jogo nas tabelas bingo_cards e bingo_draws."""
+    return int(game_data["start_time"] * 1000)
+
+async def _get_bingo_game(chat_id: int, game_data: dict) -> LoadedBingo:
+    """Obter o jogo atual do chat, carregando do banco se necessário."""
+    loaded = _bingo_games.get(chat_id)
+    if loaded and loaded.start_time == game_data["start_time"]:
+        return loaded
+    
+    lock = _load_locks.setdefault(chat_id, asyncio.Lock())
+    async with lock:
+        loaded = _bingo_games.get(chat_id)
+        if not (loaded and loaded.start_time == game_data["start_time"]):
+            loaded = await _load_bingo_game(chat_id, game_data)
+    return loaded
+
+async def _load_bingo_game(chat_id: int, game_data: dict) -> LoadedBingo:
+    try:
+        cards, draws = await load_bingo_game(chat_id, _game_id(game_data))
+        failed = False
+    except Exception as e:
+        logger.error(f"Erro ao carregar o Bingo do chat {chat_id}: {e}")
+        cards, draws = [], []
+        failed = True
+    
+    # Jogos iniciados antes das tabelas próprias têm tudo em game_data
+    bingo = BingoGame(game_data.get("draw_order"), draws or game_data.get("drawn_numbers", []))
+    loaded = LoadedBingo(game_data["start_time"], bingo)
+    for user_id, first_name, card in cards:
+        bingo.add_card(user_id, unpack_card(card))
+        loaded.names[str(user_id)] = first_name
+    for user_id, cartela in game_data.get("participants", {}).items():
+        if user_id not in bingo.cards:
+            bingo.add_card(user_id, cartela)
+    
+    # Se o banco falhou, tentar de novo no próximo acesso
+    if not failed:
+        _bingo_games[chat_id] = loaded
+    return loaded
+
+async def _discard_bingo_game(chat_id: int, game_data: dict) -> None:
+    """Apagar as cartelas e sorteios gravados de um jogo encerrado."""
+    try:
+        await delete_bingo_game(chat_id, _game_id(game_data))
+    except Exception as e:
+        logger.error(f"Erro ao apagar o Bingo do chat {chat_id}: {e}")
+
 async def start_bingo_registration(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Iniciar o período de registro para um jogo de Bingo."""
     chat_id = update.effective_chat.id
     user = update.effective_user
     
     # Registrar usuário se ainda não estiver registrado
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
     
     # Verificar se é um grupo
     chat_type = update.effective_chat.type
@@ -43,16 +114,14 @@ async def start_bingo_registration(update: Update, context: ContextTypes.DEFAULT
         return
     
     # Verificar se o usuário é admin do bot ou admin do grupo
-    admin_ids = json.loads(get_setting("admin_ids", "[]"))
-    if not (is_admin(user.id, admin_ids) or is_group_admin(update)):
+    if not (is_admin(user.id) or is_group_admin(update)):
         await update.message.reply_text(
             "⚠️ Apenas administradores do grupo ou do bot podem iniciar um jogo de Bingo!"
         )
         return
     
     # Verificar se já existe um jogo ativo neste chat
-    active_game = get_active_game(chat_id, "bingo")
-    if active_game:
+    if game_store.get(chat_id, "bingo"):
         await update.message.reply_text(
             "⚠️ Já existe um jogo de Bingo em andamento neste grupo!"
         )
@@ -79,22 +148,17 @@ async def start_bingo_registration(update: Update, context: ContextTypes.DEFAULT
         "start_time": time.time(),
         "registration_end_time": end_time.timestamp(),
         "started_by": user.id,
-        "participants": {},  # user_id -> cartela
-        "drawn_numbers": [],
-        "current_number": None,
+        "draw_order": new_draw_order(),  # sequência do sorteio, embaralhada uma vez
         "winners": []
     }
     
-    # Armazenar dados do jogo
-    record_game_start(chat_id, "bingo", json.dumps(game_data), registration_time * 60 + 60 * 60)  # Registro + 1h para o jogo
+    # Armazenar dados do jogo (cartelas e sorteios ficam no LoadedBingo)
+    game_store.start(chat_id, "bingo", game_data, registration_time * 60 + 60 * 60)  # Registro + 1h para o jogo
+    _bingo_games[chat_id] = LoadedBingo(game_data["start_time"], BingoGame(game_data["draw_order"]))
     
     # Agendar o fim do período de registro
-    context.job_queue.run_once(
-        end_bingo_registration, 
-        registration_time * 60, 
-        data={"chat_id": chat_id},
-        name=f"bingo_reg_end_{chat_id}"
-    )
+    game_timers.schedule(("bingo_reg_end", chat_id), registration_time * 60, end_bingo_registration,
+                         chat_id=chat_id)
     
     # Criar mensagem com informações
     registration_text = (
@@ -107,10 +171,7 @@ async def start_bingo_registration(update: Update, context: ContextTypes.DEFAULT
     )
     
     # Enviar mensagem de início do jogo
-    await update.message.reply_text(
-        registration_text,
-        parse_mode="Markdown"
-    )
+    outbound.send_message(chat_id, registration_text, priority=PRIORITY_ANNOUNCEMENT, parse_mode="Markdown")
 
 async def register_bingo_participant(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Registrar um participante no jogo de Bingo atual."""
@@ -118,18 +179,17 @@ async def register_bingo_participant(update: Update, context: ContextTypes.DEFAU
     user = update.effective_user
     
     # Registrar usuário se ainda não estiver registrado
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
     
     # Verificar se existe um jogo ativo neste chat
-    active_game = get_active_game(chat_id, "bingo")
-    if not active_game:
+    game = game_store.get(chat_id, "bingo")
+    if not game:
         await update.message.reply_text(
             "⚠️ Não há um jogo de Bingo em andamento neste grupo!"
         )
         return
     
-    # Carregar dados do jogo
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     
     # Verificar se o jogo está na fase de registro
     if game_data["state"] != BINGO_STATE_REGISTRATION:
@@ -143,22 +203,24 @@ async def register_bingo_participant(update: Update, context: ContextTypes.DEFAU
             )
         return
     
+    loaded = await _get_bingo_game(chat_id, game_data)
+    
     # Verificar se o usuário já está registrado
-    if str(user.id) in game_data["participants"]:
+    if str(user.id) in loaded.game.cards:
         # Enviar cartela para o usuário novamente
-        cartela = game_data["participants"][str(user.id)]
+        cartela = loaded.game.cards[str(user.id)].cartela
         await send_bingo_card(update, context, cartela)
         return
     
     # Criar uma cartela única para o usuário
-    cartela = generate_bingo_card(game_data["participants"].values())
-    
-    # Adicionar usuário à lista de participantes
-    game_data["participants"][str(user.id)] = cartela
+    cartela = loaded.game.add_card(user.id)
+    loaded.names[str(user.id)] = user.first_name
     
-    # Atualizar dados do jogo
-    record_game_start(chat_id, "bingo", json.dumps(game_data), 
-                     int((game_data["registration_end_time"] - time.time()) + 60 * 60))
+    # Gravar a cartela uma única vez, empacotada
+    try:
+        await save_bingo_card(chat_id, _game_id(game_data), user.id, user.first_name, pack_card(cartela))
+    except Exception as e:
+        logger.error(f"Erro ao gravar a cartela de {user.id} no chat {chat_id}: {e}")
     
     # Enviar cartela para o usuário
     await send_bingo_card(update, context, cartela)
@@ -211,75 +273,43 @@ def format_bingo_card(cartela: list) -> str:
     
     return "\n".join(lines)
 
-def generate_bingo_card(existing_cards=None) -> list:
-    """Gerar uma cartela de Bingo única."""
-    if existing_cards is None:
-        existing_cards = []
-    
-    # Converter para lista de listas para comparação
-    existing_cards_list = [card for card in existing_cards]
-    
-    while True:
-        # Criar uma nova cartela
-        cartela = [[] for _ in range(BINGO_CARTELA_SIZE)]
-        
-        # Dividir os números em 5 colunas para o Bingo tradicional
-        columns_range = [(1, 15), (16, 30), (31, 45), (46, 60), (61, 75)]
-        
-        for col_idx, (min_num, max_num) in enumerate(columns_range):
-            # Pegar números aleatórios para cada coluna
-            col_numbers = random.sample(range(min_num, max_num + 1), BINGO_CARTELA_SIZE)
-            
-            # Adicionar números à coluna
-            for row_idx in range(BINGO_CARTELA_SIZE):
-                cartela[col_idx].append(col_numbers[row_idx])
-        
-        # Definir espaço livre no centro (coluna do meio, linha do meio)
-        middle = BINGO_CARTELA_SIZE // 2
-        cartela[middle][middle] = 0
-        
-        # Verificar se a cartela é única
-        if cartela not in existing_cards_list:
-            return cartela
-        
-        # Se chegou aqui, a cartela já existe, tentar novamente
-
-async def end_bingo_registration(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def end_bingo_registration(bot, chat_id: int) -> None:
     """Finalizar o período de registro e iniciar o jogo de Bingo."""
-    job = context.job
-    chat_id = job.data["chat_id"]
     
     # Obter dados do jogo ativo
-    active_game = get_active_game(chat_id, "bingo")
-    if not active_game:
+    game = game_store.get(chat_id, "bingo")
+    if not game:
         return
     
-    # Carregar dados do jogo
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     
     # Verificar se o jogo ainda está na fase de registro
     if game_data["state"] != BINGO_STATE_REGISTRATION:
         return
     
+    loaded = await _get_bingo_game(chat_id, game_data)
+    
     # Verificar se há participantes suficientes (pelo menos 1)
-    if len(game_data["participants"]) < 1:
+    if len(loaded.game.cards) < 1:
         # Finalizar o jogo por falta de participantes
         game_data["state"] = BINGO_STATE_ENDED
-        record_game_start(chat_id, "bingo", json.dumps(game_data), 60)  # 1 minuto para encerrar
+        game_store.update(game, 60, flush=True)  # 1 minuto para encerrar
+        await _discard_bingo_game(chat_id, game_data)
         
-        await context.bot.send_message(
+        await outbound.send_message(
             chat_id=chat_id,
             text="⚠️ O jogo de Bingo foi cancelado por falta de participantes.",
+            priority=PRIORITY_RESULT,
             parse_mode="Markdown"
         )
         return
     
     # Atualizar estado do jogo para "jogando"
     game_data["state"] = BINGO_STATE_PLAYING
-    record_game_start(chat_id, "bingo", json.dumps(game_data), 60 * 60)  # 1 hora para o jogo
+    game_store.update(game, 60 * 60, flush=True)  # 1 hora para o jogo
     
     # Enviar mensagem de início do jogo
-    participants_count = len(game_data["participants"])
+    participants_count = len(loaded.game.cards)
     
     start_text = (
         f"🎮 *JOGO DE BINGO INICIADO!* 🎮\n\n"
@@ -287,68 +317,64 @@ async def end_bingo_registration(context: ContextTypes.DEFAULT_TYPE) -> None:
         f"👥 Total de participantes: *{participants_count}*\n\n"
         f"O sorteio dos números começará em instantes...\n"
         f"Fique atento à sua cartela enviada em mensagem privada!\n\n"
-        f"Quando completar uma linha, coluna ou diagonal, digite /bingo para declarar sua vitória!"
+        f"Quando alguém completar uma linha, coluna ou diagonal, o bot anuncia a vitória automaticamente!"
     )
     
-    await context.bot.send_message(
+    await outbound.send_message(
         chat_id=chat_id,
         text=start_text,
+        priority=PRIORITY_DRAW,
         parse_mode="Markdown"
     )
     
     # Agendar o primeiro sorteio
-    context.job_queue.run_once(
-        draw_bingo_number, 
-        10,  # 10 segundos para começar
-        data={"chat_id": chat_id},
-        name=f"bingo_draw_{chat_id}"
-    )
+    game_timers.schedule(("bingo_draw", chat_id), 10, draw_bingo_number, chat_id=chat_id)  # 10 segundos para começar
 
-async def draw_bingo_number(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def draw_bingo_number(bot, chat_id: int) -> None:
     """Sortear um número para o jogo de Bingo."""
-    job = context.job
-    chat_id = job.data["chat_id"]
     
     # Obter dados do jogo ativo
-    active_game = get_active_game(chat_id, "bingo")
-    if not active_game:
+    game = game_store.get(chat_id, "bingo")
+    if not game:
         return
     
-    # Carregar dados do jogo
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     
     # Verificar se o jogo está em andamento
     if game_data["state"] != BINGO_STATE_PLAYING:
         return
     
-    # Verificar se todos os números já foram sorteados
-    available_numbers = [n for n in range(1, BINGO_MAX_NUMBER + 1) if n not in game_data["drawn_numbers"]]
+    # Sortear o próximo número da sequência embaralhada (o BingoGame já
+    # atualiza as linhas que contêm o número e aponta quem completou uma)
+    loaded = await _get_bingo_game(chat_id, game_data)
+    bingo = loaded.game
+    new_number = bingo.draw()
     
-    if not available_numbers:
+    if new_number is None:
         # Todos os números foram sorteados, finalizar o jogo
         game_data["state"] = BINGO_STATE_ENDED
-        record_game_start(chat_id, "bingo", json.dumps(game_data), 60)  # 1 minuto para encerrar
+        game_store.update(game, 60, flush=True)  # 1 minuto para encerrar
+        await _discard_bingo_game(chat_id, game_data)
         
-        await context.bot.send_message(
+        await outbound.send_message(
             chat_id=chat_id,
             text="🎮 *JOGO DE BINGO FINALIZADO!* 🎮\n\nTodos os números foram sorteados!",
+            priority=PRIORITY_RESULT,
             parse_mode="Markdown"
         )
         return
     
-    # Sortear um novo número
-    new_number = random.choice(available_numbers)
-    
-    # Atualizar dados do jogo
-    game_data["drawn_numbers"].append(new_number)
-    game_data["current_number"] = new_number
-    record_game_start(chat_id, "bingo", json.dumps(game_data), 60 * 60)
+    # Gravar só o número sorteado (o game_data não muda a cada sorteio)
+    try:
+        await record_bingo_draw(chat_id, _game_id(game_data), bingo.drawn_count, new_number)
+    except Exception as e:
+        logger.error(f"Erro ao gravar o sorteio do Bingo no chat {chat_id}: {e}")
     
     # Categorizar o número no formato do Bingo (B1, I16, etc.)
     letter = "BINGO"[min(4, (new_number - 1) // 15)]
     
     # Formatar lista de números já sorteados
-    drawn_numbers = game_data["drawn_numbers"]
+    drawn_numbers = bingo.drawn_numbers()
     drawn_text = format_drawn_numbers(drawn_numbers)
     
     # Enviar mensagem de novo número
@@ -356,34 +382,92 @@ async def draw_bingo_number(context: ContextTypes.DEFAULT_TYPE) -> None:
         f"🎮 *BINGO - NOVO NÚMERO:* 🎮\n\n"
         f"🔢 *{letter}{new_number}*\n\n"
         f"Números sorteados ({len(drawn_numbers)}/{BINGO_MAX_NUMBER}):\n{drawn_text}\n\n"
-        f"Se você completou uma linha, coluna ou diagonal, digite /bingo para declarar sua vitória!"
+        f"Os vencedores são anunciados automaticamente."
     )
     
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text=draw_text,
-        parse_mode="Markdown"
-    )
+    # Aguardar a entrega: o anúncio dos vencedores tem prioridade maior e não
+    # pode sair antes do número, e um chat com a fila cheia atrasa o próximo sorteio
+    try:
+        await outbound.send_message(chat_id=chat_id, text=draw_text, priority=PRIORITY_DRAW, parse_mode="Markdown")
+    except Exception as e:
+        logger.error(f"Erro ao enviar o sorteio do Bingo no chat {chat_id}: {e}")
+    
+    # Agendar o próximo sorteio antes do anúncio, para que uma falha nele não pare o jogo
+    game_timers.schedule(("bingo_draw", chat_id), BINGO_WAITING_SECONDS, draw_bingo_number, chat_id=chat_id)
+    
+    # Anunciar quem completou uma linha neste sorteio
+    if bingo.last_winners:
+        await announce_bingo_winners(bot, chat_id, game, loaded, bingo.last_winners)
+
+async def award_bingo_win(chat_id: int, game, user_id: int) -> tuple:
+    """Registrar um vencedor e dar os pontos. Retorna (posição, pontos)."""
+    game_data = game.data
+    game_data["winners"].append(user_id)
+    
+    # Calcular pontos baseados na posição (primeiro recebe mais)
+    position = len(game_data["winners"])
+    base_points = get_setting_int("points_per_correct_answer", 10)
+    points = max(base_points - (position - 1) * 2, 2)  # Mínimo de 2 pontos
+    
+    await add_points(user_id, points, "bingo", chat_id=chat_id)
+    return position, points
+
+async def announce_bingo_winners(bot, chat_id: int, game, loaded: LoadedBingo, winners: list) -> None:
+    """Dar os pontos e anunciar os vencedores de um sorteio."""
+    game_data = game.data
+    
+    awarded = []
+    lines = []
+    for user_id, win_type in winners:
+        # Quem já declarou com /bingo enquanto o sorteio era enviado não pontua de novo
+        if int(user_id) in game_data["winners"]:
+            continue
+        position, points = await award_bingo_win(chat_id, game, int(user_id))
+        awarded.append(user_id)
+        if len(lines) < BINGO_MAX_ANNOUNCED_WINNERS:
+            name = escape_markdown(loaded.names.get(user_id) or "Participante")
+            lines.append(f"🏆 {position}º {name} - {win_type} (+{points} pontos)")
+    
+    if not awarded:
+        return
+    game_store.update(game, 60 * 60)
+    
+    winners_text = "\n".join(lines)
+    if len(awarded) > len(lines):
+        winners_text += f"\n... e mais {len(awarded) - len(lines)} vencedores"
     
-    # Agendar o próximo sorteio
-    context.job_queue.run_once(
-        draw_bingo_number, 
-        BINGO_WAITING_SECONDS,
-        data={"chat_id": chat_id},
-        name=f"bingo_draw_{chat_id}"
+    # Com um único vencedor, mostrar a cartela como no /b
+    if len(awarded) == 1:
+        card_text = format_bingo_card(loaded.game.cards[awarded[0]].cartela)
+        winners_text += f"\n\nCartela vencedora:\n{card_text}"
+    
+    win_text = (
+        f"🎮 *BINGO!* 🎮\n\n"
+        f"{winners_text}\n\n"
+        f"O jogo continua para os demais participantes!"
     )
+    
+    try:
+        await outbound.send_message(
+            chat_id=chat_id,
+            text=win_text,
+            priority=PRIORITY_RESULT,
+            parse_mode="Markdown"
+        )
+    except Exception as e:
+        logger.error(f"Erro ao anunciar os vencedores do Bingo no chat {chat_id}: {e}")
 
 def format_drawn_numbers(drawn_numbers: list) -> str:
     """Formatar lista de números sorteados."""
-    # Ordenar números
-    sorted_numbers = sorted(drawn_numbers)
+    # Conjunto para consulta rápida
+    drawn = set(drawn_numbers)
     
     # Dividir em segmentos de 15 números
     segments = []
     for i in range(1, BINGO_MAX_NUMBER + 1, 15):
         segment = []
         for n in range(i, min(i + 15, BINGO_MAX_NUMBER + 1)):
-            if n in sorted_numbers:
+            if n in drawn:
                 segment.append(f"✅{n:2d}")
             else:
                 segment.append(f"⬜{n:2d}")
@@ -397,15 +481,14 @@ async def claim_bingo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     user = update.effective_user
     
     # Verificar se existe um jogo ativo neste chat
-    active_game = get_active_game(chat_id, "bingo")
-    if not active_game:
+    game = game_store.get(chat_id, "bingo")
+    if not game:
         await update.message.reply_text(
             "⚠️ Não há um jogo de Bingo em andamento neste grupo!"
         )
         return
     
-    # Carregar dados do jogo
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     
     # Verificar se o jogo está em andamento
     if game_data["state"] != BINGO_STATE_PLAYING:
@@ -414,8 +497,10 @@ async def claim_bingo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         )
         return
     
+    loaded = await _get_bingo_game(chat_id, game_data)
+    
     # Verificar se o usuário é um participante
-    if str(user.id) not in game_data["participants"]:
+    if str(user.id) not in loaded.game.cards:
         await update.message.reply_text(
             "⚠️ Você não está participando deste jogo de Bingo!"
         )
@@ -429,25 +514,17 @@ async def claim_bingo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         return
     
     # Obter a cartela do usuário
-    cartela = game_data["participants"][str(user.id)]
+    cartela = loaded.game.cards[str(user.id)].cartela
     
-    # Verificar se o usuário realmente tem um Bingo
-    win_type = check_bingo_win(cartela, game_data["drawn_numbers"])
+    # Verificar se o usuário realmente tem um Bingo (12 comparações de máscaras)
+    win_type = loaded.game.win_type(user.id)
     
     if win_type:
-        # Adicionar o usuário à lista de vencedores
-        game_data["winners"].append(user.id)
+        # Adicionar o usuário à lista de vencedores e dar os pontos
+        position, points = await award_bingo_win(chat_id, game, user.id)
         
         # Atualizar dados do jogo
-        record_game_start(chat_id, "bingo", json.dumps(game_data), 60 * 60)
-        
-        # Calcular pontos baseados na posição (primeiro recebe mais)
-        position = len(game_data["winners"])
-        base_points = int(get_setting("points_per_correct_answer", "10"))
-        points = max(base_points - (position - 1) * 2, 2)  # Mínimo de 2 pontos
-        
-        # Adicionar pontos ao usuário
-        add_points(user.id, points, "bingo")
+        game_store.update(game, 60 * 60)
         
         # Formatar a cartela do vencedor
         card_text = format_bingo_card(cartela)
@@ -455,7 +532,7 @@ async def claim_bingo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         # Enviar mensagem de vitória
         win_text = (
             f"🎮 *BINGO DECLARADO!* 🎮\n\n"
-            f"🏆 {user.first_name} completou um {win_type} e ganhou!\n"
+            f"🏆 {escape_markdown(user.first_name)} completou um {win_type} e ganhou!\n"
             f"Posição: {position}º lugar\n"
             f"Pontos ganhos: {points}\n\n"
             f"Cartela vencedora:\n{card_text}\n\n"
@@ -472,50 +549,21 @@ async def claim_bingo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             "⚠️ Verificamos sua cartela e você ainda não completou uma linha, coluna ou diagonal. Continue jogando!"
         )
 
-def check_bingo_win(cartela: list, drawn_numbers: list) -> str:
-    """Verificar se uma cartela tem um Bingo válido."""
-    # Transpor a matriz para facilitar verificação de linhas e colunas
-    transposed = list(map(list, zip(*cartela)))
-    
-    # Verificar se uma linha ou coluna está completa
-    # Cada linha
-    for i in range(BINGO_CARTELA_SIZE):
-        # Verificar linha
-        row = transposed[i]
-        if all(num in drawn_numbers or num == 0 for num in row):
-            return "linha"
-        
-        # Verificar coluna
-        col = cartela[i]
-        if all(num in drawn_numbers or num == 0 for num in col):
-            return "coluna"
-    
-    # Verificar diagonais
-    diagonal1 = [cartela[i][i] for i in range(BINGO_CARTELA_SIZE)]
-    if all(num in drawn_numbers or num == 0 for num in diagonal1):
-        return "diagonal"
-    
-    diagonal2 = [cartela[i][BINGO_CARTELA_SIZE - 1 - i] for i in range(BINGO_CARTELA_SIZE)]
-    if all(num in drawn_numbers or num == 0 for num in diagonal2):
-        return "diagonal"
-    
-    # Nenhum Bingo encontrado
-    return ""
-
 async def show_bingo_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Mostrar o status atual do jogo de Bingo."""
     chat_id = update.effective_chat.id
     
     # Verificar se existe um jogo ativo neste chat
-    active_game = get_active_game(chat_id, "bingo")
-    if not active_game:
+    game = game_store.get(chat_id, "bingo")
+    if not game:
         await update.message.reply_text(
             "⚠️ Não há um jogo de Bingo em andamento neste grupo!"
         )
         return
     
-    # Carregar dados do jogo
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
+    loaded = await _get_bingo_game(chat_id, game_data)
+    participants_count = len(loaded.game.cards)
     
     # Formatar mensagem dependendo do estado do jogo
     if game_data["state"] == BINGO_STATE_REGISTRATION:
@@ -524,8 +572,6 @@ async def show_bingo_status(update: Update, context: ContextTypes.DEFAULT_TYPE)
         remaining_minutes = int(remaining_seconds / 60)
         remaining_seconds = int(remaining_seconds % 60)
         
-        participants_count = len(game_data["participants"])
-        
         status_text = (
             f"🎮 *STATUS DO BINGO - REGISTRO* 🎮\n\n"
             f"👥 Participantes registrados: *{participants_count}*\n"
@@ -535,10 +581,10 @@ async def show_bingo_status(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     elif game_data["state"] == BINGO_STATE_PLAYING:
         # Formatar números já sorteados
-        drawn_numbers = game_data["drawn_numbers"]
+        drawn_numbers = loaded.game.drawn_numbers()
         drawn_text = format_drawn_numbers(drawn_numbers)
+        current_number = loaded.game.last_number
         
-        participants_count = len(game_data["participants"])
         winners_count = len(game_data["winners"])
         
         status_text = (
@@ -546,19 +592,18 @@ async def show_bingo_status(update: Update, context: ContextTypes.DEFAULT_TYPE)
             f"👥 Participantes: *{participants_count}*\n"
             f"🏆 Vencedores: *{winners_count}*\n"
             f"🔢 Números sorteados: *{len(drawn_numbers)}/{BINGO_MAX_NUMBER}*\n\n"
-            f"Último número: {game_data['current_number'] if game_data['current_number'] else 'Nenhum'}\n\n"
+            f"Último número: {current_number if current_number else 'Nenhum'}\n\n"
             f"Números sorteados:\n{drawn_text}"
         )
     
     else:  # BINGO_STATE_ENDED
-        participants_count = len(game_data["participants"])
         winners_count = len(game_data["winners"])
         
         status_text = (
             f"🎮 *STATUS DO BINGO - FINALIZADO* 🎮\n\n"
             f"👥 Participantes: *{participants_count}*\n"
             f"🏆 Vencedores: *{winners_count}*\n"
-            f"🔢 Números sorteados: *{len(game_data['drawn_numbers'])}/{BINGO_MAX_NUMBER}*\n\n"
+            f"🔢 Números sorteados: *{loaded.game.drawn_count}/{BINGO_MAX_NUMBER}*\n\n"
             f"O jogo foi finalizado."
         )
     
@@ -573,28 +618,28 @@ async def force_end_bingo(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     user = update.effective_user
     
     # Verificar se o usuário é admin do bot ou admin do grupo
-    admin_ids = json.loads(get_setting("admin_ids", "[]"))
-    if not (is_admin(user.id, admin_ids) or is_group_admin(update)):
+    if not (is_admin(user.id) or is_group_admin(update)):
         await update.message.reply_text(
             "⚠️ Apenas administradores do grupo ou do bot podem encerrar um jogo de Bingo!"
         )
         return
     
     # Verificar se existe um jogo ativo neste chat
-    active_game = get_active_game(chat_id, "bingo")
-    if not active_game:
+    game = game_store.get(chat_id, "bingo")
+    if not game:
         await update.message.reply_text(
             "⚠️ Não há um jogo de Bingo em andamento neste grupo!"
         )
         return
     
     # Finalizar o jogo
-    end_game(chat_id, "bingo")
+    game_store.end(chat_id, "bingo")
+    _bingo_games.pop(chat_id, None)
+    await _discard_bingo_game(chat_id, game.data)
     
-    # Cancelar jobs relacionados
-    for job_name in [f"bingo_reg_end_{chat_id}", f"bingo_draw_{chat_id}"]:
-        for job in context.job_queue.get_jobs_by_name(job_name):
-            job.schedule_removal()
+    # Cancelar timers relacionados
+    game_timers.cancel(("bingo_reg_end", chat_id))
+    game_timers.cancel(("bingo_draw", chat_id))
     
     await update.message.reply_text(
         "🎮 *JOGO DE BINGO ENCERRADO* 🎮\n\n"
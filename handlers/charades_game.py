@@ -1,20 +1,20 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import json
 import logging
 import time
 import random
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import (
-    register_user, add_points, record_game_start, 
-    get_active_game, end_game, get_setting, 
-    record_used_question, get_used_questions,
-    is_admin, is_group_admin, is_chat_allowed,
-    add_user_activity
-)
-from data.charades_game import get_random_charade, get_random_charades_options
+from database import is_admin, is_group_admin, is_chat_allowed, get_setting_int
+from async_database import register_user, add_points
+from game_state import game_store
+from game_timers import game_timers
+from participation import participation
+from game_service import GameStartError, game_starter, start_game
+from outbound import outbound, PRIORITY_DRAW, PRIORITY_RESULT
+from activity_buffer import activity_buffer
+from data.charades_game import deal_charade, get_random_charades_options
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +24,10 @@ async def start_charades_game(update: Update, context: ContextTypes.DEFAULT_TYPE
     user = update.effective_user
     
     # Registrar usuário se ainda não estiver registrado
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
     
     # Registrar atividade do usuário ao iniciar jogo
-    add_user_activity(user.id, chat_id, "game_start")
+    await activity_buffer.record(user.id, chat_id, "game_start")
     
     # Verificar se é um grupo
     chat_type = update.effective_chat.type
@@ -37,28 +37,33 @@ async def start_charades_game(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         return
     
+    try:
+        await start_game(chat_id, "charades", initiator=user)
+    except GameStartError as e:
+        await update.message.reply_text(str(e))
+
+# A palavra secreta vai em privado para quem pediu o jogo, então a mímica
+# não entra nos jogos automáticos
+@game_starter("charades", automatic=False)
+async def send_charades_game(bot, chat_id: int, initiator) -> None:
+    """Preparar e enviar um jogo de mímica ao grupo e a palavra secreta a quem o iniciou."""
     # Verificar se o grupo está na lista de permitidos
     if not is_chat_allowed(chat_id):
-        await update.message.reply_text(
-            "⚠️ Este grupo não está autorizado a usar este bot."
-        )
-        return
+        raise GameStartError("⚠️ Este grupo não está autorizado a usar este bot.")
     
     # Verificar se já existe um jogo ativo neste chat
-    active_game = get_active_game(chat_id, "charades")
-    if active_game:
-        await update.message.reply_text(
-            "⚠️ Já existe um jogo de Mímica em andamento neste grupo!"
-        )
-        return
+    if game_store.get(chat_id, "charades"):
+        raise GameStartError("⚠️ Já existe um jogo de Mímica em andamento neste grupo!")
     
     # Obter configuração de pontos e tempo
-    points_per_correct = int(get_setting("points_per_correct_answer", "10"))
-    points_per_second = int(get_setting("points_per_second", "1"))
-    max_game_duration = int(get_setting("max_game_duration_seconds", "300"))
+    points_per_correct = get_setting_int("points_per_correct_answer", 10)
+    points_per_second = get_setting_int("points_per_second", 1)
+    max_game_duration = get_setting_int("max_game_duration_seconds", 300)
     
-    # Obter charada aleatória
-    charade = get_random_charade()
+    # Obter a próxima charada do baralho do chat
+    charade = await deal_charade(chat_id)
+    if not charade:
+        raise GameStartError("😕 Desculpe, não foi possível iniciar o jogo agora. Tente novamente mais tarde.")
     
     # Obter opções para a charada
     options = get_random_charades_options(charade["theme"])
@@ -69,7 +74,7 @@ async def start_charades_game(update: Update, context: ContextTypes.DEFAULT_TYPE
         "options": options,
         "correct_option": charade["theme"],
         "start_time": time.time(),
-        "started_by": user.id,
+        "started_by": initiator.id,
         "points_per_correct": points_per_correct,
         "points_per_second": points_per_second,
         "guessed": False,
@@ -77,8 +82,8 @@ async def start_charades_game(update: Update, context: ContextTypes.DEFAULT_TYPE
         "correct_user_id": None
     }
     
-    # Armazenar o jogo no banco de dados
-    record_game_start(chat_id, "charades", json.dumps(game_data), max_game_duration)
+    # Armazenar o jogo
+    game_store.start(chat_id, "charades", game_data, max_game_duration)
     
     # Criar teclado inline com as opções
     keyboard = []
@@ -97,28 +102,23 @@ async def start_charades_game(update: Update, context: ContextTypes.DEFAULT_TYPE
         f"Tempo limite: {max_game_duration // 60} minutos"
     )
     
-    await update.message.reply_text(
-        charade_text,
+    await outbound.send_message(
+        chat_id=chat_id,
+        text=charade_text,
+        priority=PRIORITY_DRAW,
         reply_markup=reply_markup,
         parse_mode="Markdown"
     )
     
     # Agendar timeout para o jogo
-    context.job_queue.run_once(
-        charades_timeout, 
-        max_game_duration, 
-        data={
-            "chat_id": chat_id,
-            "message_id": None # Será atualizado quando recebermos a resposta
-        },
-        name=f"charades_timeout_{chat_id}"
-    )
+    game_timers.schedule(("charades_timeout", chat_id), max_game_duration, charades_timeout, chat_id=chat_id)
     
     # Tentamos obter o chat para enviar a resposta apenas ao criador do jogo
     try:
         # Enviar a resposta em mensagem privada para o criador do jogo
-        await context.bot.send_message(
-            chat_id=user.id,
+        await outbound.send_message(
+            chat_id=initiator.id,
+            priority=PRIORITY_DRAW,
             text=(
                 f"🎭 *PALAVRA SECRETA PARA MÍMICA* 🎭\n\n"
                 f"Você iniciou um jogo de mímica!\n\n"
@@ -131,41 +131,33 @@ async def start_charades_game(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
     except Exception as e:
         logger.error(f"Erro ao enviar resposta ao criador do jogo: {e}")
-        # Enviar uma mensagem informando que o usuário precisa iniciar uma conversa privada com o bot
-        await update.message.reply_text(
-            f"⚠️ {user.first_name}, não consegui te enviar a palavra secreta. "
-            f"Por favor, inicie uma conversa comigo em privado e tente novamente."
-        )
         # Cancelar o jogo
-        end_game(chat_id, "charades")
+        game_store.end(chat_id, "charades")
         # Cancelar o timeout
-        for job in context.job_queue.get_jobs_by_name(f"charades_timeout_{chat_id}"):
-            job.schedule_removal()
-        return
+        game_timers.cancel(("charades_timeout", chat_id))
+        # Informar que o usuário precisa iniciar uma conversa privada com o bot
+        raise GameStartError(
+            f"⚠️ {initiator.first_name}, não consegui te enviar a palavra secreta. "
+            f"Por favor, inicie uma conversa comigo em privado e tente novamente."
+        )
 
-async def charades_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def charades_timeout(bot, chat_id: int, message_id: int = None) -> None:
     """Função para lidar com o timeout do jogo de mímica."""
-    job = context.job
-    chat_id = job.data["chat_id"]
     
     # Obter dados do jogo
-    active_game = get_active_game(chat_id, "charades")
-    if not active_game:
+    game = game_store.get(chat_id, "charades")
+    if not game:
         return
         
-    # Carregar dados do jogo
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     
     # Verificar se o jogo já foi adivinhado
     if game_data.get("guessed", False):
         return
     
-    # Marcar como timeout
+    # Marcar como timeout e encerrar o jogo
     game_data["timeout"] = True
-    record_game_start(chat_id, "charades", json.dumps(game_data), 60)  # Manter por 1 minuto
-    
-    # Encerrar o jogo
-    end_game(chat_id, "charades")
+    game_store.end(chat_id, "charades")
     
     charade = game_data["charade"]
     
@@ -178,9 +170,10 @@ async def charades_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
         f"Vamos tentar novamente? Use /mimica para iniciar um novo jogo!"
     )
     
-    await context.bot.send_message(
+    await outbound.send_message(
         chat_id=chat_id,
         text=timeout_text,
+        priority=PRIORITY_RESULT,
         parse_mode="Markdown"
     )
 
@@ -191,25 +184,26 @@ async def handle_charades_callback(update: Update, context: ContextTypes.DEFAULT
     chat_id = update.effective_chat.id
     
     # Registrar usuário se ainda não estiver registrado
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
     
     # Registrar atividade do usuário ao responder
-    add_user_activity(user.id, chat_id, "game_answer")
+    await activity_buffer.record(user.id, chat_id, "game_answer")
+    participation.record(chat_id, user.id)
     
     # Extrair índice da opção escolhida
     option_idx = int(query.data.split("_")[1])
     
     # Obter dados do jogo
-    active_game = get_active_game(chat_id, "charades")
-    if not active_game:
+    game = game_store.get(chat_id, "charades")
+    if not game:
         await query.answer("Não há um jogo de Mímica ativo neste momento.")
-        await query.edit_message_text(
+        outbound.edit_message_text(
+            chat_id, query.message.message_id,
             "Este jogo de Mímica já terminou. Use /mimica para iniciar um novo jogo."
         )
         return
     
-    # Carregar dados do jogo
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     
     # Verificar se o jogo já foi adivinhado
     if game_data.get("guessed", False):
@@ -233,20 +227,16 @@ async def handle_charades_callback(update: Update, context: ContextTypes.DEFAULT
         time_points = max(0, int((300 - elapsed_time) * game_data["points_per_second"] / 10))
         total_points = game_data["points_per_correct"] + time_points
         
-        # Atualizar dados do jogo
+        # Atualizar dados do jogo e encerrá-lo
         game_data["guessed"] = True
         game_data["correct_user_id"] = user.id
-        record_game_start(chat_id, "charades", json.dumps(game_data), 60)  # Manter por mais 1 minuto
-        
-        # Encerrar o jogo
-        end_game(chat_id, "charades")
+        game_store.end(chat_id, "charades")
         
         # Adicionar pontos ao usuário
-        add_points(user.id, total_points, "charades", elapsed_time)
+        await add_points(user.id, total_points, "charades", elapsed_time, chat_id=chat_id)
         
         # Cancelar timeout
-        for job in context.job_queue.get_jobs_by_name(f"charades_timeout_{chat_id}"):
-            job.schedule_removal()
+        game_timers.cancel(("charades_timeout", chat_id))
         
         # Enviar mensagem de sucesso
         charade = game_data["charade"]
@@ -263,7 +253,8 @@ async def handle_charades_callback(update: Update, context: ContextTypes.DEFAULT
             f"Use /mimica para jogar novamente!"
         )
         
-        await query.edit_message_text(
+        outbound.edit_message_text(
+            chat_id, query.message.message_id,
             text=success_text,
             parse_mode="Markdown"
         )
@@ -2,38 +2,42 @@
 # -*- coding: utf-8 -*-
 
 import random
-import json
 import time
 import re
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import register_user, add_points, record_game_start, get_active_game, end_game
+from async_database import register_user, add_points
+from game_state import game_store
+from game_timers import game_timers
+from participation import participation
+from game_service import GameStartError, game_starter, start_game
+from outbound import outbound, PRIORITY_DRAW, PRIORITY_RESULT
 from config import SETTINGS, EMOJI_PATTERN_TIME_LIMIT_SECONDS
-from data.emoji_patterns import get_random_pattern
+from data.emoji_patterns import deal_pattern
 
 async def start_emoji_pattern_game(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Start an emoji pattern recognition game."""
-    chat_id = update.effective_chat.id
     user = update.effective_user
     
     # Register user if not already registered
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
     
+    try:
+        await start_game(update.effective_chat.id, "emoji_pattern", initiator=user)
+    except GameStartError as e:
+        await update.message.reply_text(str(e))
+
+@game_starter("emoji_pattern")
+async def send_emoji_pattern_game(bot, chat_id: int, initiator=None) -> None:
+    """Prepare and send an emoji pattern challenge to the chat."""
     # Check if there's already an active game in this chat
-    active_game = get_active_game(chat_id, "emoji_pattern")
-    if active_game:
-        await update.message.reply_text(
-            "⚠️ Já existe um jogo de Sequência de Emoji em andamento neste chat!"
-        )
-        return
+    if game_store.get(chat_id, "emoji_pattern"):
+        raise GameStartError("⚠️ Já existe um jogo de Sequência de Emoji em andamento neste chat!")
     
-    # Get a random emoji pattern
-    pattern_data = get_random_pattern()
+    # Get the next emoji pattern from this chat's deck
+    pattern_data = await deal_pattern(chat_id)
     if not pattern_data:
-        await update.message.reply_text(
-            "😕 Desculpe, não foi possível iniciar o jogo agora. Tente novamente mais tarde."
-        )
-        return
+        raise GameStartError("😕 Desculpe, não foi possível iniciar o jogo agora. Tente novamente mais tarde.")
     
     # Prepare game data
     game_data = {
@@ -42,16 +46,18 @@ async def start_emoji_pattern_game(update: Update, context: ContextTypes.DEFAULT
         "explanation": pattern_data["explanation"],
         "difficulty": pattern_data["difficulty"],
         "start_time": time.time(),
-        "started_by": user.id,
+        "started_by": initiator.id if initiator else None,
         "solved": False
     }
     
     # Store game data
-    record_game_start(chat_id, "emoji_pattern", json.dumps(game_data), EMOJI_PATTERN_TIME_LIMIT_SECONDS)
+    game = game_store.start(chat_id, "emoji_pattern", game_data, EMOJI_PATTERN_TIME_LIMIT_SECONDS)
     
     # Send the message with the pattern challenge
-    pattern_message = await update.message.reply_text(
-        f"🧩 *SEQUÊNCIA DE EMOJI* 🧩\n\n"
+    pattern_message = await outbound.send_message(
+        chat_id=chat_id,
+        priority=PRIORITY_DRAW,
+        text=f"🧩 *SEQUÊNCIA DE EMOJI* 🧩\n\n"
         f"*Dificuldade:* {'⭐' * pattern_data['difficulty']}\n\n"
         f"Descubra o padrão e envie o próximo emoji ou emojis da sequência:\n\n"
         f"{pattern_data['pattern']} ❓\n\n"
@@ -60,37 +66,28 @@ async def start_emoji_pattern_game(update: Update, context: ContextTypes.DEFAULT
     )
     
     # Schedule end of game after time limit
-    context.job_queue.run_once(
-        emoji_pattern_timeout, 
-        EMOJI_PATTERN_TIME_LIMIT_SECONDS,
-        data={
-            "chat_id": chat_id,
-            "message_id": pattern_message.message_id
-        },
-        name=f"emoji_timeout_{chat_id}"
-    )
+    game_timers.schedule(("emoji_timeout", chat_id), EMOJI_PATTERN_TIME_LIMIT_SECONDS, emoji_pattern_timeout,
+                         chat_id=chat_id, message_id=pattern_message.message_id)
+    
+    # Keep the message id so the timeout can be restored after a restart
+    game_data["message_id"] = pattern_message.message_id
+    game_store.update(game)
 
-async def emoji_pattern_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def emoji_pattern_timeout(bot, chat_id: int, message_id: int = None) -> None:
     """Handle emoji pattern game timeout."""
-    job_data = context.job.data
-    chat_id = job_data["chat_id"]
-    message_id = job_data["message_id"]
     
-    # Check if the game is still active
-    active_game = get_active_game(chat_id, "emoji_pattern")
-    if not active_game:
+    # End the game if it is still active
+    game = game_store.end(chat_id, "emoji_pattern")
+    if not game:
         return  # Game already solved
     
-    # Parse game data
-    game_data = json.loads(active_game["data"])
-    
-    # End the game
-    end_game(chat_id, "emoji_pattern")
+    game_data = game.data
     
     # Update the message to show the answer
     try:
-        await context.bot.send_message(
+        await outbound.send_message(
             chat_id=chat_id,
+            priority=PRIORITY_RESULT,
             reply_to_message_id=message_id,
             text=f"⏱️ *TEMPO ESGOTADO!* ⏱️\n\n"
                  f"A sequência correta continuaria com: *{game_data['next']}*\n\n"
@@ -106,13 +103,14 @@ async def handle_emoji_pattern_answer(update: Update, context: ContextTypes.DEFA
     chat_id = update.effective_chat.id
     
     # Get the active game data
-    active_game = get_active_game(chat_id, "emoji_pattern")
-    if not active_game:
+    game = game_store.get(chat_id, "emoji_pattern")
+    if not game:
         # No active emoji pattern game, ignore the message
         return
     
-    # Parse game data
-    game_data = json.loads(active_game["data"])
+    participation.record(chat_id, user.id)
+    
+    game_data = game.data
     if game_data["solved"]:
         # Game already solved
         return
@@ -135,13 +133,12 @@ async def handle_emoji_pattern_answer(update: Update, context: ContextTypes.DEFA
     start_time = game_data["start_time"]
     response_time = time.time() - start_time
     
-    # Mark as solved to prevent multiple answers
+    # Mark as solved and end the game to prevent multiple answers
     game_data["solved"] = True
-    record_game_start(chat_id, "emoji_pattern", json.dumps(game_data), 0)
+    game_store.end(chat_id, "emoji_pattern")
     
-    # Remove timeout job if exists
-    for job in context.job_queue.get_jobs_by_name(f"emoji_timeout_{chat_id}"):
-        job.schedule_removal()
+    # Remove timeout timer if exists
+    game_timers.cancel(("emoji_timeout", chat_id))
     
     # Calculate points based on correctness, response time and difficulty
     points = 0
@@ -153,10 +150,7 @@ async def handle_emoji_pattern_answer(update: Update, context: ContextTypes.DEFA
         points = int(base_points * (0.5 + 0.5 * time_factor) * (1 + difficulty_bonus))
         
         # Add points to the user
-        add_points(user.id, points, "emoji_pattern", response_time)
-    
-    # End the game
-    end_game(chat_id, "emoji_pattern")
+        await add_points(user.id, points, "emoji_pattern", response_time, chat_id=chat_id)
     
     # Prepare result message
     if is_correct:
@@ -177,4 +171,5 @@ async def handle_emoji_pattern_answer(update: Update, context: ContextTypes.DEFA
             f"Melhor sorte na próxima vez! 🔍"
         )
     
-    await update.message.reply_text(result_text, parse_mode="Markdown")
+    outbound.send_message(chat_id, result_text, priority=PRIORITY_RESULT,
+                          reply_to_message_id=update.message.message_id, parse_mode="Markdown")
@@ -9,7 +9,7 @@ from telegram.ext import ContextTypes
 from psycopg2.extras import RealDictCursor
 from database import (
     register_user, create_invite, use_invite, 
-    get_user_invites, get_setting, get_invite_leaderboard, get_db_connection
+    get_user_invites, get_setting_bool, get_setting_int, get_invite_leaderboard, get_db_connection
 )
 
 logger = logging.getLogger(__name__)
@@ -70,8 +70,8 @@ async def generate_invite(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                     group_invite_url = f"{invite_link}&invite={invite_code}"
                 
                 # Obter configurações de pontos por convite
-                invitation_enabled = get_setting("invitation_enabled", "true").lower() == "true"
-                invitation_points = int(get_setting("invitation_points", "5"))
+                invitation_enabled = get_setting_bool("invitation_enabled", True)
+                invitation_points = get_setting_int("invitation_points", 5)
                 
                 points_text = ""
                 if invitation_enabled:
@@ -113,8 +113,8 @@ async def generate_bot_invite_link(update, context, user, invite_code):
     invite_link = f"https://t.me/{bot_username}?start={invite_code}"
     
     # Obter configurações de pontos por convite
-    invitation_enabled = get_setting("invitation_enabled", "true").lower() == "true"
-    invitation_points = int(get_setting("invitation_points", "5"))
+    invitation_enabled = get_setting_bool("invitation_enabled", True)
+    invitation_points = get_setting_int("invitation_points", 5)
     
     points_text = ""
     if invitation_enabled:
@@ -157,8 +157,8 @@ async def handle_invite_join(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     if inviter_id:
         # Obter configurações de pontos por convite
-        invitation_enabled = get_setting("invitation_enabled", "true").lower() == "true"
-        invitation_points = int(get_setting("invitation_points", "5"))
+        invitation_enabled = get_setting_bool("invitation_enabled", True)
+        invitation_points = get_setting_int("invitation_points", 5)
         
         points_text = ""
         if invitation_enabled:
@@ -174,11 +174,10 @@ async def handle_invite_join(update: Update, context: ContextTypes.DEFAULT_TYPE)
             )
             
             # Obter informações do convidador para personalizar a mensagem
-            conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("SELECT username, first_name, last_name FROM users WHERE user_id = %s", (inviter_id,))
-            inviter = cursor.fetchone()
-            conn.close()
+            with get_db_connection() as conn:
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+                cursor.execute("SELECT username, first_name, last_name FROM users WHERE user_id = %s", (inviter_id,))
+                inviter = cursor.fetchone()
             
             inviter_name = inviter['username'] if inviter and inviter['username'] else \
                           f"{inviter['first_name']} {inviter['last_name'] or ''}" if inviter else "outro usuário"
@@ -3,17 +3,51 @@
 
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import get_leaderboard, get_user_points, register_user, get_invite_leaderboard, get_user_invites
+from async_database import (
+    get_user_rank, register_user, 
+    get_invite_leaderboard, get_user_invites,
+    get_period_leaderboard, get_user_period_rank
+)
+
+# Argumentos aceitos por /placar para escolher o período e o escopo
+PERIOD_ARGS = {
+    "semana": "week", "semanal": "week", "week": "week",
+    "mes": "month", "mês": "month", "mensal": "month", "month": "month",
+    "geral": "all", "all": "all",
+}
+GROUP_ARGS = {"grupo", "chat", "group"}
+
+PERIOD_TITLES = {"all": "", "week": " DA SEMANA", "month": " DO MÊS"}
+
+def parse_leaderboard_args(args):
+    """Obter (período, só do grupo?) a partir de argumentos como `/placar semana grupo`."""
+    period = "all"
+    group_only = False
+    for arg in args or []:
+        arg = arg.lower()
+        if arg in PERIOD_ARGS:
+            period = PERIOD_ARGS[arg]
+        elif arg in GROUP_ARGS:
+            group_only = True
+    return period, group_only
 
 async def show_leaderboard(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Show the leaderboard with top users."""
+    """Show the leaderboard with top users (`/placar [semana|mes] [grupo]`)."""
     user = update.effective_user
     
     # Register user if not already registered
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
+    
+    period, group_only = parse_leaderboard_args(context.args)
+    chat_id = None
+    if group_only:
+        if update.effective_chat.type not in ['group', 'supergroup']:
+            await update.message.reply_text("⚠️ O placar do grupo só pode ser visto em grupos!")
+            return
+        chat_id = update.effective_chat.id
     
     # Get leaderboard data
-    leaderboard = get_leaderboard(10)  # Top 10 users
+    leaderboard = await get_period_leaderboard(period, chat_id, 10)  # Top 10 users
     
     if not leaderboard:
         await update.message.reply_text(
@@ -25,7 +59,8 @@ async def show_leaderboard(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         return
     
     # Format the leaderboard message
-    leaderboard_text = "🏆 *PLACAR DE PONTOS* 🏆\n\n"
+    title = "PLACAR DE PONTOS" + PERIOD_TITLES[period] + (" DO GRUPO" if chat_id else "")
+    leaderboard_text = f"🏆 *{title}* 🏆\n\n"
     
     for i, player in enumerate(leaderboard):
         # Add emoji for top 3
@@ -40,17 +75,35 @@ async def show_leaderboard(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         else:
             leaderboard_text += f"{position_emoji} {player_name} - {player['points']} pontos\n"
     
-    # Get current user's position if not in top 10
+    # Show the current user's rank and neighbors if not in top 10
     user_in_top = any(player["user_id"] == user.id for player in leaderboard)
-    if not user_in_top:
-        user_points = get_user_points(user.id)
-        leaderboard_text += f"\n...\n👤 *Você* - {user_points} pontos"
+    if not user_in_top and (period != "all" or chat_id):
+        user_rank = await get_user_period_rank(user.id, period, chat_id)
+        if user_rank:
+            leaderboard_text += (
+                f"\n...\n{user_rank['rank']}. *Você* - {user_rank['points']} pontos 👈\n"
+                f"\n👤 Sua posição: *{user_rank['rank']}º* de {user_rank['total']}"
+            )
+    elif not user_in_top:
+        user_rank = await get_user_rank(user.id, 1)
+        if user_rank:
+            leaderboard_text += "\n...\n"
+            for player in user_rank["neighbors"]:
+                if player["rank"] <= len(leaderboard):
+                    continue
+                player_name = player["username"] if player["username"] else player["first_name"]
+                if player["user_id"] == user.id:
+                    leaderboard_text += f"{player['rank']}. *Você* - {player['points']} pontos 👈\n"
+                else:
+                    leaderboard_text += f"{player['rank']}. {player_name} - {player['points']} pontos\n"
+            leaderboard_text += f"\n👤 Sua posição: *{user_rank['rank']}º* de {user_rank['total']}"
     
     leaderboard_text += (
         f"\n\n🎮 *Como ganhar pontos:*\n"
         f"• Participe dos jogos e responda corretamente\n"
         f"• Quanto mais rápido responder, mais pontos ganha\n"
-        f"• Convide amigos usando /convite"
+        f"• Convide amigos usando /convite\n\n"
+        f"📅 Use `/placar semana`, `/placar mes` ou `/placar grupo`"
     )
     
     await update.message.reply_text(leaderboard_text, parse_mode="Markdown")
@@ -60,10 +113,10 @@ async def show_invite_leaderboard(update: Update, context: ContextTypes.DEFAULT_
     user = update.effective_user
     
     # Register user if not already registered
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
     
     # Get invite leaderboard data
-    invite_leaderboard = get_invite_leaderboard(10)  # Top 10 inviters
+    invite_leaderboard = await get_invite_leaderboard(10)  # Top 10 inviters
     
     if not invite_leaderboard:
         await update.message.reply_text(
@@ -93,7 +146,7 @@ async def show_invite_leaderboard(update: Update, context: ContextTypes.DEFAULT_
     # Get current user's invites if not in top 10
     user_in_top = any(player["user_id"] == user.id for player in invite_leaderboard)
     if not user_in_top:
-        user_invites = get_user_invites(user.id)
+        user_invites = await get_user_invites(user.id)
         user_invite_count = len([invite for invite in user_invites if invite.get("used", False)])
         if user_invite_count > 0:
             leaderboard_text += f"\n...\n👤 *Você* - {user_invite_count} convites"
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from telegram import Update, ChatMember
+from telegram.ext import ContextTypes
+from async_database import is_chat_allowed
+from utils.scheduler import schedule_games_for_chat, unschedule_games_for_chat
+
+logger = logging.getLogger(__name__)
+
+PRESENT_STATUSES = (ChatMember.MEMBER, ChatMember.ADMINISTRATOR, ChatMember.OWNER)
+
+async def handle_bot_membership(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Agendar os jogos automáticos quando o bot entra em um grupo e removê-los quando ele sai."""
+    member = update.my_chat_member
+    chat = member.chat
+    if chat.type not in ['group', 'supergroup']:
+        return
+
+    was_present = member.old_chat_member.status in PRESENT_STATUSES
+    is_present = member.new_chat_member.status in PRESENT_STATUSES
+
+    try:
+        if is_present and not was_present:
+            if await is_chat_allowed(chat.id):
+                await schedule_games_for_chat(context.application, chat.id)
+        elif was_present and not is_present:
+            await unschedule_games_for_chat(context.application, chat.id)
+    except Exception as e:
+        logger.error(f"Erro ao atualizar o agendamento de jogos do chat {chat.id}: {e}")
@@ -2,23 +2,25 @@
 # -*- coding: utf-8 -*-
 
 import random
-import json
 import time
 import logging
 import asyncio
-from datetime import datetime, timedelta
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ChatPermissions
 from telegram.ext import ContextTypes
-from database import (
-    register_user, add_points, record_game_start, 
-    get_active_game, end_game, get_setting, 
-    record_used_question, get_used_questions
-)
-from data.movie_emoji import get_random_movie_emoji, get_movie_options
+from database import get_setting_int, get_setting_float
+from async_database import register_user, add_points
+from game_state import game_store
+from game_timers import game_timers
+from participation import participation
+from game_service import GameStartError, game_starter, start_game
+from outbound import outbound, PRIORITY_DRAW, PRIORITY_RESULT, PRIORITY_ANNOUNCEMENT
+from seen_content import seen_content
+from data.movie_emoji import deal_movie_emoji, get_movie_options
 
 # Importar a nova integração com TMDb
 try:
-    from data.tmdb_api import get_random_tmdb_movie, get_movie_options_tmdb, get_tmdb_api_key
+    from data.tmdb_api import get_tmdb_movie_puzzle, get_tmdb_api_key
+    from data.movie_prefetch import movie_prefetcher
     TMDB_AVAILABLE = True
 except Exception as e:
     logging.warning(f"Não foi possível carregar a integração com TMDb: {e}")
@@ -26,11 +28,10 @@ except Exception as e:
 
 async def start_movie_game(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Inicia o jogo 'Adivinhe o Filme' em grupos."""
-    chat_id = update.effective_chat.id
     user = update.effective_user
 
     # Registrar usuário se ainda não estiver registrado
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
 
     # Verificar se é um grupo
     chat_type = update.effective_chat.type
@@ -40,77 +41,64 @@ async def start_movie_game(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         )
         return
 
+    try:
+        await start_game(update.effective_chat.id, "movie", initiator=user)
+    except GameStartError as e:
+        await update.message.reply_text(str(e))
+
+@game_starter("movie")
+async def send_movie_game(bot, chat_id: int, initiator=None) -> None:
+    """Preparar e enviar um jogo 'Adivinhe o Filme' ao chat."""
     # Verificar se já existe um jogo ativo neste chat
-    active_game = get_active_game(chat_id, "movie")
-    if active_game:
-        await update.message.reply_text(
-            "⚠️ Já existe um jogo de 'Adivinhe o Filme' em andamento neste grupo!"
-        )
-        return
+    if game_store.get(chat_id, "movie"):
+        raise GameStartError("⚠️ Já existe um jogo de 'Adivinhe o Filme' em andamento neste grupo!")
 
-    # Obter lista de questões já usadas para evitar repetição
-    used_questions = get_used_questions(chat_id, "movie")
+    # Filmes já usados neste chat, para evitar repetição
+    used_questions = await seen_content.seen(chat_id, "movie")
 
     # Determinar se usamos TMDb ou banco de dados local
     use_tmdb = False
     movie_data = None
 
-    # Tentar usar TMDb se disponível
+    # Tentar usar TMDb se disponível: primeiro a fila de filmes já preparados,
+    # depois uma busca direta (os filmes já usados são descartados antes de
+    # buscar detalhes e opções)
     if TMDB_AVAILABLE and get_tmdb_api_key():
-        # Tente até 5 vezes para obter um filme não usado anteriormente
-        for _ in range(5):
-            try:
-                movie_data = get_random_tmdb_movie()
-                if movie_data and str(movie_data["id"]) not in used_questions:
-                    use_tmdb = True
-                    break
-                elif movie_data:
-                    # Filme já foi usado, tente outro
-                    movie_data = None
-            except Exception as e:
-                logging.error(f"Erro ao obter filme do TMDb: {e}")
+        try:
+            movie_data = movie_prefetcher.get(used_questions)
+            if movie_data is None:
+                movie_data = await get_tmdb_movie_puzzle(used_questions)
+            use_tmdb = movie_data is not None
+        except Exception as e:
+            logging.error(f"Erro ao obter filme do TMDb: {e}")
+            movie_data = None
 
     # Fallback para banco de dados local
     if not movie_data:
-        # Tentar até 5 vezes obter um filme que não tenha sido usado
-        for _ in range(5):
-            movie_data = get_random_movie_emoji()
-            if movie_data and str(movie_data["id"]) not in used_questions:
-                break
-            movie_data = None
+        movie_data = await deal_movie_emoji(chat_id)
 
     if not movie_data:
-        await update.message.reply_text(
-            "😕 Desculpe, não foi possível iniciar o jogo agora. Tente novamente mais tarde."
-        )
-        return
+        raise GameStartError("😕 Desculpe, não foi possível iniciar o jogo agora. Tente novamente mais tarde.")
 
     # Registrar que esta questão foi usada
-    record_used_question(chat_id, "movie", str(movie_data["id"]))
+    await seen_content.record(chat_id, "movie", movie_data["id"])
 
     # Obter opções de filmes para o quiz
     if use_tmdb:
-        try:
-            options = get_movie_options_tmdb(movie_data["id"])
-            if not options or len(options) < 2:
-                # Fallback para opções locais se algo der errado
-                options = get_movie_options(movie_data["title"])
-        except Exception as e:
-            logging.error(f"Erro ao obter opções de filme do TMDb: {e}")
+        options = movie_data.get("options")
+        if not options or len(options) < 2:
+            # Fallback para opções locais se algo der errado
             options = get_movie_options(movie_data["title"])
     else:
         options = get_movie_options(movie_data["title"])
 
     # Garantir que temos opções suficientes
     if not options or len(options) < 2:
-        await update.message.reply_text(
-            "😕 Não foi possível gerar opções para o jogo. Tente novamente mais tarde."
-        )
-        return
+        raise GameStartError("😕 Não foi possível gerar opções para o jogo. Tente novamente mais tarde.")
 
     # Obter configurações de duração do jogo e tempo para tentar novamente
-    max_duration = int(get_setting("max_game_duration_seconds", "300"))
-    retry_timeout = int(get_setting("retry_timeout_seconds", "5"))
+    max_duration = get_setting_int("max_game_duration_seconds", 300)
+    retry_timeout = get_setting_int("retry_timeout_seconds", 5)
 
     # Preparar dados do jogo
     game_data = {
@@ -119,7 +107,7 @@ async def start_movie_game(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         "emoji": movie_data["emoji"],
         "options": options,
         "start_time": time.time(),
-        "started_by": user.id,
+        "started_by": initiator.id if initiator else None,
         "source": "tmdb" if use_tmdb else "local",
         "incorrect_users": [],  # Lista de usuários que erraram
         "correct_user": None,   # Usuário que acertou
@@ -129,15 +117,11 @@ async def start_movie_game(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     }
 
     # Armazenar dados do jogo
-    record_game_start(chat_id, "movie", json.dumps(game_data), max_duration)
+    game = game_store.start(chat_id, "movie", game_data, max_duration)
 
     # Agendar o encerramento automático do jogo após o tempo máximo
-    context.job_queue.run_once(
-        movie_game_timeout, 
-        max_duration, 
-        data={"chat_id": chat_id, "message_id": None},
-        name=f"movie_timeout_{chat_id}"
-    )
+    game_timers.schedule(("movie_timeout", chat_id), max_duration, movie_game_timeout,
+                         chat_id=chat_id, message_id=None)
 
     # Criar botões com opções de filmes
     keyboard = []
@@ -153,35 +137,34 @@ async def start_movie_game(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     if use_tmdb:
         source_text += " (via TMDb API)"
 
-    message = await update.message.reply_text(
-        f"{source_text}\n\n"
+    message = await outbound.send_message(
+        chat_id=chat_id,
+        text=f"{source_text}\n\n"
         f"Que filme está representado por estes emojis?\n\n"
         f"{movie_data['emoji']}\n\n"
         f"Selecione a resposta correta:",
+        priority=PRIORITY_DRAW,
         reply_markup=reply_markup,
         parse_mode="Markdown"
     )
 
-    # Atualizar o job com a message_id para poder editar a mensagem no timeout
-    for job in context.job_queue.get_jobs_by_name(f"movie_timeout_{chat_id}"):
-        job.data["message_id"] = message.message_id
+    # Atualizar o timer com a message_id para poder editar a mensagem no timeout
+    game_timers.update(("movie_timeout", chat_id), message_id=message.message_id)
+    
+    # Guardar também no jogo, para recriar o timeout depois de reiniciar o bot
+    game_data["message_id"] = message.message_id
+    game_store.update(game)
 
-async def movie_game_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def movie_game_timeout(bot, chat_id: int, message_id: int = None) -> None:
     """Função para lidar com o timeout do jogo de filmes."""
-    job = context.job
-    chat_id = job.data["chat_id"]
-    message_id = job.data["message_id"]
 
-    # Obter dados do jogo ativo
-    active_game = get_active_game(chat_id, "movie")
-    if not active_game:
+    # Finalizar o jogo ativo
+    game = game_store.end(chat_id, "movie")
+    if not game:
         return
 
-    # Finalizar o jogo
-    end_game(chat_id, "movie")
-
     # Preparar mensagem de timeout
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     correct_title = game_data["title"]
 
     timeout_message = (
@@ -204,7 +187,7 @@ async def movie_game_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
         if poster_url:
             # Editar a mensagem para remover os botões
-            await context.bot.edit_message_text(
+            await outbound.edit_message_text(
                 chat_id=chat_id,
                 message_id=message_id,
                 text="⏰ Tempo esgotado! Enviando detalhes do filme...",
@@ -212,7 +195,7 @@ async def movie_game_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
             )
             
             # Enviar nova mensagem com a imagem
-            await context.bot.send_photo(
+            await outbound.send_photo(
                 chat_id=chat_id,
                 photo=poster_url,
                 caption=timeout_message,
@@ -220,7 +203,7 @@ async def movie_game_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
             )
         else:
             # Se não tiver imagem, só editar a mensagem
-            await context.bot.edit_message_text(
+            await outbound.edit_message_text(
                 chat_id=chat_id,
                 message_id=message_id,
                 text=timeout_message,
@@ -232,16 +215,17 @@ async def movie_game_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
         # Tentar enviar nova mensagem se não conseguir editar
         try:
             if poster_url:
-                await context.bot.send_photo(
+                await outbound.send_photo(
                     chat_id=chat_id,
                     photo=poster_url,
                     caption=timeout_message,
                     parse_mode="Markdown"
                 )
             else:
-                await context.bot.send_message(
+                await outbound.send_message(
                     chat_id=chat_id,
                     text=timeout_message,
+                    priority=PRIORITY_RESULT,
                     parse_mode="Markdown"
                 )
         except Exception as e2:
@@ -263,15 +247,17 @@ async def handle_movie_game_callback(update: Update, context: ContextTypes.DEFAU
     answer_index = int(callback_data.replace("movie_answer_", ""))
 
     # Get the active game data
-    active_game = get_active_game(chat_id, "movie")
-    if not active_game:
-        await query.edit_message_text(
+    game = game_store.get(chat_id, "movie")
+    if not game:
+        outbound.edit_message_text(
+            chat_id, query.message.message_id,
             "⚠️ Não há um jogo de 'Adivinhe o Filme' ativo neste momento."
         )
         return
 
-    # Parse game data
-    game_data = json.loads(active_game["data"])
+    participation.record(chat_id, user.id)
+
+    game_data = game.data
     correct_title = game_data["title"]
     options = game_data["options"]
     start_time = game_data["start_time"]
@@ -300,23 +286,21 @@ async def handle_movie_game_callback(update: Update, context: ContextTypes.DEFAU
 
     if is_correct:
         try:
-            # Registrar que este usuário acertou
+            # Registrar que este usuário acertou e encerrar o jogo antes de
+            # qualquer await, para que um segundo clique não pontue também
             game_data["correct_user"] = user.id
+            game_store.end(chat_id, "movie")
 
             # Calculate points based on correctness and response time
-            base_points = int(get_setting("points_per_correct_answer", "10"))
-            time_penalty = int(float(get_setting("points_per_second", "1")) * response_time)
+            base_points = get_setting_int("points_per_correct_answer", 10)
+            time_penalty = int(get_setting_float("points_per_second", 1) * response_time)
             points = max(base_points - time_penalty, 1)  # At least 1 point
 
             # Add points to the user
-            add_points(user.id, points, "movie", response_time)
-
-            # End the game
-            end_game(chat_id, "movie")
+            await add_points(user.id, points, "movie", response_time, chat_id=chat_id)
 
-            # Cancelar o job de timeout
-            for job in context.job_queue.get_jobs_by_name(f"movie_timeout_{chat_id}"):
-                job.schedule_removal()
+            # Cancelar o timer de timeout
+            game_timers.cancel(("movie_timeout", chat_id))
 
             # Prepare result message
             result_text = (
@@ -330,18 +314,20 @@ async def handle_movie_game_callback(update: Update, context: ContextTypes.DEFAU
             if game_data.get("overview"):
                 result_text += f"\n\n📝 *Sinopse:*\n{game_data['overview'][:200]}..."
             
-            # Enviar a mensagem com ou sem a imagem do filme
+            # Enviar a mensagem com ou sem a imagem do filme (pela fila de
+            # envio, sem esperar, para não segurar as próximas atualizações)
             poster_url = game_data.get("poster_url")
             
             if poster_url:
                 # Editar a mensagem para remover os botões
-                await query.edit_message_text(
+                outbound.edit_message_text(
+                    chat_id, query.message.message_id,
                     "🎮 Resposta correta! Enviando detalhes do filme...",
                     reply_markup=None
                 )
                 
                 # Enviar nova mensagem com a imagem
-                await context.bot.send_photo(
+                outbound.send_photo(
                     chat_id=chat_id,
                     photo=poster_url,
                     caption=result_text,
@@ -349,10 +335,13 @@ async def handle_movie_game_callback(update: Update, context: ContextTypes.DEFAU
                 )
             else:
                 # Se não tiver imagem, só editar a mensagem
-                await query.edit_message_text(result_text, parse_mode="Markdown")
+                outbound.edit_message_text(chat_id, query.message.message_id, result_text, parse_mode="Markdown")
         except Exception as e:
             logging.error(f"Erro ao processar resposta correta: {e}")
-            await query.edit_message_text(f"⚠️ Ocorreu um erro ao processar sua resposta. Por favor, tente novamente.")
+            outbound.edit_message_text(
+                chat_id, query.message.message_id,
+                f"⚠️ Ocorreu um erro ao processar sua resposta. Por favor, tente novamente."
+            )
 
 
     else:
@@ -361,36 +350,25 @@ async def handle_movie_game_callback(update: Update, context: ContextTypes.DEFAU
         game_data["incorrect_users"] = incorrect_users
 
         # Atualizar dados do jogo
-        updated_data = json.dumps(game_data)
-        record_game_start(chat_id, "movie", updated_data, 
-                         int(datetime.now().timestamp() - start_time + int(get_setting("max_game_duration_seconds", "300"))))
+        game_store.update(game)
 
         # Notificar o usuário de que ele errou
         await query.answer(f"Incorreto! A resposta {options[answer_index]} não é correta. Tente novamente depois do timeout.", show_alert=True)
 
         # Agendar quando o usuário poderá tentar novamente (se o jogo ainda estiver ativo)
-        retry_seconds = int(get_setting("retry_timeout_seconds", "5"))
-        context.job_queue.run_once(
-            enable_retry, 
-            retry_seconds, 
-            data={"chat_id": chat_id, "user_id": user.id, "game_type": "movie"},
-            name=f"movie_retry_{chat_id}_{user.id}"
-        )
+        retry_seconds = get_setting_int("retry_timeout_seconds", 5)
+        game_timers.schedule(("movie_retry", chat_id, user.id), retry_seconds, enable_retry,
+                             chat_id=chat_id, user_id=user.id, game_type="movie")
 
-async def enable_retry(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def enable_retry(bot, chat_id: int, user_id: int, game_type: str) -> None:
     """Permite que um usuário tente novamente após o timeout."""
-    job = context.job
-    chat_id = job.data["chat_id"]
-    user_id = job.data["user_id"]
-    game_type = job.data["game_type"]
 
     # Obter o jogo ativo
-    active_game = get_active_game(chat_id, game_type)
-    if not active_game:
+    game = game_store.get(chat_id, game_type)
+    if not game:
         return
 
-    # Carregar dados do jogo
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     incorrect_users = game_data.get("incorrect_users", [])
 
     # Remover o usuário da lista de incorretos
@@ -399,19 +377,14 @@ async def enable_retry(context: ContextTypes.DEFAULT_TYPE) -> None:
 
     # Atualizar dados do jogo
     game_data["incorrect_users"] = incorrect_users
-    updated_data = json.dumps(game_data)
-
-    # Registrar o jogo atualizado
-    end_time = datetime.fromtimestamp(game_data["start_time"]) + timedelta(seconds=int(get_setting("max_game_duration_seconds", "300")))
-    remaining_seconds = max(0, (end_time - datetime.now()).total_seconds())
-
-    record_game_start(chat_id, game_type, updated_data, int(remaining_seconds))
+    game_store.update(game)
 
     # Tentar enviar uma mensagem privada para o usuário (isso só funciona se o usuário iniciou o bot)
     try:
-        await context.bot.send_message(
+        await outbound.send_message(
             chat_id=user_id,
-            text=f"Você já pode tentar novamente no jogo de adivinhação de filme no grupo!"
+            text=f"Você já pode tentar novamente no jogo de adivinhação de filme no grupo!",
+            priority=PRIORITY_ANNOUNCEMENT
         )
     except Exception:
         # Não fazer nada se não conseguir enviar mensagem privada
@@ -181,13 +181,16 @@ async def handle_platform_photo(update: Update, context: ContextTypes.DEFAULT_TY
     context.user_data["waiting_for_platform_photo"] = False
     context.user_data["waiting_for_pix"] = True
 
-async def handle_pix_key(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle PIX key submission for prize claims."""
+async def handle_pix_key(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+    """Handle PIX key submission for prize claims.
+    
+    Returns True when the message was taken as the PIX key.
+    """
     user = update.effective_user
     
     # Check if user is waiting for PIX input
     if not context.user_data.get("waiting_for_pix", False):
-        return
+        return False
     
     # Get the PIX key from the message
     pix_key = update.message.text.strip()
@@ -216,3 +219,4 @@ async def handle_pix_key(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     # No longer waiting for PIX input
     context.user_data["waiting_for_pix"] = False
+    return True
@@ -2,37 +2,42 @@
 # -*- coding: utf-8 -*-
 
 import random
-import json
 import time
+import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import register_user, add_points, record_game_start, get_active_game, end_game
+from async_database import register_user, add_points
+from game_state import game_store
+from game_timers import game_timers
+from participation import participation
+from game_service import GameStartError, game_starter, start_game
+from outbound import outbound, PRIORITY_DRAW
 from config import SETTINGS, QUIZ_TIME_LIMIT_SECONDS
-from data.quiz_questions import get_random_question
+from data.quiz_questions import deal_question
 
 async def start_quiz_game(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Start a quiz game."""
-    chat_id = update.effective_chat.id
     user = update.effective_user
     
     # Register user if not already registered
-    register_user(user.id, user.username, user.first_name, user.last_name)
+    await register_user(user.id, user.username, user.first_name, user.last_name)
     
+    try:
+        await start_game(update.effective_chat.id, "quiz", initiator=user)
+    except GameStartError as e:
+        await update.message.reply_text(str(e))
+
+@game_starter("quiz")
+async def send_quiz_game(bot, chat_id: int, initiator=None) -> None:
+    """Prepare and send a quiz question to the chat."""
     # Check if there's already an active quiz in this chat
-    active_game = get_active_game(chat_id, "quiz")
-    if active_game:
-        await update.message.reply_text(
-            "⚠️ Já existe um Quiz em andamento neste chat!"
-        )
-        return
+    if game_store.get(chat_id, "quiz"):
+        raise GameStartError("⚠️ Já existe um Quiz em andamento neste chat!")
     
-    # Get a random quiz question
-    question_data = get_random_question()
+    # Get the next question from this chat's deck
+    question_data = await deal_question(chat_id)
     if not question_data:
-        await update.message.reply_text(
-            "😕 Desculpe, não foi possível iniciar o quiz agora. Tente novamente mais tarde."
-        )
-        return
+        raise GameStartError("😕 Desculpe, não foi possível iniciar o quiz agora. Tente novamente mais tarde.")
     
     # Prepare game data
     game_data = {
@@ -41,11 +46,11 @@ async def start_quiz_game(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         "correct_answer": question_data["correct_answer"],
         "category": question_data["category"],
         "start_time": time.time(),
-        "started_by": user.id
+        "started_by": initiator.id if initiator else None
     }
     
     # Store game data
-    record_game_start(chat_id, "quiz", json.dumps(game_data), QUIZ_TIME_LIMIT_SECONDS)
+    game = game_store.start(chat_id, "quiz", game_data, QUIZ_TIME_LIMIT_SECONDS)
     
     # Create buttons with answer options
     keyboard = []
@@ -57,45 +62,37 @@ async def start_quiz_game(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     reply_markup = InlineKeyboardMarkup(keyboard)
     
     # Send the message with the question
-    quiz_message = await update.message.reply_text(
-        f"🧠 *QUIZ* 🧠\n\n"
+    quiz_message = await outbound.send_message(
+        chat_id=chat_id,
+        text=f"🧠 *QUIZ* 🧠\n\n"
         f"*Categoria:* {question_data['category']}\n\n"
         f"*Pergunta:* {question_data['question']}\n\n"
         f"⏱️ Você tem {QUIZ_TIME_LIMIT_SECONDS} segundos para responder.",
+        priority=PRIORITY_DRAW,
         reply_markup=reply_markup,
         parse_mode="Markdown"
     )
     
     # Schedule end of quiz after time limit
-    context.job_queue.run_once(
-        quiz_timeout, 
-        QUIZ_TIME_LIMIT_SECONDS,
-        data={
-            "chat_id": chat_id,
-            "message_id": quiz_message.message_id
-        },
-        name=f"quiz_timeout_{chat_id}"
-    )
+    game_timers.schedule(("quiz_timeout", chat_id), QUIZ_TIME_LIMIT_SECONDS, quiz_timeout,
+                         chat_id=chat_id, message_id=quiz_message.message_id)
+    
+    # Keep the message id so the timeout can be restored after a restart
+    game_data["message_id"] = quiz_message.message_id
+    game_store.update(game)
 
-async def quiz_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def quiz_timeout(bot, chat_id: int, message_id: int = None) -> None:
     """Handle quiz timeout."""
-    job_data = context.job.data
-    chat_id = job_data["chat_id"]
-    message_id = job_data["message_id"]
     
-    # Check if the quiz is still active
-    active_game = get_active_game(chat_id, "quiz")
-    if not active_game:
+    # End the quiz if it is still active
+    game = game_store.end(chat_id, "quiz")
+    if not game:
         return  # Quiz already answered
     
-    # Parse game data
-    game_data = json.loads(active_game["data"])
+    game_data = game.data
     correct_answer = game_data["correct_answer"]
     correct_index = game_data["options"].index(correct_answer)
     
-    # End the game
-    end_game(chat_id, "quiz")
-    
     # Update the message to show the correct answer
     try:
         # Create a new keyboard with the correct answer highlighted
@@ -108,7 +105,7 @@ async def quiz_timeout(context: ContextTypes.DEFAULT_TYPE) -> None:
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await context.bot.edit_message_text(
+        await outbound.edit_message_text(
             chat_id=chat_id,
             message_id=message_id,
             text=f"⏱️ *TEMPO ESGOTADO!* ⏱️\n\n"
@@ -140,16 +137,15 @@ async def handle_quiz_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     
     answer_index = int(callback_data.replace("quiz_answer_", ""))
     
-    # Get the active game data
-    active_game = get_active_game(chat_id, "quiz")
-    if not active_game:
-        await query.edit_message_text(
-            "⚠️ Não há um Quiz ativo neste momento."
-        )
+    # Get the active game data and end it right away: only the first answer counts
+    game = game_store.end(chat_id, "quiz")
+    if not game:
+        outbound.edit_message_text(chat_id, query.message.message_id, "⚠️ Não há um Quiz ativo neste momento.")
         return
     
-    # Parse game data
-    game_data = json.loads(active_game["data"])
+    participation.record(chat_id, user.id)
+    
+    game_data = game.data
     options = game_data["options"]
     correct_answer = game_data["correct_answer"]
     start_time = game_data["start_time"]
@@ -161,10 +157,8 @@ async def handle_quiz_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     user_answer = options[answer_index]
     is_correct = user_answer == correct_answer
     
-    # Remove timeout job if exists
-    if context.job_queue:
-        for job in context.job_queue.get_jobs_by_name(f"quiz_timeout_{chat_id}"):
-            job.schedule_removal()
+    # Remove timeout timer if exists
+    game_timers.cancel(("quiz_timeout", chat_id))
     
     # Calculate points based on correctness and response time
     points = 0
@@ -175,12 +169,9 @@ async def handle_quiz_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         points = int(base_points * (0.5 + 0.5 * time_factor))  # Between 50% and 100% of base points
         
         # Add points to the user
-        add_points(user.id, points, "quiz", response_time)
+        await add_points(user.id, points, "quiz", response_time, chat_id=chat_id)
     
     try:
-        # End the game
-        end_game(chat_id, "quiz")
-        
         # Create a new keyboard with the answers marked
         keyboard = []
         for i, option in enumerate(options):
@@ -219,7 +210,8 @@ async def handle_quiz_callback(update: Update, context: ContextTypes.DEFAULT_TYP
                 f"Melhor sorte na próxima vez! 📚"
             )
         
-        await query.edit_message_text(result_text, reply_markup=reply_markup, parse_mode="Markdown")
+        outbound.edit_message_text(chat_id, query.message.message_id, result_text,
+                                   reply_markup=reply_markup, parse_mode="Markdown")
     except Exception as e:
         logging.error(f"Erro ao processar resposta do quiz: {e}")
-        await query.edit_message_text("Ocorreu um erro ao processar sua resposta.")
+        outbound.edit_message_text(chat_id, query.message.message_id, "Ocorreu um erro ao processar sua resposta.")
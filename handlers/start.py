@@ -65,7 +65,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         "/filme - Jogo de adivinhar filme por emojis\n"
         "/quiz - Quiz de perguntas gerais\n"
         "/mimica - Jogo de mímica com temas divertidos\n"
-        "/placar - Ver o ranking de pontos\n"
+        "/placar - Ver o ranking de pontos (semana, mes, grupo)\n"
         "/convite - Gerar link de convite\n"
         "/premio - Solicitar resgate de prêmio\n"
         "/configurar - Configurar o bot (somente admin)\n"
@@ -89,7 +89,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         "🔍 *Sequência de Emoji* - /emoji\n"
         "Descubra o padrão em uma sequência de emojis e complete-a corretamente.\n\n"
         "📊 *Outras funcionalidades:*\n\n"
-        "/placar - Veja o ranking dos jogadores com mais pontos\n"
+        "/placar - Veja o ranking dos jogadores com mais pontos (ex.: /placar semana)\n"
         "/convite - Crie um link de convite e ganhe pontos por cada novo participante\n"
         "/premio - Solicite o resgate do seu prêmio quando acumular pontos suficientes\n\n"
         "⚙️ *Administração:*\n"
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: leaderboard.py - Placar ordenado em memória com consulta de posição
+#
+# Os pontos de todos os usuários ficam em uma lista ordenada dividida em blocos
+# (no estilo de sortedcontainers): localizar um usuário é uma busca binária
+# nos blocos e dentro do bloco, e inserir/remover só desloca um bloco de até
+# _BLOCK_SIZE itens. Os tamanhos dos blocos ficam em uma árvore de Fenwick,
+# então a posição de uma chave (e o bloco de uma posição) sai em O(log n)
+# sem somar os blocos anteriores. O placar é atualizado a cada alteração de
+# pontos, então o top N e a posição de um usuário não precisam consultar o
+# banco.
+
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+_BLOCK_SIZE = 512
+
+
+class RankedIndex:
+    """Lista ordenada de chaves com posição (rank) de cada chave."""
+
+    def __init__(self):
+        self._blocks: List[list] = []
+        # Maior chave de cada bloco, para a busca binária entre blocos
+        self._maxes: list = []
+        # Árvore de Fenwick (índices a partir de 1) com o tamanho de cada bloco
+        self._tree: List[int] = [0]
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def clear(self) -> None:
+        self._blocks = []
+        self._maxes = []
+        self._tree = [0]
+        self._len = 0
+
+    def _rebuild_tree(self) -> None:
+        """Recriar a árvore de Fenwick em O(blocos) (após dividir ou remover um bloco)."""
+        tree = [0] + [len(block) for block in self._blocks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, pos: int, delta: int) -> None:
+        i = pos + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, pos: int) -> int:
+        """Quantidade de chaves nos blocos anteriores ao bloco ``pos``."""
+        total = 0
+        i = pos
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """Bloco e posição dentro dele da chave na posição ``index``."""
+        pos = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= index:
+                pos = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def build(self, keys) -> None:
+        """Recriar o índice a partir de um conjunto de chaves."""
+        keys = sorted(keys)
+        self._blocks = [keys[i:i + _BLOCK_SIZE] for i in range(0, len(keys), _BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._rebuild_tree()
+        self._len = len(keys)
+
+    def _block_index(self, key) -> int:
+        pos = bisect_left(self._maxes, key)
+        return min(pos, len(self._blocks) - 1)
+
+    def add(self, key) -> None:
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._rebuild_tree()
+        else:
+            pos = self._block_index(key)
+            block = self._blocks[pos]
+            insort(block, key)
+            self._maxes[pos] = block[-1]
+            if len(block) > 2 * _BLOCK_SIZE:
+                self._blocks[pos:pos + 1] = [block[:_BLOCK_SIZE], block[_BLOCK_SIZE:]]
+                self._maxes[pos:pos + 1] = [block[_BLOCK_SIZE - 1], block[-1]]
+                self._rebuild_tree()
+            else:
+                self._tree_add(pos, 1)
+        self._len += 1
+
+    def remove(self, key) -> None:
+        pos = self._block_index(key)
+        block = self._blocks[pos]
+        i = bisect_left(block, key)
+        if i == len(block) or block[i] != key:
+            raise KeyError(key)
+        del block[i]
+        self._len -= 1
+        if block:
+            self._maxes[pos] = block[-1]
+            self._tree_add(pos, -1)
+        else:
+            del self._blocks[pos]
+            del self._maxes[pos]
+            self._rebuild_tree()
+
+    def index(self, key) -> int:
+        """Posição (a partir de 0) de uma chave presente no índice."""
+        pos = self._block_index(key)
+        block = self._blocks[pos]
+        i = bisect_left(block, key)
+        if i == len(block) or block[i] != key:
+            raise KeyError(key)
+        return self._prefix(pos) + i
+
+    def slice(self, start: int, stop: int) -> list:
+        """Chaves nas posições [start, stop)."""
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+        pos, i = self._locate(start)
+        result = []
+        while len(result) < stop - start:
+            result.extend(self._blocks[pos][i:i + stop - start - len(result)])
+            pos, i = pos + 1, 0
+        return result
+
+
+class Leaderboard:
+    """Placar de pontos de usuários, seguro para threads.
+
+    A ordem é por pontos decrescentes e, no empate, por user_id, para que a
+    posição de cada usuário seja estável.
+    """
+
+    def __init__(self):
+        self._points: Dict[int, int] = {}
+        self._names: Dict[int, Tuple[Optional[str], Optional[str], Optional[str]]] = {}
+        self._index = RankedIndex()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(user_id: int, points: int) -> Tuple[int, int]:
+        return (-points, user_id)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def load(self, rows) -> None:
+        """Substituir o conteúdo por linhas (user_id, username, first_name, last_name, points)."""
+        with self._lock:
+            self._points = {}
+            self._names = {}
+            for row in rows:
+                self._points[row["user_id"]] = row["points"] or 0
+                self._names[row["user_id"]] = (row["username"], row["first_name"], row["last_name"])
+            self._index.build(self._key(user_id, points) for user_id, points in self._points.items())
+
+    def set_points(self, user_id: int, points: int) -> None:
+        """Definir os pontos de um usuário (valor absoluto, vindo do banco)."""
+        with self._lock:
+            old = self._points.get(user_id)
+            if old == points:
+                return
+            if old is not None:
+                self._index.remove(self._key(user_id, old))
+            self._points[user_id] = points
+            self._index.add(self._key(user_id, points))
+
+    def set_user(self, user_id: int, username=None, first_name=None, last_name=None) -> None:
+        """Atualizar o nome exibido de um usuário."""
+        with self._lock:
+            self._names[user_id] = (username, first_name, last_name)
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            points = self._points.pop(user_id, None)
+            if points is not None:
+                self._index.remove(self._key(user_id, points))
+            self._names.pop(user_id, None)
+
+    def _entry(self, key) -> dict:
+        points, user_id = -key[0], key[1]
+        username, first_name, last_name = self._names.get(user_id, (None, None, None))
+        return {
+            "user_id": user_id,
+            "username": username,
+            "first_name": first_name,
+            "last_name": last_name,
+            "points": points,
+        }
+
+    def top(self, limit: int = 10) -> List[dict]:
+        """Os ``limit`` primeiros colocados, no formato de get_leaderboard."""
+        with self._lock:
+            return [self._entry(key) for key in self._index.slice(0, limit)]
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """Posição do usuário (a partir de 1) ou None se não estiver no placar."""
+        with self._lock:
+            points = self._points.get(user_id)
+            if points is None:
+                return None
+            return self._index.index(self._key(user_id, points)) + 1
+
+    def around(self, user_id: int, radius: int = 2) -> Optional[dict]:
+        """Posição, pontos e vizinhos (``radius`` acima e abaixo) de um usuário."""
+        with self._lock:
+            rank = self.rank(user_id)
+            if rank is None:
+                return None
+            start = max(0, rank - 1 - radius)
+            neighbors = []
+            for offset, key in enumerate(self._index.slice(start, rank + radius)):
+                entry = self._entry(key)
+                entry["rank"] = start + offset + 1
+                neighbors.append(entry)
+            return {
+                "user_id": user_id,
+                "rank": rank,
+                "points": self._points[user_id],
+                "total": len(self._points),
+                "neighbors": neighbors,
+            }
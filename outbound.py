@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: outbound.py - Fila de envio de mensagens para o Telegram
+#
+# Os jogos enviam resultados, sorteios do Bingo e anúncios por esta fila em
+# vez de chamar o bot diretamente. Uma única task entrega as mensagens
+# respeitando os limites do Telegram: um limite global de mensagens por
+# segundo e um por chat (em grupos, TELEGRAM_GROUP_PER_MINUTE por minuto),
+# ambos como token buckets. Com muitos grupos ativos as mensagens esperam na
+# fila em vez de receber 429 e se perderem.
+#
+# Cada chat tem a sua fila, ordenada por prioridade (resultados, depois
+# sorteios e mensagens dos jogos, depois anúncios) e por ordem de chegada, e
+# só uma mensagem por chat fica em envio de cada vez. Entre chats, vai primeiro
+# a mensagem de maior prioridade dentre os chats que já podem enviar.
+#
+# Uma edição de uma mensagem que ainda está na fila substitui a edição
+# pendente, e um RetryAfter (429) pausa só o chat afetado pelo tempo pedido e
+# devolve a mensagem para a fila.
+#
+# Os métodos retornam um Future com o resultado do Telegram: aguarde-o quando
+# precisar da mensagem enviada (ex.: o message_id) ou da ordem em relação a
+# outros envios; caso contrário não aguarde, para não segurar o handler.
+
+import os
+import heapq
+import time
+import asyncio
+import logging
+import itertools
+from collections import deque
+from typing import Dict, Hashable, List, Optional
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Mensagens por segundo somando todos os chats
+TELEGRAM_GLOBAL_PER_SECOND = float(os.environ.get("TELEGRAM_GLOBAL_PER_SECOND", "30"))
+# Mensagens por minuto em um mesmo grupo
+TELEGRAM_GROUP_PER_MINUTE = float(os.environ.get("TELEGRAM_GROUP_PER_MINUTE", "20"))
+# Mensagens por segundo em um chat privado
+TELEGRAM_CHAT_PER_SECOND = float(os.environ.get("TELEGRAM_CHAT_PER_SECOND", "1"))
+# Rajada permitida em um grupo antes de seguir o limite por minuto
+TELEGRAM_GROUP_BURST = 3
+# Tentativas de uma mensagem que recebeu RetryAfter
+OUTBOUND_MAX_RETRIES = 3
+
+# Prioridades (menor sai primeiro)
+PRIORITY_RESULT = 0        # Resultados, vencedores e encerramento dos jogos
+PRIORITY_DRAW = 1          # Sorteios do Bingo e mensagens dos jogos
+PRIORITY_ANNOUNCEMENT = 2  # Anúncios e avisos do próximo jogo
+
+PRIORITY_NAMES = {PRIORITY_RESULT: "result", PRIORITY_DRAW: "draw", PRIORITY_ANNOUNCEMENT: "announcement"}
+
+
+class TokenBucket:
+    """Até ``capacity`` envios seguidos, reabastecidos a ``rate`` por segundo."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Segundos até haver um envio disponível (0 se já houver)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Outgoing:
+    __slots__ = ("priority", "seq", "method", "kwargs", "futures", "enqueued", "edit_key", "attempts")
+
+    def __init__(self, priority: int, seq: int, method: str, kwargs: Dict, future: asyncio.Future,
+                 enqueued: float, edit_key: Optional[Hashable]):
+        self.priority = priority
+        self.seq = seq
+        self.method = method
+        self.kwargs = kwargs
+        self.futures = [future]
+        self.enqueued = enqueued
+        self.edit_key = edit_key
+        self.attempts = 0
+
+    def __lt__(self, other: "_Outgoing") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _ChatLane:
+    __slots__ = ("chat_id", "items", "bucket", "paused_until", "busy", "entry", "ready")
+
+    def __init__(self, chat_id: int, bucket: TokenBucket):
+        self.chat_id = chat_id
+        self.items: List[_Outgoing] = []
+        self.bucket = bucket
+        self.paused_until = 0.0
+        self.busy = False
+        # Entrada atual do chat no heap de prontos ou de espera (as outras são descartadas)
+        self.entry = None
+        self.ready = False
+
+
+class OutboundQueue:
+    """Fila de envio com limites global e por chat, prioridades e coalescência de edições."""
+
+    def __init__(self):
+        self._bot = None
+        self._lanes: Dict[int, _ChatLane] = {}
+        self._ready: List[tuple] = []    # (prioridade, seq, chat)
+        self._waiting: List[tuple] = []  # (quando, seq, chat)
+        self._edits: Dict[Hashable, _Outgoing] = {}
+        self._seq = itertools.count()
+        self._global: Optional[TokenBucket] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._sending = set()
+        self._started_at = 0.0
+        self._last_prune = 0.0
+        self._queued = 0
+        self._max_queued = 0
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+        self._coalesced = 0
+        self._latencies = {priority: deque(maxlen=1000) for priority in PRIORITY_NAMES}
+
+    def start(self, bot) -> None:
+        """Iniciar a task de envio (chamado no post_init do bot)."""
+        self._bot = bot
+        if self._task is None or self._task.done():
+            loop = asyncio.get_running_loop()
+            self._global = TokenBucket(TELEGRAM_GLOBAL_PER_SECOND, TELEGRAM_GLOBAL_PER_SECOND, loop.time())
+            self._wakeup = asyncio.Event()
+            self._started_at = time.monotonic()
+            self._task = loop.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Tentar entregar o que falta por até ``timeout`` segundos e parar a task."""
+        if self._task is None:
+            return
+        deadline = time.monotonic() + timeout
+        while (self._queued or self._sending) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def send_message(self, chat_id: int, text: str, priority: int = PRIORITY_ANNOUNCEMENT, **kwargs) -> asyncio.Future:
+        return self.submit("send_message", chat_id, priority, text=text, **kwargs)
+
+    def send_photo(self, chat_id: int, photo, priority: int = PRIORITY_RESULT, **kwargs) -> asyncio.Future:
+        return self.submit("send_photo", chat_id, priority, photo=photo, **kwargs)
+
+    def edit_message_text(self, chat_id: int, message_id: int, text: str, priority: int = PRIORITY_RESULT,
+                          **kwargs) -> asyncio.Future:
+        """Editar uma mensagem; uma edição ainda na fila para a mesma mensagem é substituída."""
+        return self.submit("edit_message_text", chat_id, priority, edit_key=("edit_message_text", chat_id, message_id),
+                           message_id=message_id, text=text, **kwargs)
+
+    def submit(self, method: str, chat_id: int, priority: int, edit_key: Optional[Hashable] = None,
+               **kwargs) -> asyncio.Future:
+        """Enfileirar ``bot.<method>(chat_id=chat_id, **kwargs)``."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Quem não aguarda o envio não recebe aviso de exceção não lida (o erro já vai para o log)
+        future.add_done_callback(_consume_exception)
+        kwargs["chat_id"] = chat_id
+
+        pending = self._edits.get(edit_key) if edit_key is not None else None
+        if pending is not None:
+            # Edição ainda não enviada: só a mais recente interessa
+            pending.kwargs = kwargs
+            pending.futures.append(future)
+            self._coalesced += 1
+            if priority < pending.priority:
+                lane = self._lanes[chat_id]
+                pending.priority = priority
+                heapq.heapify(lane.items)
+                self._refresh(lane, loop.time())
+            return future
+
+        item = _Outgoing(priority, next(self._seq), method, kwargs, future, loop.time(), edit_key)
+        if edit_key is not None:
+            self._edits[edit_key] = item
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            lane = self._lanes[chat_id] = _ChatLane(chat_id, self._chat_bucket(chat_id, loop.time()))
+        heapq.heappush(lane.items, item)
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        if lane.items[0] is item:
+            self._refresh(lane, loop.time())
+        return future
+
+    def stats(self) -> Dict:
+        uptime = max(time.monotonic() - self._started_at, 1e-9) if self._started_at else 0
+        latency = {}
+        for priority, samples in self._latencies.items():
+            if samples:
+                ordered = sorted(samples)
+                latency[PRIORITY_NAMES[priority]] = {
+                    "avg": round(sum(ordered) / len(ordered), 3),
+                    "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                    "max": round(ordered[-1], 3),
+                }
+        return {
+            "queued": self._queued,
+            "max_queued": self._max_queued,
+            "sending": len(self._sending),
+            "chats": len(self._lanes),
+            "sent": self._sent,
+            "failed": self._failed,
+            "retries": self._retries,
+            "coalesced": self._coalesced,
+            "per_second": round(self._sent / uptime, 2) if uptime else 0,
+            "latency": latency,
+        }
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        # Grupos e canais têm id negativo
+        if chat_id < 0:
+            return TokenBucket(TELEGRAM_GROUP_PER_MINUTE / 60, TELEGRAM_GROUP_BURST, now)
+        return TokenBucket(TELEGRAM_CHAT_PER_SECOND, 1, now)
+
+    def _refresh(self, lane: _ChatLane, now: float) -> None:
+        """Colocar o chat no heap de prontos ou de espera, conforme o limite e a pausa dele."""
+        if lane.busy or not lane.items:
+            return
+        when = max(now + lane.bucket.delay(now), lane.paused_until)
+        if when <= now:
+            head = lane.items[0]
+            lane.entry = (head.priority, head.seq, lane)
+            lane.ready = True
+            heapq.heappush(self._ready, lane.entry)
+        elif lane.entry is not None and not lane.ready:
+            return  # já espera no heap de espera
+        else:
+            lane.entry = (when, next(self._seq), lane)
+            lane.ready = False
+            heapq.heappush(self._waiting, lane.entry)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _prune(self, now: float) -> None:
+        """Esquecer os chats sem mensagens cujo limite já se recuperou."""
+        for chat_id in [chat_id for chat_id, lane in self._lanes.items()
+                        if not lane.items and not lane.busy and lane.paused_until <= now and lane.bucket.full(now)]:
+            del self._lanes[chat_id]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            now = loop.time()
+            if now - self._last_prune > 60:
+                self._prune(now)
+                self._last_prune = now
+
+            # Chats cuja espera terminou passam para os prontos
+            while self._waiting and self._waiting[0][0] <= now:
+                entry = heapq.heappop(self._waiting)
+                lane = entry[2]
+                if entry is lane.entry:
+                    lane.entry = None
+                    self._refresh(lane, now)
+            while self._ready and self._ready[0] is not self._ready[0][2].entry:
+                heapq.heappop(self._ready)
+
+            if not self._ready:
+                timeout = self._waiting[0][0] - now if self._waiting else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Limite global: esperar e reavaliar (pode ter chegado algo mais prioritário)
+            delay = self._global.delay(now)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            lane = heapq.heappop(self._ready)[2]
+            lane.entry = None
+            lane.ready = False
+            item = heapq.heappop(lane.items)
+            self._queued -= 1
+            if item.edit_key is not None and self._edits.get(item.edit_key) is item:
+                del self._edits[item.edit_key]
+            lane.bucket.take(now)
+            self._global.take(now)
+            lane.busy = True
+            task = loop.create_task(self._deliver(lane, item))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _deliver(self, lane: _ChatLane, item: _Outgoing) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            result = await getattr(self._bot, item.method)(**item.kwargs)
+        except RetryAfter as e:
+            item.attempts += 1
+            self._retries += 1
+            logger.warning(f"Telegram pediu para esperar {e.retry_after}s no chat {lane.chat_id} ({item.method})")
+            if item.attempts <= OUTBOUND_MAX_RETRIES:
+                lane.paused_until = loop.time() + e.retry_after
+                heapq.heappush(lane.items, item)
+                self._queued += 1
+                if item.edit_key is not None:
+                    self._edits.setdefault(item.edit_key, item)
+            else:
+                self._fail(item, e)
+        except Exception as e:
+            self._fail(item, e)
+        else:
+            self._sent += 1
+            self._latencies[item.priority].append(loop.time() - item.enqueued)
+            for future in item.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            lane.busy = False
+            self._refresh(lane, loop.time())
+
+    def _fail(self, item: _Outgoing, error: Exception) -> None:
+        self._failed += 1
+        logger.error(f"Erro ao enviar {item.method} para o chat {item.kwargs.get('chat_id')}: {error}")
+        for future in item.futures:
+            if not future.done():
+                future.set_exception(error)
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+# Instância compartilhada pelos handlers
+outbound = OutboundQueue()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: participation.py - Participação nos jogos por chat
+#
+# Os handlers dos jogos registram aqui quem respondeu. O agendador de jogos
+# automáticos (utils/scheduler.py) consulta, a cada jogo, quantas pessoas
+# diferentes jogaram desde o anterior e ajusta a frequência do chat. Fica só
+# em memória: depois de reiniciar o bot a contagem recomeça.
+
+from typing import Dict, Set
+
+
+class ParticipationTracker:
+    """Jogadores distintos por chat desde a última consulta."""
+
+    def __init__(self):
+        self._players: Dict[int, Set[int]] = {}
+
+    def record(self, chat_id: int, user_id: int) -> None:
+        self._players.setdefault(chat_id, set()).add(user_id)
+
+    def take(self, chat_id: int) -> int:
+        """Quantidade de jogadores desde a última chamada (e zerar a contagem)."""
+        return len(self._players.pop(chat_id, ()))
+
+# Instância compartilhada
+participation = ParticipationTracker()
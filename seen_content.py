@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: seen_content.py - Conteúdos já usados em cada chat
+#
+# Cada chat guarda, por tipo de jogo, os últimos SEEN_CONTENT_WINDOW
+# conteúdos usados (ids de filmes, perguntas...). A janela fica em memória
+# como um dicionário ordenado: verificar se um conteúdo já saiu é O(1) e o
+# mais antigo sai quando a janela enche. A tabela seen_content é a cópia
+# persistente, lida na primeira consulta de cada chat após o bot iniciar.
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import database
+from async_database import run_in_db_executor
+
+logger = logging.getLogger(__name__)
+
+
+class SeenContentStore:
+    """Janela deslizante dos conteúdos usados por (chat, tipo de jogo)."""
+
+    def __init__(self, window: int = database.SEEN_CONTENT_WINDOW):
+        self.window = window
+        self._seen: Dict[Tuple[int, str], "OrderedDict[str, None]"] = {}
+        # Mantidos depois do carregamento: quem ainda espera e quem chega depois
+        # usam o mesmo lock e encontram o histórico já carregado
+        self._load_locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+
+    async def _load(self, chat_id: int, content_type: str) -> "OrderedDict[str, None]":
+        key = (chat_id, content_type)
+        seen = self._seen.get(key)
+        if seen is not None:
+            return seen
+
+        lock = self._load_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            seen = self._seen.get(key)
+            if seen is None:
+                try:
+                    ids = await run_in_db_executor(database.get_seen_content, chat_id, content_type, self.window)
+                except Exception as e:
+                    # Sem o histórico o jogo continua, só pode repetir conteúdo
+                    logger.error(f"Erro ao carregar conteúdos usados do chat {chat_id}: {e}")
+                    return OrderedDict()
+                seen = self._seen[key] = OrderedDict.fromkeys(ids)
+        return seen
+
+    async def seen(self, chat_id: int, content_type: str):
+        """Conteúdos usados no chat (suporta ``in`` em O(1)), do mais antigo ao mais recente."""
+        return (await self._load(chat_id, content_type)).keys()
+
+    async def record(self, chat_id: int, content_type: str, content_id) -> None:
+        """Marcar um conteúdo como usado (em memória e no banco)."""
+        content_id = str(content_id)
+        seen = await self._load(chat_id, content_type)
+        seen.pop(content_id, None)
+        seen[content_id] = None
+        while len(seen) > self.window:
+            seen.popitem(last=False)
+        try:
+            await run_in_db_executor(database.record_seen_content, chat_id, content_type, content_id, self.window)
+        except Exception as e:
+            logger.error(f"Erro ao registrar conteúdo usado no chat {chat_id}: {e}")
+
+# Instância compartilhada
+seen_content = SeenContentStore()
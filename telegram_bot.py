@@ -4,10 +4,13 @@
 
 import logging
 import os
+from telegram import Update
 from telegram.ext import (
     Application,
+    ContextTypes,
     CommandHandler,
     CallbackQueryHandler,
+    ChatMemberHandler,
     MessageHandler,
     filters,
 )
@@ -15,6 +18,17 @@ from telegram.ext import (
 # Local imports
 from config import TOKEN
 from database import setup_database
+from async_database import shutdown_db_executor
+from game_state import game_store, flush_game_states, GAME_STATE_FLUSH_SECONDS
+from game_timers import game_timers
+from game_service import game_service
+from outbound import outbound
+from activity_buffer import (
+    activity_buffer, flush_activity, purge_activity,
+    ACTIVITY_FLUSH_SECONDS, ACTIVITY_PURGE_SECONDS
+)
+from data.tmdb_client import tmdb_client
+from data.movie_prefetch import movie_prefetcher
 from handlers.start import start, help_command
 from handlers.admin import (
     admin_configure,
@@ -47,7 +61,8 @@ from handlers.invite import generate_invite, handle_invite_join
 from handlers.leaderboard import show_leaderboard, show_invite_leaderboard
 from handlers.prize import claim_prize, handle_prize_info, handle_platform_photo, handle_pix_key
 from handlers.active_members import show_active_members, record_user_activity
-from utils.scheduler import setup_game_scheduler
+from handlers.membership import handle_bot_membership
+from utils.scheduler import setup_game_scheduler, restore_game_jobs, game_start_limiter
 
 # Enable logging
 logging.basicConfig(
@@ -56,13 +71,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def post_init(application: Application) -> None:
+    """Recarregar o estado dos jogos ativos e iniciar a fila de filmes antes de receber atualizações."""
+    await game_store.rehydrate()
+    outbound.start(application.bot)
+    game_timers.start(application.bot)
+    game_service.attach(application.bot)
+    restore_game_jobs(application)
+    movie_prefetcher.start()
+
+async def post_stop(application: Application) -> None:
+    """Parar os timers e entregar as mensagens na fila enquanto o bot ainda pode enviar."""
+    await game_timers.stop()
+    logger.info(f"Timers dos jogos: {game_timers.stats()}")
+    await outbound.stop()
+    logger.info(f"Fila de envio: {outbound.stats()}")
+
+async def post_shutdown(application: Application) -> None:
+    """Gravar as alterações pendentes dos jogos e atividades e fechar conexões antes de encerrar."""
+    logger.info(f"Inícios de jogos automáticos: {game_start_limiter.stats()}")
+    await game_store.flush()
+    await activity_buffer.flush()
+    logger.info(f"Atividades: {activity_buffer.stats()}")
+    await movie_prefetcher.stop()
+    logger.info(f"Fila de filmes: {movie_prefetcher.stats()}")
+    await tmdb_client.close()
+
+async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Encaminhar mensagens de texto para o resgate de prêmios ou o jogo de emojis."""
+    # Uma mensagem usada como chave PIX não conta como palpite
+    if await handle_pix_key(update, context):
+        return
+    await handle_emoji_pattern_answer(update, context)
+
 def main():
     """Start the bot."""
     # Initialize database
     setup_database()
     
     # Create the Application instance
-    application = Application.builder().token(TOKEN).build()
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     
     # Register command handlers
     application.add_handler(CommandHandler("start", start))
@@ -98,20 +153,49 @@ def main():
     application.add_handler(CallbackQueryHandler(admin_configure_callback, pattern=r"^config_"))
     application.add_handler(CallbackQueryHandler(handle_prize_info, pattern=r"^prize_"))
     
-    # Message handlers for game answers, prize claims and activity tracking
-    application.add_handler(MessageHandler(filters.PHOTO, 
-                                          lambda update, context: record_user_activity(update, context) or handle_platform_photo(update, context)))
+    # Entrada e saída do bot dos grupos (agendamento dos jogos automáticos)
+    application.add_handler(ChatMemberHandler(handle_bot_membership, ChatMemberHandler.MY_CHAT_MEMBER))
     
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, 
-                                          lambda update, context: record_user_activity(update, context) or 
-                                                                  handle_pix_key(update, context) or 
-                                                                  handle_emoji_pattern_answer(update, context)))
+    # Registro de atividade em um grupo próprio, para rodar junto com os
+    # handlers de respostas abaixo em vez de consumir a atualização
+    application.add_handler(MessageHandler((filters.TEXT & ~filters.COMMAND) | filters.PHOTO,
+                                          record_user_activity), group=-1)
+    
+    # Message handlers for game answers and prize claims
+    application.add_handler(MessageHandler(filters.PHOTO, handle_platform_photo))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_message))
+    
+    # Gravação periódica do estado dos jogos em memória
+    application.job_queue.run_repeating(
+        flush_game_states,
+        interval=GAME_STATE_FLUSH_SECONDS,
+        name="flush_game_states"
+    )
+    
+    # Gravação periódica das atividades dos membros
+    application.job_queue.run_repeating(
+        flush_activity,
+        interval=ACTIVITY_FLUSH_SECONDS,
+        name="flush_activity"
+    )
+    
+    # Limpeza diária das atividades fora do período de retenção e dos placares
+    # de semanas e meses passados
+    application.job_queue.run_repeating(
+        purge_activity,
+        interval=ACTIVITY_PURGE_SECONDS,
+        first=60,
+        name="purge_activity"
+    )
     
     # Setup scheduled games
     setup_game_scheduler(application)
     
     # Start the Bot
     application.run_polling()
+    
+    # Liberar as threads de banco de dados após o encerramento
+    shutdown_db_executor()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Testes do motor do Bingo (bingo_engine.py) comparado à verificação direta das cartelas
+
+import random
+
+from bingo_engine import BingoGame, BINGO_MAX_NUMBER, pack_card, random_card, unpack_card
+
+
+def brute_force_win_type(cartela, drawn):
+    """Primeira linha completa na ordem antiga: linha i, coluna i e depois as diagonais."""
+    marked = set(drawn) | {0}
+    lines = []
+    for i in range(5):
+        lines.append(("linha", [cartela[col][i] for col in range(5)]))
+        lines.append(("coluna", cartela[i]))
+    lines.append(("diagonal", [cartela[i][i] for i in range(5)]))
+    lines.append(("diagonal", [cartela[i][4 - i] for i in range(5)]))
+    for kind, numbers in lines:
+        if all(number in marked for number in numbers):
+            return kind
+    return ""
+
+
+def test_winners_match_brute_force():
+    rng = random.Random(1)
+    for _ in range(20):
+        game = BingoGame(rng=rng)
+        for user_id in range(40):
+            game.add_card(user_id)
+        cartelas = {user_id: card.cartela for user_id, card in game.cards.items()}
+
+        drawn = []
+        winners_so_far = set()
+        while True:
+            number = game.draw()
+            if number is None:
+                break
+            drawn.append(number)
+
+            expected = {}
+            for user_id, cartela in cartelas.items():
+                kind = brute_force_win_type(cartela, drawn)
+                if kind and user_id not in winners_so_far:
+                    expected[user_id] = kind
+            assert dict(game.last_winners) == expected
+            winners_so_far.update(expected)
+
+            for user_id, cartela in cartelas.items():
+                assert game.win_type(user_id) == brute_force_win_type(cartela, drawn)
+
+        assert sorted(drawn) == list(range(1, BINGO_MAX_NUMBER + 1))
+        assert game.drawn_numbers() == sorted(drawn)
+        assert winners_so_far == set(cartelas)
+
+
+def test_cards_are_unique_and_valid():
+    game = BingoGame(rng=random.Random(2))
+    cards = [game.add_card(user_id) for user_id in range(200)]
+    assert len({tuple(map(tuple, cartela)) for cartela in cards}) == 200
+    for cartela in cards:
+        assert cartela[2][2] == 0
+        for col, column in enumerate(cartela):
+            low, high = 15 * col + 1, 15 * col + 15
+            assert all(low <= number <= high for number in column if number)
+
+
+def test_pack_round_trip():
+    rng = random.Random(3)
+    for _ in range(100):
+        cartela = random_card(rng)
+        data = pack_card(cartela)
+        assert len(data) == 24
+        assert unpack_card(data) == cartela
+
+
+def test_reloaded_game_continues_where_it_stopped():
+    rng = random.Random(4)
+    game = BingoGame(rng=rng)
+    for user_id in range(30):
+        game.add_card(user_id)
+    drawn = [game.draw() for _ in range(40)]
+    won = {user_id for user_id, card in game.cards.items() if card.won}
+
+    # Recarregar como _load_bingo_game faz: ordem salva, sorteios e cartelas
+    reloaded = BingoGame(game.remaining_order(), drawn)
+    for user_id, card in game.cards.items():
+        reloaded.add_card(user_id, card.cartela)
+
+    assert {user_id for user_id, card in reloaded.cards.items() if card.won} == won
+    assert reloaded.remaining_order() == game.remaining_order()
+    while True:
+        expected = game.draw()
+        assert reloaded.draw() == expected
+        if expected is None:
+            break
+        assert sorted(reloaded.last_winners) == sorted(game.last_winners)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Testes do pool de conexões (db_pool.py) com conexões falsas, sem PostgreSQL
+
+import time
+import threading
+
+import pytest
+from psycopg2 import extensions
+
+import db_pool
+from db_pool import ConnectionPool, PoolExhaustedError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(sql)
+        if self.conn.broken:
+            raise db_pool.psycopg2.OperationalError("server closed the connection unexpectedly")
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Conexões criadas pelo pool, na ordem de criação."""
+    created = []
+
+    def connect(dsn):
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    monkeypatch.setattr(db_pool.psycopg2, "connect", connect)
+    return created
+
+
+def test_checkout_times_out_when_pool_is_full(connections):
+    pool = ConnectionPool("fake", minconn=0, maxconn=1)
+    pool.getconn()
+
+    started = time.monotonic()
+    with pytest.raises(PoolExhaustedError):
+        pool.getconn(timeout=0.2)
+
+    assert 0.15 <= time.monotonic() - started < 2
+    assert pool.stats()["timeouts"] == 1
+    assert len(connections) == 1
+
+
+def test_checkout_waits_for_returned_connection(connections):
+    pool = ConnectionPool("fake", minconn=0, maxconn=1)
+    conn = pool.getconn()
+    threading.Timer(0.1, pool.putconn, args=(conn,)).start()
+
+    assert pool.getconn(timeout=2) is conn
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["max_wait_seconds"] >= 0.05
+    assert len(connections) == 1
+
+
+def test_health_check_replaces_broken_connection(connections):
+    pool = ConnectionPool("fake", minconn=0, maxconn=2, health_check_interval=0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.broken = True
+
+    replacement = pool.getconn()
+
+    assert replacement is not conn
+    assert conn.closed
+    assert conn.executed == ["SELECT 1"]
+    assert pool.stats()["discarded_broken"] == 1
+
+
+def test_recently_returned_connection_skips_health_check(connections):
+    pool = ConnectionPool("fake", minconn=0, maxconn=2, health_check_interval=30)
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    assert pool.getconn() is conn
+    assert conn.executed == []
+
+
+def test_connection_context_discards_on_operational_error(connections):
+    pool = ConnectionPool("fake", minconn=0, maxconn=1)
+
+    with pytest.raises(db_pool.psycopg2.OperationalError):
+        with pool.connection() as conn:
+            raise db_pool.psycopg2.OperationalError("connection lost")
+
+    assert conn.closed
+    assert pool.stats()["in_use"] == 0
+    assert pool.getconn() is not conn
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Testes do KeywordEmojiMatcher (data/emoji_matcher.py) comparado ao laço ingênuo
+
+import random
+import string
+
+from data.emoji_matcher import KeywordEmojiMatcher
+from data.tmdb_api import KEYWORD_EMOJI_MAP
+
+
+def naive_match(mapping, text):
+    """O laço antigo: cada chave testada como substring do texto."""
+    text = text.lower()
+    return [index for index, key in enumerate(mapping) if key.lower() in text]
+
+
+def naive_candidates(mapping, text):
+    candidates = []
+    for index in naive_match(mapping, text):
+        emoji = list(mapping.values())[index]
+        if emoji not in candidates:
+            candidates.append(emoji)
+    return tuple(candidates)
+
+
+def test_matches_naive_loop_on_keyword_map():
+    matcher = KeywordEmojiMatcher(KEYWORD_EMOJI_MAP)
+    rng = random.Random(11)
+    keys = list(KEYWORD_EMOJI_MAP)
+    texts = [
+        "space station", "Time Travel", "dreamworld", "car chase", "spaceship crash",
+        "haunted castle", "wartime", "firearm", "SCHOOL shooting", "", "xyz",
+    ]
+    # Textos montados com pedaços das chaves, para forçar sobreposições
+    for _ in range(500):
+        parts = [rng.choice(keys)[:rng.randint(1, 8)] for _ in range(rng.randint(1, 4))]
+        texts.append(rng.choice(["", " ", "-"]).join(parts))
+
+    for text in texts:
+        assert matcher.match(text) == naive_match(KEYWORD_EMOJI_MAP, text), text
+        assert matcher.candidates(text) == naive_candidates(KEYWORD_EMOJI_MAP, text), text
+
+
+def test_matches_naive_loop_on_overlapping_keys():
+    mapping = {"he": "1", "she": "2", "his": "3", "hers": "4", "car": "5", "card": "6", "scar": "7", "a": "8"}
+    matcher = KeywordEmojiMatcher(mapping)
+    rng = random.Random(5)
+    for _ in range(2000):
+        text = "".join(rng.choice("acdehirs" + string.ascii_uppercase[:3]) for _ in range(rng.randint(0, 12)))
+        assert matcher.match(text) == naive_match(mapping, text), text
+
+
+def test_version_changes_with_mapping():
+    assert KeywordEmojiMatcher({"a": "1"}).version == KeywordEmojiMatcher({"a": "1"}).version
+    assert KeywordEmojiMatcher({"a": "1"}).version != KeywordEmojiMatcher({"a": "2"}).version
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Testes do heap de timers dos jogos (game_timers.py)
+
+import asyncio
+
+from game_timers import GameTimers
+
+BOT = object()
+
+
+def _run(scenario):
+    """Executar ``scenario(timers, fired)`` com uma instância nova já iniciada."""
+    async def main():
+        timers = GameTimers()
+        fired = []
+        timers.start(BOT)
+        try:
+            await scenario(timers, fired)
+        finally:
+            await timers.stop()
+        return timers, fired
+    return asyncio.run(main())
+
+
+def _recorder(fired):
+    async def callback(bot, **data):
+        assert bot is BOT
+        fired.append(data)
+    return callback
+
+
+def test_fires_in_due_order():
+    async def scenario(timers, fired):
+        callback = _recorder(fired)
+        timers.schedule("b", 0.06, callback, name="b")
+        timers.schedule("a", 0.02, callback, name="a")
+        timers.schedule("c", 0.10, callback, name="c")
+        await asyncio.sleep(0.2)
+
+    timers, fired = _run(scenario)
+    assert [data["name"] for data in fired] == ["a", "b", "c"]
+    assert timers.pending_count() == 0
+
+
+def test_cancel_prevents_firing():
+    async def scenario(timers, fired):
+        callback = _recorder(fired)
+        timers.schedule(("quiz_timeout", 1), 0.03, callback, chat_id=1)
+        timers.schedule(("quiz_timeout", 2), 0.03, callback, chat_id=2)
+        assert timers.cancel(("quiz_timeout", 1))
+        assert not timers.cancel(("quiz_timeout", 1))
+        await asyncio.sleep(0.1)
+
+    timers, fired = _run(scenario)
+    assert fired == [{"chat_id": 2}]
+
+
+def test_reschedule_replaces_timer_with_same_key():
+    async def scenario(timers, fired):
+        callback = _recorder(fired)
+        timers.schedule("draw", 0.02, callback, number=1)
+        timers.schedule("draw", 0.08, callback, number=2)
+        await asyncio.sleep(0.05)
+        assert fired == []
+        assert timers.pending("draw")
+        await asyncio.sleep(0.08)
+
+    timers, fired = _run(scenario)
+    assert fired == [{"number": 2}]
+
+
+def test_earlier_timer_wakes_sleeping_task():
+    async def scenario(timers, fired):
+        callback = _recorder(fired)
+        timers.schedule("late", 10, callback, name="late")
+        await asyncio.sleep(0.01)
+        timers.schedule("soon", 0.02, callback, name="soon")
+        await asyncio.sleep(0.1)
+
+    timers, fired = _run(scenario)
+    assert fired == [{"name": "soon"}]
+    assert timers.pending("late")
+
+
+def test_update_changes_pending_data():
+    async def scenario(timers, fired):
+        timers.schedule("timeout", 0.03, _recorder(fired), chat_id=1, message_id=None)
+        assert timers.update("timeout", message_id=99)
+        assert not timers.update("missing", message_id=1)
+        await asyncio.sleep(0.1)
+
+    _, fired = _run(scenario)
+    assert fired == [{"chat_id": 1, "message_id": 99}]
+
+
+def test_failing_callback_does_not_stop_other_timers():
+    async def failing(bot, **data):
+        raise RuntimeError("boom")
+
+    async def scenario(timers, fired):
+        timers.schedule("fail", 0.01, failing)
+        timers.schedule("ok", 0.03, _recorder(fired), name="ok")
+        await asyncio.sleep(0.1)
+
+    timers, fired = _run(scenario)
+    assert fired == [{"name": "ok"}]
+    assert timers.stats()["failures"] == 1
+
+
+def test_many_cancellations_compact_the_heap():
+    async def scenario(timers, fired):
+        callback = _recorder(fired)
+        for i in range(200):
+            timers.schedule(i, 60, callback, i=i)
+        for i in range(150):
+            timers.cancel(i)
+
+    timers, _ = _run(scenario)
+    assert timers.pending_count() == 50
+    assert timers.stats()["heap_size"] < 200
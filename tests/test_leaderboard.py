@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Testes do placar em memória (leaderboard.py) comparados a uma lista ordenada
+
+import random
+from bisect import bisect_left, insort
+
+import pytest
+
+import leaderboard
+from leaderboard import Leaderboard, RankedIndex
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # Blocos pequenos para exercitar divisão e remoção de blocos
+    monkeypatch.setattr(leaderboard, "_BLOCK_SIZE", 4)
+
+
+def test_ranked_index_matches_sorted_list():
+    rng = random.Random(7)
+    index = RankedIndex()
+    index.build(rng.sample(range(10000), 50))
+    reference = sorted(index.slice(0, 50))
+
+    for _ in range(3000):
+        if reference and rng.random() < 0.45:
+            key = rng.choice(reference)
+            index.remove(key)
+            reference.remove(key)
+        else:
+            key = rng.randrange(10000)
+            if key in reference:
+                continue
+            index.add(key)
+            insort(reference, key)
+
+        assert len(index) == len(reference)
+        if reference:
+            key = rng.choice(reference)
+            assert index.index(key) == bisect_left(reference, key)
+            start = rng.randrange(len(reference))
+            assert index.slice(start, start + 7) == reference[start:start + 7]
+
+    assert index.slice(0, len(reference) + 10) == reference
+
+
+def test_ranked_index_missing_key():
+    index = RankedIndex()
+    index.build([1, 3, 5])
+    with pytest.raises(KeyError):
+        index.index(4)
+    with pytest.raises(KeyError):
+        index.remove(4)
+
+
+def _rows(points_by_user):
+    return [
+        {"user_id": user_id, "username": f"u{user_id}", "first_name": f"User {user_id}",
+         "last_name": None, "points": points}
+        for user_id, points in points_by_user.items()
+    ]
+
+
+def test_rank_follows_score_changes():
+    board = Leaderboard()
+    board.load(_rows({1: 50, 2: 30, 3: 30, 4: 10}))
+
+    # Empate desempatado por user_id
+    assert [board.rank(user_id) for user_id in (1, 2, 3, 4)] == [1, 2, 3, 4]
+
+    board.set_points(4, 60)
+    assert board.rank(4) == 1
+    assert board.rank(1) == 2
+    assert [entry["user_id"] for entry in board.top(10)] == [4, 1, 2, 3]
+
+    board.set_points(1, 0)
+    assert board.rank(1) == 4
+
+    board.remove(2)
+    assert board.rank(2) is None
+    assert [entry["user_id"] for entry in board.top(10)] == [4, 3, 1]
+
+
+def test_around_returns_neighbours():
+    board = Leaderboard()
+    board.load(_rows({user_id: 1000 - user_id * 10 for user_id in range(1, 21)}))
+
+    around = board.around(10, radius=2)
+    assert around["rank"] == 10
+    assert around["points"] == 900
+    assert around["total"] == 20
+    assert [(entry["rank"], entry["user_id"]) for entry in around["neighbors"]] == [
+        (8, 8), (9, 9), (10, 10), (11, 11), (12, 12)
+    ]
+
+    # Depois de subir, os vizinhos mudam
+    board.set_points(10, 995)
+    around = board.around(10, radius=1)
+    assert around["rank"] == 1
+    assert [entry["user_id"] for entry in around["neighbors"]] == [10, 1]
+
+    assert board.around(99) is None
+
+
+def test_matches_brute_force_after_random_updates():
+    rng = random.Random(3)
+    points = {user_id: rng.randrange(100) for user_id in range(1, 200)}
+    board = Leaderboard()
+    board.load(_rows(points))
+
+    for _ in range(500):
+        user_id = rng.randrange(1, 250)
+        points[user_id] = rng.randrange(100)
+        board.set_points(user_id, points[user_id])
+
+    ordered = sorted(points, key=lambda user_id: (-points[user_id], user_id))
+    for user_id in rng.sample(list(points), 50):
+        assert board.rank(user_id) == ordered.index(user_id) + 1
+    assert [entry["user_id"] for entry in board.top(25)] == ordered[:25]
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Testes da fila de envio (outbound.py) com um bot falso
+
+import asyncio
+
+import pytest
+from telegram.error import RetryAfter
+
+import outbound as outbound_module
+from outbound import (
+    OutboundQueue, TokenBucket, PRIORITY_ANNOUNCEMENT, PRIORITY_DRAW, PRIORITY_RESULT
+)
+
+
+class FakeBot:
+    """Registra as chamadas como (instante, método, argumentos)."""
+
+    def __init__(self, retry_after=None):
+        self.calls = []
+        self.retry_after = list(retry_after or [])
+
+    def __getattr__(self, method):
+        async def call(**kwargs):
+            loop = asyncio.get_running_loop()
+            if self.retry_after:
+                raise RetryAfter(self.retry_after.pop(0))
+            self.calls.append((loop.time(), method, kwargs))
+            return {"method": method, **kwargs}
+        return call
+
+
+def _run(scenario, bot=None):
+    """Executar ``scenario(queue, bot)`` com uma fila nova já iniciada."""
+    bot = bot or FakeBot()
+
+    async def main():
+        queue = OutboundQueue()
+        queue.start(bot)
+        try:
+            return await scenario(queue, bot)
+        finally:
+            await queue.stop()
+    return asyncio.run(main()), bot
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=2, capacity=3, now=0.0)
+    for _ in range(3):
+        assert bucket.delay(0.0) == 0
+        bucket.take(0.0)
+    assert bucket.delay(0.0) == pytest.approx(0.5)
+    assert bucket.delay(0.5) == 0
+    bucket.take(0.5)
+    assert bucket.delay(0.5) == pytest.approx(0.5)
+    assert not bucket.full(0.5)
+    assert bucket.full(10.0)
+    # Não acumula além da capacidade
+    assert bucket.tokens == 3
+
+
+def test_group_burst_then_group_rate(monkeypatch):
+    monkeypatch.setattr(outbound_module, "TELEGRAM_GROUP_PER_MINUTE", 600)  # 10 por segundo
+
+    async def scenario(queue, bot):
+        await asyncio.gather(*[queue.send_message(-100, f"m{i}", priority=PRIORITY_DRAW) for i in range(5)])
+
+    _, bot = _run(scenario)
+    times = [when for when, _, _ in bot.calls]
+    assert [kwargs["text"] for _, _, kwargs in bot.calls] == [f"m{i}" for i in range(5)]
+    # As 3 primeiras (rajada) saem juntas; as seguintes, uma a cada 0,1 s
+    assert times[2] - times[0] < 0.05
+    assert times[3] - times[0] == pytest.approx(0.1, abs=0.05)
+    assert times[4] - times[3] == pytest.approx(0.1, abs=0.05)
+
+
+def test_priorities_within_a_chat(monkeypatch):
+    monkeypatch.setattr(outbound_module, "TELEGRAM_CHAT_PER_SECOND", 50)
+
+    async def scenario(queue, bot):
+        futures = [
+            queue.send_message(1, "anúncio", priority=PRIORITY_ANNOUNCEMENT),
+            queue.send_message(1, "sorteio", priority=PRIORITY_DRAW),
+            queue.send_message(1, "resultado", priority=PRIORITY_RESULT),
+        ]
+        await asyncio.gather(*futures)
+
+    _, bot = _run(scenario)
+    assert [kwargs["text"] for _, _, kwargs in bot.calls] == ["resultado", "sorteio", "anúncio"]
+
+
+def test_pending_edits_are_coalesced():
+    async def scenario(queue, bot):
+        futures = [queue.edit_message_text(-100, 7, f"placar {i}") for i in range(5)]
+        other = queue.edit_message_text(-100, 8, "outra mensagem")
+        return await asyncio.gather(*futures), await other
+
+    (results, other), bot = _run(scenario)
+    edits = [(kwargs["message_id"], kwargs["text"]) for _, method, kwargs in bot.calls if method == "edit_message_text"]
+    assert edits == [(7, "placar 4"), (8, "outra mensagem")]
+    # Todos os pedidos recebem o resultado da edição que foi enviada
+    assert all(result["text"] == "placar 4" for result in results)
+    assert other["text"] == "outra mensagem"
+
+
+def test_retry_after_pauses_chat_and_resends():
+    async def scenario(queue, bot):
+        started = asyncio.get_running_loop().time()
+        result = await queue.send_message(-100, "vencedor", priority=PRIORITY_RESULT)
+        return started, result
+
+    (started, result), bot = _run(scenario, FakeBot(retry_after=[1]))
+    assert result["text"] == "vencedor"
+    assert len(bot.calls) == 1
+    assert bot.calls[0][0] - started >= 0.95
+
+
+def test_send_failure_reaches_the_caller():
+    class BrokenBot:
+        async def send_message(self, **kwargs):
+            raise RuntimeError("Forbidden: bot was blocked by the user")
+
+    async def scenario(queue, bot):
+        with pytest.raises(RuntimeError):
+            await queue.send_message(5, "olá")
+        return queue.stats()
+
+    stats, _ = _run(scenario, BrokenBot())
+    assert stats["failed"] == 1
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Testes do cliente do TMDb contra o servidor falso de benchmarks/fake_tmdb_server.py
+
+import time
+import asyncio
+
+import pytest
+
+import data.tmdb_client as tmdb_client_module
+from data.tmdb_client import TMDbClient, TMDbError
+from benchmarks.fake_tmdb_server import start_fake_tmdb_server
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(tmdb_client_module, "TMDB_BACKOFF_BASE", 0.01)
+
+
+@pytest.fixture
+def fake_tmdb():
+    """Inicia servidores falsos com o roteiro dado e os encerra ao fim do teste."""
+    servers = []
+
+    def start(script=None):
+        server, base_url = start_fake_tmdb_server(script=script)
+        servers.append(server)
+        return server.RequestHandlerClass, base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _run(client: TMDbClient, coro_factory):
+    async def main():
+        try:
+            return await coro_factory(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+def test_popular_movies(fake_tmdb):
+    handler, base_url = fake_tmdb()
+    client = TMDbClient(api_key="fake", base_url=base_url)
+
+    data = _run(client, lambda c: c.popular_movies(1))
+
+    assert data["page"] == 1
+    assert data["results"]
+    assert handler.paths == ["/movie/popular"]
+    assert client.stats() == {"requests": 1, "retries": 0, "failures": 0}
+
+
+def test_retries_server_errors(fake_tmdb):
+    handler, base_url = fake_tmdb([{"status": 503}, {"status": 502}])
+    client = TMDbClient(api_key="fake", base_url=base_url)
+
+    data = _run(client, lambda c: c.genres())
+
+    assert data["genres"]
+    assert len(handler.paths) == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_rate_limit_waits_for_retry_after(fake_tmdb):
+    handler, base_url = fake_tmdb([{"status": 429, "retry_after": "1"}])
+    client = TMDbClient(api_key="fake", base_url=base_url)
+
+    started = time.monotonic()
+    data = _run(client, lambda c: c.popular_movies(1))
+
+    assert data["results"]
+    assert time.monotonic() - started >= 0.9
+    assert len(handler.paths) == 2
+
+
+def test_timeout_is_retried(fake_tmdb):
+    handler, base_url = fake_tmdb([{"delay": 1.0}])
+    client = TMDbClient(api_key="fake", base_url=base_url, timeout=0.2)
+
+    started = time.monotonic()
+    data = _run(client, lambda c: c.popular_movies(1))
+
+    assert data["results"]
+    assert time.monotonic() - started < 1.0
+    assert client.stats()["retries"] == 1
+
+
+def test_gives_up_after_retry_budget(fake_tmdb):
+    handler, base_url = fake_tmdb([{"status": 503}] * 5)
+    client = TMDbClient(api_key="fake", base_url=base_url, max_retries=2)
+
+    with pytest.raises(TMDbError):
+        _run(client, lambda c: c.popular_movies(1))
+
+    assert len(handler.paths) == 3
+    assert client.stats() == {"requests": 3, "retries": 2, "failures": 1}
+
+
+def test_client_errors_are_not_retried(fake_tmdb):
+    handler, base_url = fake_tmdb()
+    client = TMDbClient(api_key="fake", base_url=base_url)
+
+    with pytest.raises(TMDbError):
+        _run(client, lambda c: c.movie_details(999999999))
+
+    assert handler.paths == ["/movie/999999999"]
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Testes do cache em memória (utils/ttl_cache.py)
+
+import time
+import asyncio
+import threading
+
+import pytest
+
+from utils.ttl_cache import TTLCache
+
+
+def test_concurrent_async_loads_run_once():
+    cache = TTLCache("test")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_load("key", loader) for _ in range(10)])
+
+    results = asyncio.run(main())
+
+    assert results == [{"value": 42}] * 10
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["loads"] == 1
+    assert stats["coalesced"] == 9
+    assert cache.get("key") == {"value": 42}
+
+
+def test_concurrent_sync_loads_run_once():
+    cache = TTLCache("test")
+    calls = []
+    results = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load_sync("key", loader)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_waiters_survive_cancelled_loader():
+    cache = TTLCache("test")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        first = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_load("key", loader)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == ["value"] * 3
+    # O carregamento cancelado e um único recarregamento pelos que esperavam
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_is_cancelled():
+    cache = TTLCache("test")
+
+    async def loader():
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        loading = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await loading
+
+    assert asyncio.run(main()) == "value"
+
+
+def test_loader_error_reaches_waiters_and_is_not_cached():
+    cache = TTLCache("test")
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("TMDb fora do ar")
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_load("key", loader) for _ in range(3)],
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.get("key") is None
+
+
+def test_evicts_least_recently_used_and_expired_entries():
+    cache = TTLCache("test", max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    cache.set("d", 4, ttl=-1)
+    assert cache.get("d") is None
+    assert cache.stats()["expirations"] == 1
@@ -6,6 +6,7 @@ import random
 from datetime import datetime, timedelta
 from telegram import Update
 from telegram.ext import ContextTypes
+from outbound import outbound, PRIORITY_ANNOUNCEMENT
 
 def get_random_greeting():
     """Return a random greeting message."""
@@ -73,9 +74,10 @@ async def send_next_game_notification(context: ContextTypes.DEFAULT_TYPE, chat_i
         f"Use /{game_type.split('_')[0]} para participar quando o jogo começar."
     )
     
-    await context.bot.send_message(
+    outbound.send_message(
         chat_id=chat_id,
         text=message,
+        priority=PRIORITY_ANNOUNCEMENT,
         parse_mode="Markdown"
     )
 
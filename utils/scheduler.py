@@ -1,228 +1,369 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+#
+# Os jogos automáticos de cada chat ficam na tabela game_schedules (frequência,
+# aviso e horário do próximo jogo). Um chat é agendado quando o bot entra
+# nele e removido quando o bot sai, e sync_game_schedules agenda também os
+# grupos da lista de permitidos (e remove os que saíram dela). Na
+# inicialização setup_game_scheduler lê todos os agendamentos em uma consulta
+# e recria os jobs, e restore_game_jobs recria os timeouts dos jogos que
+# estavam em andamento, para que nenhum jogo fique ativo para sempre depois de
+# reiniciar o bot.
+#
+# Para não iniciar os jogos de todos os grupos no mesmo instante (e estourar o
+# limite global de envios do Telegram), cada chat tem uma fase fixa dentro do
+# intervalo, derivada do seu id, e os inícios passam por um limite global de
+# jogos por segundo. A frequência de cada chat se adapta à participação: chats
+# onde ninguém joga recebem jogos com menos frequência (até
+# GAME_FREQUENCY_MAX_FACTOR vezes o intervalo configurado) e voltam ao normal
+# quando as pessoas voltam a jogar.
 
+import os
+import math
+import time
+import zlib
+import asyncio
 import logging
 import random
 from datetime import datetime, timedelta
 from telegram.ext import ContextTypes
+import database
+from async_database import (
+    save_game_schedule, update_game_schedule_run, delete_game_schedule,
+    update_game_schedules_frequency, load_game_schedules, get_allowed_chats
+)
 from config import SETTINGS
+from game_state import game_store
+from game_timers import game_timers
+from participation import participation
+from game_service import GameStartError, game_service, start_game
+from outbound import outbound, PRIORITY_ANNOUNCEMENT
 from utils.helpers import send_next_game_notification
-from handlers.movie_game import start_movie_game
-from handlers.quiz_game import start_quiz_game
-from handlers.emoji_pattern import start_emoji_pattern_game
-from handlers.charades_game import start_charades_game
+from handlers.movie_game import movie_game_timeout
+from handlers.quiz_game import quiz_timeout
+from handlers.emoji_pattern import emoji_pattern_timeout
+from handlers.charades_game import charades_timeout
+from handlers.bingo_game import (
+    end_bingo_registration, draw_bingo_number,
+    BINGO_STATE_REGISTRATION, BINGO_STATE_PLAYING, BINGO_WAITING_SECONDS
+)
 
 logger = logging.getLogger(__name__)
 
-async def scheduled_movie_game(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Start a scheduled movie game."""
-    chat_id = context.job.data.get("chat_id")
-    
-    # Create a fake update to start the game
-    class FakeUpdate:
-        def __init__(self, chat_id):
-            self.effective_chat = type('obj', (object,), {'id': chat_id})
-            self.effective_user = type('obj', (object,), {
-                'id': 0, 
-                'username': 'scheduler',
-                'first_name': 'Auto',
-                'last_name': 'Scheduler'
-            })
-            self.message = type('obj', (object,), {'reply_text': None})
-        
-        async def reply_text(self, *args, **kwargs):
-            await context.bot.send_message(chat_id=self.effective_chat.id, *args, **kwargs)
+# Intervalo da conferência entre os agendamentos e a lista de grupos permitidos
+GAME_SCHEDULE_SYNC_SECONDS = 10 * 60
+
+# Antecedência mínima do primeiro jogo de um chat recém-agendado (e de
+# agendamentos que venceram com o bot desligado)
+FIRST_GAME_DELAY = timedelta(minutes=3)
+
+# Distribuir os chats ao longo do intervalo (fase por chat)
+GAME_SCHEDULE_STAGGER = os.environ.get("GAME_SCHEDULE_STAGGER", "true").lower() in ("1", "true", "yes")
+# Máximo de jogos automáticos iniciados por segundo, somando todos os chats
+GAME_STARTS_PER_SECOND = float(os.environ.get("GAME_STARTS_PER_SECOND", "2"))
+# Ajustar a frequência de cada chat pela participação
+GAME_ADAPTIVE_FREQUENCY = os.environ.get("GAME_ADAPTIVE_FREQUENCY", "true").lower() in ("1", "true", "yes")
+# Maior multiplicador do intervalo para chats sem participação
+GAME_FREQUENCY_MAX_FACTOR = float(os.environ.get("GAME_FREQUENCY_MAX_FACTOR", "4"))
+
+# Média móvel de jogadores por jogo: abaixo de LOW o intervalo dobra, a partir
+# de HIGH ele volta pela metade (até o configurado)
+PARTICIPATION_LOW = 1.0
+PARTICIPATION_HIGH = 3.0
+PARTICIPATION_ALPHA = 0.5
+
+# Timer de encerramento de cada tipo de jogo: (função, nome do timer sem o chat_id)
+GAME_TIMEOUTS = {
+    "movie": (movie_game_timeout, "movie_timeout"),
+    "quiz": (quiz_timeout, "quiz_timeout"),
+    "emoji_pattern": (emoji_pattern_timeout, "emoji_timeout"),
+    "charades": (charades_timeout, "charades_timeout"),
+}
+
+# Anúncio enviado antes de cada jogo automático, e o nome usado no aviso do sorteio
+SCHEDULED_GAMES = {
+    "movie": ("filme", "🎬 *Hora do jogo programado: Adivinhe o Filme!* 🎬\n\nPrepare-se para testar seus conhecimentos de cinema! 🍿"),
+    "quiz": ("quiz", "🧠 *Hora do jogo programado: Quiz de Conhecimentos!* 🧠\n\nVamos testar seus conhecimentos gerais! 📚"),
+    "emoji_pattern": ("emoji", "🔍 *Hora do jogo programado: Sequência de Emoji!* 🔍\n\nDescubra o padrão e complete a sequência! 🧩"),
+}
+
+class GameStartLimiter:
+    """Limite global de jogos automáticos iniciados por segundo (fila por ordem de chegada)."""
+
+    def __init__(self, rate: float = GAME_STARTS_PER_SECOND):
+        self.rate = rate
+        self._next_free = 0.0
+        self.waits = 0
+        self.max_wait = 0.0
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_free)
+        self._next_free = slot + 1 / self.rate
+        wait = slot - now
+        if wait > 0:
+            self.waits += 1
+            self.max_wait = max(self.max_wait, wait)
+            await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        return {"rate": self.rate, "waits": self.waits, "max_wait": round(self.max_wait, 3)}
+
+game_start_limiter = GameStartLimiter()
+
+def _chat_phase(chat_id, interval: timedelta) -> float:
+    """Deslocamento fixo do chat dentro do intervalo, em segundos."""
+    return zlib.crc32(str(chat_id).encode()) % max(int(interval.total_seconds()), 1)
+
+def _next_slot(chat_id, interval: timedelta, after: datetime) -> datetime:
+    """Primeiro horário do chat a partir de ``after``."""
+    if not GAME_SCHEDULE_STAGGER:
+        return after
+    seconds = interval.total_seconds()
+    phase = _chat_phase(chat_id, interval)
+    cycles = math.ceil((after.timestamp() - phase) / seconds)
+    return datetime.fromtimestamp(phase + cycles * seconds)
+
+def _adapt_factor(factor: float, average_players: float) -> float:
+    """Novo multiplicador do intervalo a partir da média de jogadores."""
+    if average_players < PARTICIPATION_LOW:
+        return min(factor * 2, GAME_FREQUENCY_MAX_FACTOR)
+    if average_players >= PARTICIPATION_HIGH:
+        return max(factor / 2, 1.0)
+    return factor
+
+def setup_game_scheduler(application):
+    """Recriar os jobs de todos os chats agendados (uma única consulta) e agendar a conferência periódica."""
+    # Ainda antes do event loop começar: a consulta pode ser síncrona
+    try:
+        schedules = database.load_game_schedules()
+    except Exception as e:
+        logger.error(f"Erro ao carregar os agendamentos de jogos: {e}")
+        schedules = []
     
-    fake_update = FakeUpdate(chat_id)
-    fake_update.message.reply_text = lambda *args, **kwargs: context.bot.send_message(chat_id=chat_id, *args, **kwargs)
+    _register_schedules(application, schedules)
     
-    # Announce the game
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text="🎬 *Hora do jogo programado: Adivinhe o Filme!* 🎬\n\nPrepare-se para testar seus conhecimentos de cinema! 🍿",
-        parse_mode="Markdown"
+    application.job_queue.run_repeating(
+        sync_game_schedules,
+        interval=GAME_SCHEDULE_SYNC_SECONDS,
+        first=30,
+        name="sync_game_schedules"
     )
+
+def _register_schedules(application, schedules):
+    for schedule in schedules:
+        _register_chat_jobs(
+            application.job_queue,
+            schedule["chat_id"],
+            schedule["frequency_minutes"],
+            schedule["notification_minutes"],
+            schedule["next_run_at"],
+            schedule["interval_factor"],
+            schedule["participation"]
+        )
     
-    # Start the movie game
-    await start_movie_game(fake_update, context)
-
-async def scheduled_quiz_game(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Start a scheduled quiz game."""
-    chat_id = context.job.data.get("chat_id")
-    
-    # Create a fake update to start the game
-    class FakeUpdate:
-        def __init__(self, chat_id):
-            self.effective_chat = type('obj', (object,), {'id': chat_id})
-            self.effective_user = type('obj', (object,), {
-                'id': 0, 
-                'username': 'scheduler',
-                'first_name': 'Auto',
-                'last_name': 'Scheduler'
-            })
-            self.message = type('obj', (object,), {'reply_text': None})
-        
-        async def reply_text(self, *args, **kwargs):
-            await context.bot.send_message(chat_id=self.effective_chat.id, *args, **kwargs)
-    
-    fake_update = FakeUpdate(chat_id)
-    fake_update.message.reply_text = lambda *args, **kwargs: context.bot.send_message(chat_id=chat_id, *args, **kwargs)
-    
-    # Announce the game
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text="🧠 *Hora do jogo programado: Quiz de Conhecimentos!* 🧠\n\nVamos testar seus conhecimentos gerais! 📚",
-        parse_mode="Markdown"
-    )
+    logger.info(f"Agendamento de jogos recriado para {len(schedules)} chats")
+
+def restore_game_jobs(application) -> int:
+    """Recriar os timeouts e sorteios dos jogos recarregados pelo game_store."""
+    restored = 0
     
-    # Start the quiz game
-    await start_quiz_game(fake_update, context)
-
-async def scheduled_emoji_pattern_game(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Start a scheduled emoji pattern game."""
-    chat_id = context.job.data.get("chat_id")
-    
-    # Create a fake update to start the game
-    class FakeUpdate:
-        def __init__(self, chat_id):
-            self.effective_chat = type('obj', (object,), {'id': chat_id})
-            self.effective_user = type('obj', (object,), {
-                'id': 0, 
-                'username': 'scheduler',
-                'first_name': 'Auto',
-                'last_name': 'Scheduler'
-            })
-            self.message = type('obj', (object,), {'reply_text': None})
+    for game in game_store.active_games():
+        chat_id = game.chat_id
         
-        async def reply_text(self, *args, **kwargs):
-            await context.bot.send_message(chat_id=self.effective_chat.id, *args, **kwargs)
+        if game.game_type in GAME_TIMEOUTS:
+            callback, timer_name = GAME_TIMEOUTS[game.game_type]
+            # As esperas para tentar de novo duram poucos segundos e já passaram
+            game.data.pop("incorrect_users", None)
+            game_timers.schedule(
+                (timer_name, chat_id), max(game.remaining_seconds(), 1), callback,
+                chat_id=chat_id, message_id=game.data.get("message_id")
+            )
+        elif game.game_type == "bingo" and game.data.get("state") == BINGO_STATE_REGISTRATION:
+            game_timers.schedule(
+                ("bingo_reg_end", chat_id), max(game.data["registration_end_time"] - time.time(), 1),
+                end_bingo_registration, chat_id=chat_id
+            )
+        elif game.game_type == "bingo" and game.data.get("state") == BINGO_STATE_PLAYING:
+            game_timers.schedule(("bingo_draw", chat_id), BINGO_WAITING_SECONDS, draw_bingo_number, chat_id=chat_id)
+        else:
+            # Nada mais encerraria este jogo
+            logger.warning(f"Encerrando jogo {game.game_type} sem timer no chat {chat_id}")
+            game_store.end(chat_id, game.game_type)
+            continue
+        restored += 1
     
-    fake_update = FakeUpdate(chat_id)
-    fake_update.message.reply_text = lambda *args, **kwargs: context.bot.send_message(chat_id=chat_id, *args, **kwargs)
+    logger.info(f"{restored} timers de jogos em andamento recriados")
+    return restored
+
+async def choose_random_game(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Escolhe e inicia um jogo aleatório."""
+    data = context.job.data
+    chat_id = data.get("chat_id")
+    factor = data["factor"]
     
-    # Announce the game
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text="🔍 *Hora do jogo programado: Sequência de Emoji!* 🔍\n\nDescubra o padrão e complete a sequência! 🧩",
-        parse_mode="Markdown"
-    )
+    # Média de jogadores por jogo (os que jogaram desde o jogo anterior)
+    average_players = data["participation"]
+    if average_players is None:
+        average_players = (PARTICIPATION_LOW + PARTICIPATION_HIGH) / 2
+    average_players += PARTICIPATION_ALPHA * (participation.take(chat_id) - average_players)
     
-    # Start the emoji pattern game
-    await start_emoji_pattern_game(fake_update, context)
-
-async def scheduled_charades_game(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Start a scheduled charades game."""
-    chat_id = context.job.data.get("chat_id")
-    
-    # Create a fake update to start the game
-    class FakeUpdate:
-        def __init__(self, chat_id):
-            self.effective_chat = type('obj', (object,), {'id': chat_id})
-            self.effective_user = type('obj', (object,), {
-                'id': 0, 
-                'username': 'scheduler',
-                'first_name': 'Auto',
-                'last_name': 'Scheduler'
-            })
-            self.message = type('obj', (object,), {'reply_text': None})
-        
-        async def reply_text(self, *args, **kwargs):
-            await context.bot.send_message(chat_id=self.effective_chat.id, *args, **kwargs)
+    next_run_at = datetime.now() + timedelta(minutes=data["frequency"] * factor)
+    new_factor = _adapt_factor(factor, average_players) if GAME_ADAPTIVE_FREQUENCY else factor
+    if new_factor != factor:
+        # Recriar os jobs com o novo intervalo, em média um intervalo depois deste jogo
+        interval = timedelta(minutes=data["frequency"] * new_factor)
+        next_run_at = _register_chat_jobs(
+            context.job_queue, chat_id, data["frequency"], data["notification_minutes"],
+            _next_slot(chat_id, interval, datetime.now() + interval / 2), new_factor, average_players
+        )
+        logger.info(f"Intervalo dos jogos do chat {chat_id}: x{new_factor:g} (média de {average_players:.1f} jogadores)")
+    else:
+        data["participation"] = average_players
     
-    fake_update = FakeUpdate(chat_id)
-    fake_update.message.reply_text = lambda *args, **kwargs: context.bot.send_message(chat_id=chat_id, *args, **kwargs)
+    # Gravar o horário do próximo jogo, para manter a fase depois de reiniciar
+    try:
+        await update_game_schedule_run(chat_id, next_run_at, new_factor, average_players)
+    except Exception as e:
+        logger.error(f"Erro ao gravar o próximo jogo do chat {chat_id}: {e}")
     
-    # Announce the game
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text="🎭 *Hora do jogo programado: Mímica!* 🎭\n\nPrepare-se para usar suas habilidades de atuação! 🎬",
-        parse_mode="Markdown"
-    )
+    # Respeitar o limite global de inícios por segundo
+    await game_start_limiter.acquire()
     
-    # Start the charades game
-    await start_charades_game(fake_update, context)
-
-def setup_game_scheduler(application):
-    """Setup scheduled games."""
-    # This is just a placeholder. The actual scheduling will happen when
-    # chats are added to the scheduler via admin commands or first interactions.
-    logger.info("Game scheduler initialized - ready to add scheduled games")
+    # Escolher aleatoriamente um dos jogos que não precisam de alguém para iniciá-los
+    games = [game_type for game_type in game_service.automatic_games() if game_type in SCHEDULED_GAMES]
+    game_type = random.choice(games)
+    game_name, announcement = SCHEDULED_GAMES[game_type]
     
-    # We can initialize default chat IDs here in the future if needed
-
-import random
-
-async def choose_random_game(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Escolhe e inicia um jogo aleatório."""
-    chat_id = context.job.data.get("chat_id")
-    
-    # Lista de funções de jogo disponíveis
-    games = [
-        (scheduled_movie_game, "filme"),
-        (scheduled_quiz_game, "quiz"),
-        (scheduled_emoji_pattern_game, "emoji"),
-        (scheduled_charades_game, "mímica")
-    ]
-    
-    # Escolher um jogo aleatoriamente
-    game_function, game_type = random.choice(games)
-    
-    # Anunciar o próximo jogo
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text=f"🎮 *Hora do jogo aleatório!* 🎮\n\nPreparando um jogo de {game_type} para vocês...",
-        parse_mode="Markdown"
-    )
+    # Anunciar o próximo jogo (aguardando a entrega dos dois anúncios, para
+    # que saiam antes da mensagem do jogo, que tem prioridade maior)
+    try:
+        await asyncio.gather(
+            outbound.send_message(
+                chat_id=chat_id,
+                text=f"🎮 *Hora do jogo aleatório!* 🎮\n\nPreparando um jogo de {game_name} para vocês...",
+                priority=PRIORITY_ANNOUNCEMENT,
+                parse_mode="Markdown"
+            ),
+            outbound.send_message(chat_id, announcement, priority=PRIORITY_ANNOUNCEMENT, parse_mode="Markdown")
+        )
+    except Exception as e:
+        logger.error(f"Erro ao anunciar o jogo automático no chat {chat_id}: {e}")
     
-    # Executar o jogo escolhido
-    await game_function(context)
+    # Iniciar o jogo escolhido
+    try:
+        await start_game(chat_id, game_type)
+    except GameStartError as e:
+        logger.info(f"Jogo automático de {game_name} não iniciado no chat {chat_id}: {e}")
 
-def schedule_games_for_chat(application, chat_id):
-    """Schedule regular games for a specific chat using a randomized approach."""
-    job_queue = application.job_queue
+def _remove_chat_jobs(job_queue, chat_id):
+    for job_name in (f"random_game_{chat_id}", f"game_notification_{chat_id}"):
+        for job in job_queue.get_jobs_by_name(job_name):
+            job.schedule_removal()
+
+def _register_chat_jobs(job_queue, chat_id, frequency, notification_minutes, next_run_at=None,
+                        factor=1.0, average_players=None):
+    """Criar os jobs do jogo aleatório (e do aviso) de um chat."""
+    _remove_chat_jobs(job_queue, chat_id)
     
-    # Game frequency in minutes
-    frequency = SETTINGS["game_frequency_minutes"]
+    interval = timedelta(minutes=frequency * factor)
+    now = datetime.now()
+    if next_run_at is None or next_run_at <= now:
+        # Novo agendamento, ou o horário passou com o bot desligado
+        next_run_at = _next_slot(chat_id, interval, now + FIRST_GAME_DELAY)
     
-    # Agendar o jogo aleatório para executar a cada 'frequency' minutos
+    # Agendar o jogo aleatório para executar a cada 'frequency' minutos (vezes o fator)
     job_queue.run_repeating(
         choose_random_game,
-        interval=timedelta(minutes=frequency),
-        first=datetime.now() + timedelta(minutes=3),  # Começar em 3 minutos
-        data={"chat_id": chat_id},
+        interval=interval,
+        first=next_run_at,
+        data={
+            "chat_id": chat_id,
+            "frequency": frequency,
+            "notification_minutes": notification_minutes,
+            "factor": factor,
+            "participation": average_players
+        },
         name=f"random_game_{chat_id}"
     )
     
-    # Schedule notifications before each game (opcional, pode ser removido se preferir surpresa total)
-    notification_minutes = SETTINGS["notification_minutes_before"]
-    
     # Notification for random game (optional)
     if notification_minutes > 0:
+        notify_at = next_run_at - timedelta(minutes=notification_minutes)
+        if notify_at <= now:
+            notify_at += interval
         job_queue.run_repeating(
             lambda ctx: send_next_game_notification(ctx, chat_id, notification_minutes, "aleatório"),
-            interval=timedelta(minutes=frequency),
-            first=datetime.now() + timedelta(minutes=3 - notification_minutes),
+            interval=interval,
+            first=notify_at,
             name=f"game_notification_{chat_id}"
         )
     
+    return next_run_at
+
+async def schedule_games_for_chat(application, chat_id):
+    """Schedule regular games for a specific chat using a randomized approach."""
+    # Game frequency in minutes
+    frequency = SETTINGS["game_frequency_minutes"]
+    
+    # Schedule notifications before each game (opcional, pode ser removido se preferir surpresa total)
+    notification_minutes = SETTINGS["notification_minutes_before"]
+    
+    # Primeiro jogo na fase do chat, a partir de 3 minutos
+    next_run_at = _register_chat_jobs(application.job_queue, chat_id, frequency, notification_minutes)
+    
+    # Persistir, para que o agendamento sobreviva a reinicializações
+    await save_game_schedule(chat_id, frequency, notification_minutes, next_run_at)
+    
     logger.info(f"Agendamento de jogos aleatórios configurado para o chat {chat_id}")
 
-def reschedule_games(application):
+async def unschedule_games_for_chat(application, chat_id):
+    """Remover os jogos automáticos de um chat."""
+    _remove_chat_jobs(application.job_queue, chat_id)
+    await delete_game_schedule(chat_id)
+    logger.info(f"Agendamento de jogos aleatórios removido do chat {chat_id}")
+
+def _scheduled_chats(job_queue) -> set:
+    """Chats com o job do jogo aleatório ativo."""
+    return {
+        job.data["chat_id"] for job in job_queue.jobs()
+        if job.name and job.name.startswith("random_game_") and not job.removed
+    }
+
+async def sync_game_schedules(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Agendar os grupos permitidos que ainda não têm jogos e remover os que deixaram de ser permitidos."""
+    try:
+        allowed_chats = await get_allowed_chats()
+    except Exception as e:
+        logger.error(f"Erro ao ler os grupos permitidos: {e}")
+        return
+    
+    # Lista vazia: todos os grupos são permitidos e o agendamento segue a entrada/saída do bot
+    if not allowed_chats:
+        return
+    
+    scheduled = _scheduled_chats(context.job_queue)
+    allowed = {int(chat_id) for chat_id in allowed_chats if chat_id.lstrip("-").isdigit()}
+    try:
+        for chat_id in allowed - scheduled:
+            await schedule_games_for_chat(context.application, chat_id)
+        for chat_id in scheduled - allowed:
+            await unschedule_games_for_chat(context.application, chat_id)
+    except Exception as e:
+        logger.error(f"Erro ao sincronizar os agendamentos de jogos: {e}")
+
+async def reschedule_games(application):
     """Reschedule all games based on new settings."""
-    job_queue = application.job_queue
-    
-    # Remove all existing game jobs
-    for job in job_queue.jobs():
-        if job.name and (
-            job.name.startswith("movie_") or 
-            job.name.startswith("quiz_") or 
-            job.name.startswith("emoji_") or
-            job.name.startswith("charades_")
-        ):
-            job.schedule_removal()
+    # Aplicar a nova frequência a todos os chats agendados e recriar os jobs
+    try:
+        await update_game_schedules_frequency(
+            SETTINGS["game_frequency_minutes"], SETTINGS["notification_minutes_before"]
+        )
+        schedules = await load_game_schedules()
+    except Exception as e:
+        logger.error(f"Erro ao atualizar os agendamentos de jogos: {e}")
+        return
     
-    # We would need to get all active chats from a database
-    # For now, let's assume we reschedule for specific chats
-    # This will be expanded in a full implementation
+    _register_schedules(application, schedules)
     
     logger.info("All scheduled games have been reset")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Arquivo: utils/ttl_cache.py - Cache LRU em memória com validade e limite de bytes
+
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Tamanho aproximado de um valor serializável em JSON, em bytes."""
+    try:
+        return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class TTLCache:
+    """Cache LRU seguro para threads, limitado por entradas e por bytes.
+
+    ``get_or_load`` (corrotinas) e ``get_or_load_sync`` (threads) garantem que
+    chamadas simultâneas para a mesma chave ausente executem o carregamento
+    uma única vez: as demais esperam o resultado (proteção contra stampede).
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024,
+                 ttl: float = 900, sizer: Callable[[Any], int] = estimate_size):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizer = sizer
+        # chave -> (valor, tamanho, instante de expiração)
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight_async: Dict[Any, asyncio.Future] = {}
+        self._inflight_sync: Dict[Any, threading.Event] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    _MISSING = object()
+
+    def _lookup(self, key) -> Any:
+        """Buscar uma chave, com o lock adquirido."""
+        item = self._data.get(key)
+        if item is None:
+            return self._MISSING
+        value, size, expires_at = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._bytes -= size
+            self._stats["expirations"] += 1
+            return self._MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+            if value is self._MISSING:
+                self._stats["misses"] += 1
+                return default
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        size = self.sizer(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def delete(self, key) -> None:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is not None:
+                self._bytes -= item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    async def get_or_load(self, key, loader: Callable[[], Awaitable[Any]],
+                          cache_if: Callable[[Any], bool] = bool) -> Any:
+        """Obter do cache ou carregar com ``loader`` (uma vez por chave, mesmo em paralelo)."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not self._MISSING:
+                self._stats["hits"] += 1
+                return value
+            self._stats["misses"] += 1
+            future = self._inflight_async.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+
+        if future is not None:
+            # asyncio.wait não propaga o cancelamento do carregador, só o de quem espera
+            await asyncio.wait([future])
+            if future.cancelled():
+                # Quem carregava foi cancelado (esta chamada não): assumir o carregamento
+                return await self.get_or_load(key, loader, cache_if)
+            return future.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_async[key] = future
+        try:
+            self._stats["loads"] += 1
+            value = await loader()
+            if cache_if(value):
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evitar o aviso de exceção não consumida quando ninguém esperava
+            future.exception()
+            raise
+        finally:
+            self._inflight_async.pop(key, None)
+
+    def get_or_load_sync(self, key, loader: Callable[[], Any],
+                         cache_if: Callable[[Any], bool] = bool) -> Any:
+        """Versão para threads de ``get_or_load``."""
+        while True:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not self._MISSING:
+                    self._stats["hits"] += 1
+                    return value
+                event = self._inflight_sync.get(key)
+                if event is None:
+                    self._stats["misses"] += 1
+                    self._stats["loads"] += 1
+                    event = self._inflight_sync[key] = threading.Event()
+                    break
+                self._stats["coalesced"] += 1
+            # Outra thread está carregando: esperar e tentar o cache de novo.
+            # Se o carregamento falhou (ou não foi guardado), a próxima volta
+            # assume o carregamento.
+            event.wait()
+
+        try:
+            value = loader()
+            if cache_if(value):
+                self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight_sync.pop(key, None)
+            event.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._data)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats